@@ -1,12 +1,11 @@
 from api.base_client import BaseAPIClient
+from api.async_client import AsyncBaseAPIClient
 from models.account_model import AssetResponse, AccountDetailResponse, AccountEvalResponse
-import json
+from utils import json_codec
 
-class AccountService(BaseAPIClient):
-    def __init__(self, token: str):
-        super().__init__()
-        self.token = token
-        self.endpoint = '/api/dostk/acnt'
+class _AccountRequestMixin:
+    """동기/비동기 계좌 서비스가 공유하는 헤더 로직"""
+    endpoint = '/api/dostk/acnt'
 
     def _get_headers(self, cont_yn='N', next_key=''):
         """기본 header 데이터 설정"""
@@ -18,39 +17,96 @@ class AccountService(BaseAPIClient):
             'api-id': ''  # TR명은 나중에 메서드에서 지정
         }
 
+    def _tr_headers(self, api_id: str, cont_yn: str, next_key: str):
+        headers = self._get_headers(cont_yn=cont_yn, next_key=next_key)
+        headers['api-id'] = api_id
+        return headers
+
+
+class AccountService(_AccountRequestMixin, BaseAPIClient):
+    def __init__(self, token: str):
+        super().__init__()
+        self.token = token
+
     def get_asset(self, data={"qry_tp": "0"}, cont_yn='N', next_key=''):
         """추정자산 조회 요청"""
-        headers = self._get_headers(cont_yn=cont_yn, next_key=next_key)
-        headers['api-id'] = 'kt00003'  # 추정자산 조회 TR명
+        headers = self._tr_headers('kt00003', cont_yn, next_key)  # 추정자산 조회 TR명
 
         response = self.post(self.endpoint, data=data, headers=headers)
         if response.status_code == 200:
-            return AssetResponse(**response.json())  # AssetResponse 모델로 반환
+            return AssetResponse(**json_codec.loads(response.content))  # AssetResponse 모델로 반환
         else:
             print(f"Error: {response.status_code}")
             return None
-        
+
     def get_status(self, data={"qry_tp": "0"}, cont_yn='N', next_key=''):
         """계좌평가현황요청"""
-        headers = self._get_headers(cont_yn=cont_yn, next_key=next_key)
-        headers['api-id'] = 'kt00004'  # 추정자산 조회 TR명
+        headers = self._tr_headers('kt00004', cont_yn, next_key)  # 계좌평가현황 TR명
 
         response = self.post(self.endpoint, data=data, headers=headers)
         if response.status_code == 200:
-            return AccountEvalResponse(**response.json())  # AssetResponse 모델로 반환
+            return AccountEvalResponse(**json_codec.loads(response.content))  # AccountEvalResponse 모델로 반환
         else:
             print(f"Error: {response.status_code}")
             return None
 
     def get_account_details(self, data={'qry_tp': '3'}, cont_yn='N', next_key=''):
         """예수금 상세 현황 조회 요청"""
-        headers = self._get_headers(cont_yn=cont_yn, next_key=next_key)
-        headers['api-id'] = 'kt00001'  # 예수금 조회 TR명
+        headers = self._tr_headers('kt00001', cont_yn, next_key)  # 예수금 조회 TR명
 
         response = self.post(self.endpoint, data=data, headers=headers)
 
         if response.status_code == 200:
-            return AccountDetailResponse(**response.json())  # AccountDetailResponse 모델로 반환
+            return AccountDetailResponse(**json_codec.loads(response.content))  # AccountDetailResponse 모델로 반환
         else:
             print(f"Error: {response.status_code}")
             return None
+
+    def iter_status(self, data={"qry_tp": "0"}, max_pages=None):
+        """계좌평가현황 연속조회: 페이지별 AccountEvalResponse를 yield"""
+        headers = self._tr_headers('kt00004', 'N', '')
+        for page in self.iter_pages(self.endpoint, data, headers, max_pages=max_pages):
+            yield AccountEvalResponse(**page)
+
+
+class AsyncAccountService(_AccountRequestMixin, AsyncBaseAPIClient):
+    """AccountService의 asyncio 버전"""
+    def __init__(self, token: str):
+        super().__init__()
+        self.token = token
+
+    async def get_asset(self, data={"qry_tp": "0"}, cont_yn='N', next_key=''):
+        """추정자산 조회 요청"""
+        headers = self._tr_headers('kt00003', cont_yn, next_key)
+        response = await self.post(self.endpoint, data=data, headers=headers)
+        if response.status_code == 200:
+            return AssetResponse(**json_codec.loads(response.content))
+        else:
+            print(f"Error: {response.status_code}")
+            return None
+
+    async def get_status(self, data={"qry_tp": "0"}, cont_yn='N', next_key=''):
+        """계좌평가현황요청"""
+        headers = self._tr_headers('kt00004', cont_yn, next_key)
+        response = await self.post(self.endpoint, data=data, headers=headers)
+        if response.status_code == 200:
+            return AccountEvalResponse(**json_codec.loads(response.content))
+        else:
+            print(f"Error: {response.status_code}")
+            return None
+
+    async def get_account_details(self, data={'qry_tp': '3'}, cont_yn='N', next_key=''):
+        """예수금 상세 현황 조회 요청"""
+        headers = self._tr_headers('kt00001', cont_yn, next_key)
+        response = await self.post(self.endpoint, data=data, headers=headers)
+        if response.status_code == 200:
+            return AccountDetailResponse(**json_codec.loads(response.content))
+        else:
+            print(f"Error: {response.status_code}")
+            return None
+
+    async def iter_status(self, data={"qry_tp": "0"}, max_pages=None):
+        """계좌평가현황 연속조회 (async for)"""
+        headers = self._tr_headers('kt00004', 'N', '')
+        async for page in self.iter_pages(self.endpoint, data, headers, max_pages=max_pages):
+            yield AccountEvalResponse(**page)
@@ -0,0 +1,118 @@
+import asyncio
+import weakref
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+from config import config, USE_MOCK
+from api.rate_limiter import get_rate_limiter
+from utils import json_codec
+
+# ---------------------------------------------------------------------
+# 이벤트 루프별 공용 aiohttp 세션
+# ---------------------------------------------------------------------
+# aiohttp.ClientSession은 생성된 이벤트 루프에 묶이므로 루프마다 하나씩 둡니다.
+# 같은 루프의 Async* 클라이언트들은 하나의 커넥션 풀을 공유합니다.
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+
+
+def _create_async_http_session() -> aiohttp.ClientSession:
+    http = config.http
+    connector = aiohttp.TCPConnector(
+        limit=http.pool_size,
+        force_close=not http.keep_alive,
+    )
+    timeout = aiohttp.ClientTimeout(
+        sock_connect=http.connect_timeout,
+        sock_read=http.read_timeout,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+def get_async_http_session() -> aiohttp.ClientSession:
+    """현재 실행 중인 이벤트 루프의 공용 세션 반환 (없으면 생성)"""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = _create_async_http_session()
+        _sessions[loop] = session
+    return session
+
+
+async def close_async_http_session() -> None:
+    """현재 루프의 공용 세션을 닫습니다. asyncio.run() 종료 전에 호출하세요."""
+    loop = asyncio.get_running_loop()
+    session = _sessions.pop(loop, None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+class AsyncAPIResponse:
+    """
+    aiohttp 응답 본문을 미리 읽어둔 결과 객체.
+    requests.Response와 같은 모양(status_code, headers, json())으로 사용합니다.
+    """
+    def __init__(self, status_code: int, headers, content: bytes, rate_limit_wait: float = 0.0):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.rate_limit_wait = rate_limit_wait
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json_codec.loads(self.content)
+
+
+class AsyncBaseAPIClient:
+    """BaseAPIClient의 asyncio 버전. 동일한 endpoint / api-id 헤더 규칙을 사용합니다."""
+    def __init__(self):
+        self.use_mock = USE_MOCK
+        if self.use_mock:
+            self.base_url = config.app.mock_domain
+        else:
+            self.base_url = config.app.domain
+        self.rate_limiter = get_rate_limiter()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        return get_async_http_session()
+
+    async def post(self, endpoint: str, data: dict, headers: dict = None, extra_headers: dict = None) -> AsyncAPIResponse:
+        url = self.base_url + endpoint
+        default_headers = {
+            'Content-Type': 'application/json;charset=UTF-8'
+        }
+        if headers:
+            default_headers.update(headers)
+        if extra_headers:
+            default_headers.update(extra_headers)
+        waited = await self.rate_limiter.acquire_async(default_headers.get('api-id', ''))
+        body = json_codec.dumps_bytes(data) if data is not None else None
+        async with self.session.post(url, data=body, headers=default_headers) as resp:
+            content = await resp.read()
+            return AsyncAPIResponse(resp.status, resp.headers, content, rate_limit_wait=waited)
+
+    async def iter_pages(self, endpoint: str, data: dict, headers: dict = None, max_pages: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """BaseAPIClient.iter_pages의 asyncio 버전 (async for 로 순회)"""
+        headers = dict(headers or {})
+        cont_yn = headers.get('cont-yn', 'N')
+        next_key = headers.get('next-key', '')
+        pages = 0
+        while True:
+            headers['cont-yn'] = cont_yn
+            headers['next-key'] = next_key
+            response = await self.post(endpoint, data=data, headers=headers)
+            if response.status_code != 200:
+                print(f"Error: {response.status_code}")
+                return
+            yield json_codec.loads(response.content)
+
+            pages += 1
+            cont_yn = (response.headers.get('cont-yn') or 'N').strip().upper()
+            next_key = (response.headers.get('next-key') or '').strip()
+            if cont_yn != 'Y' or not next_key:
+                return
+            if max_pages is not None and pages >= max_pages:
+                return
@@ -1,5 +1,88 @@
+import threading
+from typing import Any, Dict, Iterator, Optional
+
 import requests
+from requests.adapters import HTTPAdapter
 from config import config, USE_MOCK
+from api.rate_limiter import get_rate_limiter
+from utils import json_codec
+
+# ---------------------------------------------------------------------
+# 공용 HTTP 세션 (커넥션 풀 / keep-alive)
+# ---------------------------------------------------------------------
+# 모든 REST 래퍼가 하나의 Session을 공유하여 TCP/TLS 핸드셰이크를 재사용합니다.
+# requests.Session + HTTPAdapter(urllib3 풀)는 스레드 간 공유해도 안전합니다.
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _create_http_session() -> requests.Session:
+    http = config.http
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=http.pool_connections,
+        pool_maxsize=http.pool_size,
+        max_retries=http.max_retries,
+        pool_block=True,  # 풀이 가득 차면 새 커넥션을 만들지 않고 대기
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not http.keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """프로세스 공용 Session 반환 (최초 호출 시 생성)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _create_http_session()
+    return _session
+
+
+def close_http_session() -> None:
+    """공용 Session과 풀에 남아있는 커넥션을 모두 닫습니다."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_pool_stats() -> Dict[str, Dict[str, int]]:
+    """
+    호스트별 커넥션 풀 통계
+    - requests: 풀을 통해 나간 요청 수
+    - opened:   새로 맺은 커넥션 수 (핸드셰이크 횟수)
+    - reused:   기존 커넥션을 재사용한 요청 수
+    - idle:     현재 풀에 대기 중인(열린) 커넥션 수
+    """
+    session = _session
+    if session is None:
+        return {}
+
+    stats: Dict[str, Dict[str, int]] = {}
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            idle = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+            host = f"{key.key_scheme}://{key.key_host}:{key.key_port}"
+            stats[host] = {
+                "requests": pool.num_requests,
+                "opened": pool.num_connections,
+                "reused": max(pool.num_requests - pool.num_connections, 0),
+                "idle": idle,
+            }
+    return stats
 
 
 class BaseAPIClient:
@@ -9,6 +92,9 @@ class BaseAPIClient:
             self.base_url = config.app.mock_domain
         else:
             self.base_url = config.app.domain
+        self.session = get_http_session()
+        self.timeout = config.http.timeout
+        self.rate_limiter = get_rate_limiter()
 
     def post(self, endpoint: str, data: dict, headers: dict = None, extra_headers: dict = None):
         url = self.base_url + endpoint
@@ -19,5 +105,36 @@ class BaseAPIClient:
             default_headers.update(headers)
         if extra_headers:
             default_headers.update(extra_headers)
-        response = requests.post(url, json=data, headers=default_headers)
+        # api-id별 호출 한도 대기 (주문 TR은 대량 조회보다 먼저 통과)
+        waited = self.rate_limiter.acquire(default_headers.get('api-id', ''))
+        body = json_codec.dumps_bytes(data) if data is not None else None
+        response = self.session.post(url, data=body, headers=default_headers, timeout=self.timeout)
+        response.rate_limit_wait = waited
         return response
+
+    def iter_pages(self, endpoint: str, data: dict, headers: dict = None, max_pages: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        연속조회 페이지 이터레이터.
+        응답 헤더의 cont-yn / next-key 를 따라가며 페이지(JSON)를 하나씩 yield 합니다.
+        소비하는 쪽에서 순회를 멈추면 다음 페이지는 요청하지 않습니다.
+        """
+        headers = dict(headers or {})
+        cont_yn = headers.get('cont-yn', 'N')
+        next_key = headers.get('next-key', '')
+        pages = 0
+        while True:
+            headers['cont-yn'] = cont_yn
+            headers['next-key'] = next_key
+            response = self.post(endpoint, data=data, headers=headers)
+            if response.status_code != 200:
+                print(f"Error: {response.status_code}")
+                return
+            yield json_codec.loads(response.content)
+
+            pages += 1
+            cont_yn = (response.headers.get('cont-yn') or 'N').strip().upper()
+            next_key = (response.headers.get('next-key') or '').strip()
+            if cont_yn != 'Y' or not next_key:
+                return
+            if max_pages is not None and pages >= max_pages:
+                return
@@ -1,6 +1,7 @@
 # src/api/crdorder.py
 
 from api.base_client import BaseAPIClient
+from utils import json_codec
 
 class CreditOrderAPI(BaseAPIClient):
     def __init__(self):
@@ -15,4 +16,4 @@ class CreditOrderAPI(BaseAPIClient):
             'api-id': 'kt10006'
         }
         response = self.post(endpoint, data=order_data, headers=headers)
-        return response.json()
+        return json_codec.loads(response.content)
@@ -1,19 +1,36 @@
 from api.base_client import BaseAPIClient
+from api.async_client import AsyncBaseAPIClient
+from utils import json_codec
+
+STOCK_INFO_ENDPOINT = '/api/dostk/stkinfo'
+
+
+def _stock_info_request(token: str, stock_code: str, cont_yn: str, next_key: str):
+    """ka10001 주식기본정보요청 헤더/바디"""
+    headers = {
+        'authorization': f'Bearer {token}',
+        'cont-yn': cont_yn,
+        'next-key': next_key,
+        'api-id': 'ka10001'
+    }
+    payload = {
+        'stk_cd': stock_code
+    }
+    return headers, payload
+
 
 class MarketAPI(BaseAPIClient):
     def __init__(self):
         super().__init__()
     
     def get_stock_info(self, token: str, stock_code: str, cont_yn: str = 'N', next_key: str = '') -> dict:
-        endpoint = '/api/dostk/stkinfo'
-        headers = {
-            'authorization': f'Bearer {token}',
-            'cont-yn': cont_yn,
-            'next-key': next_key,
-            'api-id': 'ka10001'
-        }
-        payload = {
-            'stk_cd': stock_code
-        }
-        response = self.post(endpoint, data=payload, headers=headers)
-        return response.json()
+        headers, payload = _stock_info_request(token, stock_code, cont_yn, next_key)
+        response = self.post(STOCK_INFO_ENDPOINT, data=payload, headers=headers)
+        return json_codec.loads(response.content)
+
+
+class AsyncMarketAPI(AsyncBaseAPIClient):
+    async def get_stock_info(self, token: str, stock_code: str, cont_yn: str = 'N', next_key: str = '') -> dict:
+        headers, payload = _stock_info_request(token, stock_code, cont_yn, next_key)
+        response = await self.post(STOCK_INFO_ENDPOINT, data=payload, headers=headers)
+        return json_codec.loads(response.content)
@@ -1,6 +1,7 @@
 from api.base_client import BaseAPIClient
 from models.oauth_model import OAuthRequest, OAuthResponse
 from config import APP_KEY, SECRET_KEY
+from utils import json_codec
 
 
 class OAuthClient(BaseAPIClient):
@@ -16,7 +17,7 @@ class OAuthClient(BaseAPIClient):
         ).model_dump()
         
         response = self.post(endpoint, data=payload)
-        response_json = response.json()
+        response_json = json_codec.loads(response.content)
 
         # 응답 내용 출력 (디버깅용)
         print("OAuth 응답:", response_json)
@@ -35,4 +36,4 @@ class OAuthClient(BaseAPIClient):
             "token": token
         }
         response = self.post(endpoint, data=payload)
-        return response.json()
+        return json_codec.loads(response.content)
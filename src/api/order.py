@@ -1,19 +1,29 @@
 from api.base_client import BaseAPIClient
+from api.async_client import AsyncBaseAPIClient
+from utils import json_codec
+
+ORDER_ENDPOINT = '/api/dostk/ordr'
+BUY_API_ID = 'kt10000'
+SELL_API_ID = 'kt10001'
+
+
+def _order_headers(token: str, api_id: str, cont_yn: str, next_key: str) -> dict:
+    return {
+        'authorization': f'Bearer {token}',
+        'cont-yn': cont_yn,
+        'next-key': next_key,
+        'api-id': api_id
+    }
+
 
 class OrderAPI(BaseAPIClient):
     def __init__(self):
         super().__init__()
     
     def stock_buy_order(self, token: str, order_data: dict, cont_yn: str = 'N', next_key: str = '') -> dict:
-        endpoint = '/api/dostk/ordr'
-        headers = {
-            'authorization': f'Bearer {token}',
-            'cont-yn': cont_yn,
-            'next-key': next_key,
-            'api-id': 'kt10000'
-        }
-        response = self.post(endpoint, data=order_data, headers=headers)
-        return response.json()
+        headers = _order_headers(token, BUY_API_ID, cont_yn, next_key)
+        response = self.post(ORDER_ENDPOINT, data=order_data, headers=headers)
+        return json_codec.loads(response.content)
     
     def stock_sell_order(self, token: str, order_data: dict, cont_yn: str = 'N', next_key: str = '') -> dict:
         """
@@ -30,12 +40,19 @@ class OrderAPI(BaseAPIClient):
                 "cond_uv": ""
             }
         """
-        endpoint = '/api/dostk/ordr'
-        headers = {
-            'authorization': f'Bearer {token}',
-            'cont-yn': cont_yn,
-            'next-key': next_key,
-            'api-id': "kt10001",
-        }
-        response = self.post(endpoint, data=order_data, headers=headers)
-        return response.json()
\ No newline at end of file
+        headers = _order_headers(token, SELL_API_ID, cont_yn, next_key)
+        response = self.post(ORDER_ENDPOINT, data=order_data, headers=headers)
+        return json_codec.loads(response.content)
+
+
+class AsyncOrderAPI(AsyncBaseAPIClient):
+    """OrderAPI의 asyncio 버전 (같은 api-id / order_data 형식)"""
+    async def stock_buy_order(self, token: str, order_data: dict, cont_yn: str = 'N', next_key: str = '') -> dict:
+        headers = _order_headers(token, BUY_API_ID, cont_yn, next_key)
+        response = await self.post(ORDER_ENDPOINT, data=order_data, headers=headers)
+        return json_codec.loads(response.content)
+
+    async def stock_sell_order(self, token: str, order_data: dict, cont_yn: str = 'N', next_key: str = '') -> dict:
+        headers = _order_headers(token, SELL_API_ID, cont_yn, next_key)
+        response = await self.post(ORDER_ENDPOINT, data=order_data, headers=headers)
+        return json_codec.loads(response.content)
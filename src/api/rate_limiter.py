@@ -0,0 +1,192 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config import config
+
+# ---------------------------------------------------------------------
+# api-id별 우선순위 (작을수록 먼저)
+# ---------------------------------------------------------------------
+ORDER_PRIORITY = 0    # 주문 TR: 대량 조회보다 먼저 나가야 함
+DEFAULT_PRIORITY = 1  # 시세/계좌 조회
+BULK_PRIORITY = 2     # 차트 다운로드 등 대량 조회
+
+API_PRIORITIES: Dict[str, int] = {
+    'kt10000': ORDER_PRIORITY,  # 매수
+    'kt10001': ORDER_PRIORITY,  # 매도
+    'kt10002': ORDER_PRIORITY,  # 정정
+    'kt10003': ORDER_PRIORITY,  # 취소
+    'kt10006': ORDER_PRIORITY,  # 신용 매수
+    'ka10080': BULK_PRIORITY,   # 분봉 차트
+    'ka10081': BULK_PRIORITY,   # 일봉 차트
+}
+
+# 비동기 대기자가 다른 스레드의 허가를 확인하는 최대 주기(초)
+ASYNC_POLL_INTERVAL = 0.02
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지는 토큰 버킷 (capacity = 순간 최대 허용량)"""
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1.0))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """토큰 1개를 쓸 수 있을 때까지 남은 시간(초). 0이면 즉시 가능."""
+        self._refill(now)
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1.0
+
+
+class _Ticket:
+    __slots__ = ("priority", "seq", "api_id", "granted")
+
+    def __init__(self, priority: int, seq: int, api_id: str):
+        self.priority = priority
+        self.seq = seq
+        self.api_id = api_id
+        self.granted = False
+
+
+class RateLimiter:
+    """
+    전역 + api-id별 토큰 버킷 제한기.
+    - 대기자는 (우선순위, 도착순)으로 정렬되어, 토큰이 생기면 우선순위가 높은 TR부터 통과합니다.
+    - 자기 api-id 버킷이 비어 있는 대기자는 건너뛰므로, 다른 TR의 진행을 막지 않습니다.
+    - acquire()/acquire_async()는 실제로 대기한 시간(초)을 반환하고 통계에 누적합니다.
+    """
+    def __init__(self, global_rate: float, budgets: Optional[Dict[str, float]] = None,
+                 priorities: Optional[Dict[str, int]] = None, global_burst: Optional[float] = None):
+        self._cond = threading.Condition(threading.Lock())
+        self._global = TokenBucket(global_rate, global_burst)
+        self._buckets: Dict[str, TokenBucket] = {
+            api_id: TokenBucket(rate) for api_id, rate in (budgets or {}).items()
+        }
+        self._priorities = dict(API_PRIORITIES if priorities is None else priorities)
+        self._waiters: List[_Ticket] = []
+        self._seq = itertools.count()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    # -----------------------------
+    # 내부 스케줄링 (항상 lock 보유 상태에서 호출)
+    # -----------------------------
+    def _enqueue(self, api_id: str, priority: Optional[int]) -> _Ticket:
+        if priority is None:
+            priority = self._priorities.get(api_id, DEFAULT_PRIORITY)
+        ticket = _Ticket(priority, next(self._seq), api_id)
+        self._waiters.append(ticket)
+        self._waiters.sort(key=lambda t: (t.priority, t.seq))
+        return ticket
+
+    def _dispatch(self, now: float) -> float:
+        """가능한 만큼 대기자에게 토큰을 배분하고, 다음 확인까지의 시간(초)을 반환"""
+        granted_any = False
+        while self._waiters:
+            global_wait = self._global.wait_time(now)
+            next_wait = None
+            chosen = None
+            for ticket in self._waiters:
+                bucket = self._buckets.get(ticket.api_id)
+                own_wait = bucket.wait_time(now) if bucket else 0.0
+                wait = max(global_wait, own_wait)
+                if wait <= 0:
+                    chosen = ticket
+                    break
+                next_wait = wait if next_wait is None else min(next_wait, wait)
+            if chosen is None:
+                if granted_any:
+                    self._cond.notify_all()
+                return next_wait
+            self._global.take()
+            bucket = self._buckets.get(chosen.api_id)
+            if bucket:
+                bucket.take()
+            chosen.granted = True
+            self._waiters.remove(chosen)
+            granted_any = True
+        if granted_any:
+            self._cond.notify_all()
+        return 0.0
+
+    def _record(self, api_id: str, waited: float) -> None:
+        st = self._stats.setdefault(api_id, {"calls": 0, "total_wait": 0.0, "max_wait": 0.0, "last_wait": 0.0})
+        st["calls"] += 1
+        st["total_wait"] += waited
+        st["max_wait"] = max(st["max_wait"], waited)
+        st["last_wait"] = waited
+        if waited > 0:
+            logging.debug(f"[RATE] api-id={api_id or '-'} waited {waited:.3f}s")
+
+    # -----------------------------
+    # 공개 API
+    # -----------------------------
+    def acquire(self, api_id: str = '', priority: Optional[int] = None) -> float:
+        """호출 허가를 받을 때까지 블로킹. 대기 시간(초) 반환."""
+        start = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(api_id, priority)
+            while True:
+                delay = self._dispatch(time.monotonic())
+                if ticket.granted:
+                    break
+                self._cond.wait(timeout=delay)
+            waited = time.monotonic() - start
+            self._record(api_id, waited)
+        return waited
+
+    async def acquire_async(self, api_id: str = '', priority: Optional[int] = None) -> float:
+        """acquire()의 asyncio 버전. 이벤트 루프를 막지 않고 대기합니다."""
+        start = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(api_id, priority)
+        try:
+            while True:
+                with self._cond:
+                    delay = self._dispatch(time.monotonic())
+                    if ticket.granted:
+                        waited = time.monotonic() - start
+                        self._record(api_id, waited)
+                        return waited
+                await asyncio.sleep(min(delay, ASYNC_POLL_INTERVAL))
+        except asyncio.CancelledError:
+            with self._cond:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+            raise
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """api-id별 호출 수 / 누적·최대·최근 대기시간"""
+        with self._cond:
+            return {api_id: dict(st) for api_id, st in self._stats.items()}
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """config.rate_limit 기반 프로세스 공용 제한기"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(
+                    global_rate=config.rate_limit.global_rate,
+                    budgets=config.rate_limit.budgets,
+                )
+    return _limiter
@@ -1,13 +1,30 @@
 from api.base_client import BaseAPIClient
+from api.async_client import AsyncBaseAPIClient
 import pandas as pd
 import requests
-import json
+from typing import Optional
+from utils.decode_utils import decode_date, decode_datetime, decode_int, pluck
+from utils import json_codec
+
+DAILY_LIST_KEY = 'stk_dt_pole_chart_qry'
+INTRADAY_LIST_KEY = 'stk_min_pole_chart_qry'
 
-class StockChartService(BaseAPIClient):
-    def __init__(self, token: str):
-        super().__init__()
-        self.token = token
-        self.endpoint = '/api/dostk/chart'
+
+def _trim_before(rows: list, time_key: str, stop_at: Optional[str]):
+    """
+    최신→과거 순으로 내려오는 차트 행에서 stop_at 이전 행을 잘라냅니다.
+    stop_at은 'YYYYMMDD' 또는 'YYYYMMDDHHMMSS' (문자열 비교로 판단)
+    반환: (남은 행, stop_at 이전 구간 도달 여부)
+    """
+    if not stop_at:
+        return rows, False
+    kept = [r for r in rows if str(r.get(time_key, '')) >= stop_at]
+    return kept, len(kept) < len(rows)
+
+
+class _ChartRequestMixin:
+    """동기/비동기 차트 서비스가 공유하는 헤더/페이로드/변환 로직"""
+    endpoint = '/api/dostk/chart'
 
     def _get_headers(self, cont_yn='N', next_key=''):
         """기본 header 데이터 설정"""
@@ -19,8 +36,7 @@ class StockChartService(BaseAPIClient):
             'api-id': ''  # TR명은 나중에 메서드에서 지정
         }
 
-    def get_daily_chart(self, stk_cd: str, base_dt: str, upd_stkpc_tp: str = '1', cont_yn='N', next_key=''):
-        """일봉 차트 조회"""
+    def _daily_request(self, stk_cd: str, base_dt: str, upd_stkpc_tp: str, cont_yn: str, next_key: str):
         headers = self._get_headers(cont_yn=cont_yn, next_key=next_key)
         headers['api-id'] = 'ka10081'  # TR명: 주식일봉차트조회요청
 
@@ -29,83 +45,149 @@ class StockChartService(BaseAPIClient):
             'base_dt': base_dt,  # 기준일자 (YYYYMMDD)
             'upd_stkpc_tp': upd_stkpc_tp,  # 수정주가구분
         }
+        return headers, data
+
+    def _intraday_request(self, stk_cd: str, tic_scope: str, upd_stkpc_tp: str, cont_yn: str, next_key: str):
+        headers = self._get_headers(cont_yn=cont_yn, next_key=next_key)
+        headers['api-id'] = 'ka10080'  # TR명: 주식분봉차트조회요청
+
+        data = {
+            'stk_cd': stk_cd,
+            'tic_scope': tic_scope,  # 틱범위 (1:1분, 3:3분, 5:5분 등)
+            'upd_stkpc_tp': upd_stkpc_tp,  # 수정주가구분
+        }
+        return headers, data
+
+    # 응답 필드 → (DataFrame 컬럼, 부호 제거 여부). 가격의 +/-는 전일 대비 방향이므로 제거
+    _DAILY_FIELDS = (('cur_prc', 'close', True), ('trde_qty', 'volume', False), ('trde_prica', 'trde_prica', False),
+                     ('open_pric', 'open', True), ('high_pric', 'high', True), ('low_pric', 'low', True))
+    _INTRADAY_FIELDS = (('cur_prc', 'close', True), ('trde_qty', 'volume', False),
+                        ('open_pric', 'open', True), ('high_pric', 'high', True), ('low_pric', 'low', True))
+
+    def _convert_to_dataframe(self, chart_data: list, is_intraday: bool = False):
+        """차트 데이터를 Pandas DataFrame으로 변환 (JSON 행 리스트에서 바로 int64 컬럼 생성)"""
+
+        if chart_data:
+            if not is_intraday:  # 일봉 차트: dt 'YYYYMMDD'
+                fields = self._DAILY_FIELDS
+                index = pd.DatetimeIndex(decode_date(pluck(chart_data, 'dt')).astype('datetime64[us]'), name='dt')
+            else:  # 분봉 차트: cntr_tm 'YYYYMMDDHHMMSS'
+                fields = self._INTRADAY_FIELDS
+                index = pd.DatetimeIndex(decode_datetime(pluck(chart_data, 'cntr_tm')).astype('datetime64[us]'), name='cntr_tm')
+
+            columns = {name: decode_int(pluck(chart_data, key), absolute=absolute) for key, name, absolute in fields}
+            df = pd.DataFrame(columns, index=index)
+            return df.sort_index()
+        else:
+            print("No data found in the response.")
+            return None
+
+
+class StockChartService(_ChartRequestMixin, BaseAPIClient):
+    def __init__(self, token: str):
+        super().__init__()
+        self.token = token
+
+    def get_daily_chart(self, stk_cd: str, base_dt: str, upd_stkpc_tp: str = '1', cont_yn='N', next_key=''):
+        """일봉 차트 조회"""
+        headers, data = self._daily_request(stk_cd, base_dt, upd_stkpc_tp, cont_yn, next_key)
 
         # 요청
         response = self.post(self.endpoint, data=data, headers=headers)
 
         # 응답 처리
         if response.status_code == 200:
-            chart_data = response.json()
+            chart_data = json_codec.loads(response.content)
             # DataFrame으로 변환하여 반환
-            return self._convert_to_dataframe(chart_data['stk_dt_pole_chart_qry'], is_intraday=False)
+            return self._convert_to_dataframe(chart_data[DAILY_LIST_KEY], is_intraday=False)
         else:
             print(f"Error: {response.status_code}")
             return None
 
     def get_intraday_chart(self, stk_cd: str, tic_scope: str = '1', upd_stkpc_tp: str = '1', cont_yn='N', next_key=''):
         """분봉 차트 조회"""
-        headers = self._get_headers(cont_yn=cont_yn, next_key=next_key)
-        headers['api-id'] = 'ka10080'  # TR명: 주식분봉차트조회요청
-
-        data = {
-            'stk_cd': stk_cd,
-            'tic_scope': tic_scope,  # 틱범위 (1:1분, 3:3분, 5:5분 등)
-            'upd_stkpc_tp': upd_stkpc_tp,  # 수정주가구분
-        }
+        headers, data = self._intraday_request(stk_cd, tic_scope, upd_stkpc_tp, cont_yn, next_key)
 
         # 요청
         response = self.post(self.endpoint, data=data, headers=headers)
 
         # 응답 처리
         if response.status_code == 200:
-            chart_data = response.json()
+            chart_data = json_codec.loads(response.content)
             # DataFrame으로 변환하여 반환
-            return self._convert_to_dataframe(chart_data['stk_min_pole_chart_qry'], is_intraday=True)
+            return self._convert_to_dataframe(chart_data[INTRADAY_LIST_KEY], is_intraday=True)
         else:
             print(f"Error: {response.status_code}")
             return None
 
-    def _convert_to_dataframe(self, chart_data: list, is_intraday: bool = False):
-        """차트 데이터를 Pandas DataFrame으로 변환"""
 
-        if chart_data:
-            # 일봉 데이터의 경우 필드명에 맞춰 컬럼을 설정
-            if not is_intraday:  # 일봉 차트
-                columns = ['cur_prc', 'trde_qty', 'trde_prica', 'dt', 'open_pric', 'high_pric', 'low_pric']
-            else:  # 분봉 차트
-                columns = ['cur_prc', 'trde_qty', 'cntr_tm', 'open_pric', 'high_pric', 'low_pric']
-            
-            # DataFrame으로 변환
-            df = pd.DataFrame(chart_data, columns=columns)
-
-            # 'cur_prc', 'open_pric', 'high_pric', 'low_pric'을 숫자로 변환 (가격 관련 컬럼)
-            for col in ['cur_prc', 'open_pric', 'high_pric', 'low_pric']:
-                if col in df.columns:
-                    df[col] = df[col].apply(lambda x: int(x.replace('+', '').replace('-', '')) if isinstance(x, str) else x)
-
-            # 거래량 컬럼 변환 (trde_qty, trde_prica)
-            if 'trde_qty' in df.columns:
-                df['trde_qty'] = pd.to_numeric(df['trde_qty'], errors='coerce')
-            if 'trde_prica' in df.columns:
-                df['trde_prica'] = pd.to_numeric(df['trde_prica'], errors='coerce')
-
-            # 일자 또는 시간 컬럼 변환 (dt 또는 cntr_tm)
-            if 'dt' in df.columns:
-                df['dt'] = pd.to_datetime(df['dt'], format='%Y%m%d')  # 일봉 차트의 dt는 'YYYYMMDD'
-                df.set_index('dt', inplace=True)
-            elif 'cntr_tm' in df.columns:
-                df['cntr_tm'] = pd.to_datetime(df['cntr_tm'], format='%Y%m%d%H%M%S')  # 분봉 차트의 cntr_tm은 'YYYYMMDDHHMMSS'
-                df.set_index('cntr_tm', inplace=True)
-            # 컬럼 이름 변경
-
-            df = df.rename(columns={
-                'cur_prc': 'close', 
-                'trde_qty': 'volume', 
-                'open_pric': 'open', 
-                'high_pric': 'high', 
-                'low_pric': 'low'
-            })
-            return df.astype(int).sort_index()  # 일봉 차트 기준으로 dt를 index로 설정
+    def iter_daily_chart(self, stk_cd: str, base_dt: str, upd_stkpc_tp: str = '1', stop_dt: Optional[str] = None, max_pages: Optional[int] = None):
+        """
+        일봉 연속조회. 페이지 단위 DataFrame을 도착하는 대로 yield 합니다.
+        stop_dt(YYYYMMDD) 이전 구간에 도달하면 잘라서 반환하고 더 이상 요청하지 않습니다.
+        """
+        headers, data = self._daily_request(stk_cd, base_dt, upd_stkpc_tp, 'N', '')
+        for page in self.iter_pages(self.endpoint, data, headers, max_pages=max_pages):
+            rows, reached = _trim_before(page.get(DAILY_LIST_KEY) or [], 'dt', stop_dt)
+            if rows:
+                yield self._convert_to_dataframe(rows, is_intraday=False)
+            if reached or not rows:
+                return
+
+    def iter_intraday_chart(self, stk_cd: str, tic_scope: str = '1', upd_stkpc_tp: str = '1', stop_tm: Optional[str] = None, max_pages: Optional[int] = None):
+        """분봉 연속조회. stop_tm('YYYYMMDD' 또는 'YYYYMMDDHHMMSS') 이전 구간에서 중단"""
+        headers, data = self._intraday_request(stk_cd, tic_scope, upd_stkpc_tp, 'N', '')
+        for page in self.iter_pages(self.endpoint, data, headers, max_pages=max_pages):
+            rows, reached = _trim_before(page.get(INTRADAY_LIST_KEY) or [], 'cntr_tm', stop_tm)
+            if rows:
+                yield self._convert_to_dataframe(rows, is_intraday=True)
+            if reached or not rows:
+                return
+
+class AsyncStockChartService(_ChartRequestMixin, AsyncBaseAPIClient):
+    """StockChartService의 asyncio 버전"""
+    def __init__(self, token: str):
+        super().__init__()
+        self.token = token
+
+    async def get_daily_chart(self, stk_cd: str, base_dt: str, upd_stkpc_tp: str = '1', cont_yn='N', next_key=''):
+        """일봉 차트 조회"""
+        headers, data = self._daily_request(stk_cd, base_dt, upd_stkpc_tp, cont_yn, next_key)
+        response = await self.post(self.endpoint, data=data, headers=headers)
+        if response.status_code == 200:
+            chart_data = json_codec.loads(response.content)
+            return self._convert_to_dataframe(chart_data[DAILY_LIST_KEY], is_intraday=False)
         else:
-            print("No data found in the response.")
+            print(f"Error: {response.status_code}")
             return None
+
+    async def get_intraday_chart(self, stk_cd: str, tic_scope: str = '1', upd_stkpc_tp: str = '1', cont_yn='N', next_key=''):
+        """분봉 차트 조회"""
+        headers, data = self._intraday_request(stk_cd, tic_scope, upd_stkpc_tp, cont_yn, next_key)
+        response = await self.post(self.endpoint, data=data, headers=headers)
+        if response.status_code == 200:
+            chart_data = json_codec.loads(response.content)
+            return self._convert_to_dataframe(chart_data[INTRADAY_LIST_KEY], is_intraday=True)
+        else:
+            print(f"Error: {response.status_code}")
+            return None
+
+    async def iter_daily_chart(self, stk_cd: str, base_dt: str, upd_stkpc_tp: str = '1', stop_dt: Optional[str] = None, max_pages: Optional[int] = None):
+        """일봉 연속조회 (async for). StockChartService.iter_daily_chart 참고"""
+        headers, data = self._daily_request(stk_cd, base_dt, upd_stkpc_tp, 'N', '')
+        async for page in self.iter_pages(self.endpoint, data, headers, max_pages=max_pages):
+            rows, reached = _trim_before(page.get(DAILY_LIST_KEY) or [], 'dt', stop_dt)
+            if rows:
+                yield self._convert_to_dataframe(rows, is_intraday=False)
+            if reached or not rows:
+                return
+
+    async def iter_intraday_chart(self, stk_cd: str, tic_scope: str = '1', upd_stkpc_tp: str = '1', stop_tm: Optional[str] = None, max_pages: Optional[int] = None):
+        """분봉 연속조회 (async for)"""
+        headers, data = self._intraday_request(stk_cd, tic_scope, upd_stkpc_tp, 'N', '')
+        async for page in self.iter_pages(self.endpoint, data, headers, max_pages=max_pages):
+            rows, reached = _trim_before(page.get(INTRADAY_LIST_KEY) or [], 'cntr_tm', stop_tm)
+            if rows:
+                yield self._convert_to_dataframe(rows, is_intraday=True)
+            if reached or not rows:
+                return
@@ -1,6 +1,6 @@
 import asyncio
 import websockets
-import json
+from utils import json_codec
 from config import APP_KEY  # 실제 환경에서는 OAuth를 통해 획득한 Access Token 사용
 
 # 기본 WebSocket 접속 URL (실전)
@@ -35,7 +35,7 @@ class WebSocketClient:
             await self.connect()
         if self.connected:
             if not isinstance(message, str):
-                message = json.dumps(message)
+                message = json_codec.dumps(message)
             await self.websocket.send(message)
             print(f"전송한 메시지: {message}")
 
@@ -43,7 +43,7 @@ class WebSocketClient:
         while self.keep_running:
             try:
                 message = await self.websocket.recv()
-                data = json.loads(message)
+                data = json_codec.loads(message)
                 # LOGIN 메시지 처리
                 if data.get('trnm') == 'LOGIN':
                     if data.get('return_code') != 0:
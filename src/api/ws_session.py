@@ -0,0 +1,303 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import websockets
+
+from config import config
+from utils import json_codec
+
+# ---------------------------------------------------------------------
+# 공유 WebSocket 세션
+# ---------------------------------------------------------------------
+# 로그인된 소켓 하나를 조건검색/체결감시 등 여러 소비자가 함께 씁니다.
+# - 수신은 reader 태스크 하나만 담당하고 PING은 여기서 바로 돌려보냄
+# - request(): 요청을 보내고 trnm(+match 조건)이 맞는 첫 응답을 반환 (CNSRLST, CNSRREQ, REG ...)
+# - subscribe(trnm): 요청과 무관하게 들어오는 프레임(REAL 등)을 trnm별 큐로 전달 ('*'는 나머지 전부)
+
+DEFAULT_WS_URL = 'wss://mockapi.kiwoom.com:10000/api/dostk/websocket'  # 모의
+CLOSED = "__CLOSED__"  # 연결 종료 시 구독 큐에 넣는 표식 프레임
+ANY = "*"
+
+Match = Optional[Callable[[Dict[str, Any]], bool]]
+
+
+def _resolve_url(url: Optional[str]) -> str:
+    return url or config.app.ws_url or DEFAULT_WS_URL
+
+
+class _Waiter:
+    __slots__ = ("trnm", "match", "future")
+
+    def __init__(self, trnm: str, match: Match, future: asyncio.Future):
+        self.trnm = trnm
+        self.match = match
+        self.future = future
+
+
+class WSSession:
+    """
+    async with WSSession(token) as ws:
+        conds = await ws.request({"trnm": "CNSRLST"})
+        real = ws.subscribe("REAL")
+    """
+    def __init__(self, token: str, url: Optional[str] = None, connect: Callable = websockets.connect):
+        self.token = token
+        self.url = _resolve_url(url)
+        self._connect = connect
+        self.ws = None
+        self._reader: Optional[asyncio.Task] = None
+        self._send_lock: Optional[asyncio.Lock] = None
+        self._waiters: List[_Waiter] = []
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self.stats = {"sent": 0, "recv": 0, "ping": 0, "unrouted": 0, "dropped": 0, "logins": 0}
+
+    @property
+    def connected(self) -> bool:
+        return self.ws is not None and self._reader is not None and not self._reader.done()
+
+    async def start(self, login_timeout: float = 10.0) -> "WSSession":
+        """접속 + 로그인 (이미 연결되어 있으면 그대로 사용)"""
+        if self.connected:
+            return self
+        self._send_lock = asyncio.Lock()
+        self.ws = await self._connect(self.url)
+        self._reader = asyncio.create_task(self._read_loop())
+        resp = await self.request({"trnm": "LOGIN", "token": self.token}, timeout=login_timeout)
+        if resp.get("return_code") != 0:
+            await self.close()
+            raise RuntimeError(f"로그인 실패: {resp.get('return_msg')}")
+        self.stats["logins"] += 1
+        return self
+
+    async def close(self) -> None:
+        reader, self._reader = self._reader, None
+        if reader is not None and not reader.done():
+            reader.cancel()
+            try:
+                await reader
+            except asyncio.CancelledError:
+                pass
+        if self.ws is not None:
+            try:
+                await self.ws.close()
+            except Exception:
+                pass
+            self.ws = None
+        self._on_closed()
+
+    async def __aenter__(self) -> "WSSession":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    # -----------------------------
+    # 송신 / 요청-응답
+    # -----------------------------
+    async def send(self, payload: Dict[str, Any]) -> None:
+        if self.ws is None:
+            raise RuntimeError("WebSocket이 연결되어 있지 않습니다.")
+        async with self._send_lock:
+            await self.ws.send(json_codec.dumps(payload))
+        self.stats["sent"] += 1
+
+    async def request(self, payload: Dict[str, Any], want: Optional[str] = None,
+                      match: Match = None, timeout: float = 10.0) -> Dict[str, Any]:
+        """
+        payload 전송 후 trnm == want(기본: payload의 trnm)이고 match(msg)가 참인 첫 프레임을 반환.
+        같은 trnm 요청이 동시에 여러 개면 match로 자기 응답을 구분합니다 (없으면 도착 순서대로).
+        """
+        waiter = _Waiter(want or payload["trnm"], match, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        try:
+            await self.send(payload)
+            return await asyncio.wait_for(waiter.future, timeout=timeout)
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    # -----------------------------
+    # 구독
+    # -----------------------------
+    def subscribe(self, trnm: str, maxsize: int = 0) -> asyncio.Queue:
+        """trnm 프레임을 받을 큐 등록. maxsize를 넘으면 가장 오래된 프레임을 버림"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._subscribers.setdefault(trnm, []).append(queue)
+        return queue
+
+    def unsubscribe(self, trnm: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(trnm, [])
+        if queue in queues:
+            queues.remove(queue)
+
+    # -----------------------------
+    # 수신 (reader 태스크)
+    # -----------------------------
+    async def _read_loop(self) -> None:
+        try:
+            async for raw in self.ws:
+                msg = json_codec.loads(raw)
+                self.stats["recv"] += 1
+                trnm = msg.get("trnm")
+                if trnm == "PING":
+                    self.stats["ping"] += 1
+                    await self.send(msg)
+                    continue
+                self._dispatch(trnm, msg)
+        except websockets.ConnectionClosed:
+            logging.info("[WS] 서버에 의해 연결 종료")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"[WS] reader error: {e}")
+        finally:
+            self._on_closed()
+
+    def _dispatch(self, trnm: Optional[str], msg: Dict[str, Any]) -> None:
+        for waiter in self._waiters:
+            if waiter.trnm != trnm or waiter.future.done():
+                continue
+            if waiter.match is None or waiter.match(msg):
+                waiter.future.set_result(msg)
+                self._waiters.remove(waiter)
+                return
+
+        queues = self._subscribers.get(trnm, []) + self._subscribers.get(ANY, [])
+        if not queues:
+            self.stats["unrouted"] += 1
+            return
+        for queue in queues:
+            self._put(queue, msg)
+
+    def _put(self, queue: asyncio.Queue, msg: Dict[str, Any]) -> None:
+        if queue.full():
+            queue.get_nowait()
+            self.stats["dropped"] += 1
+        queue.put_nowait(msg)
+
+    def _on_closed(self) -> None:
+        for waiter in self._waiters:
+            if not waiter.future.done():
+                waiter.future.set_exception(RuntimeError("WebSocket closed"))
+        self._waiters.clear()
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self._put(queue, {"trnm": CLOSED})
+
+
+# ---------------------------------------------------------------------
+# 이벤트 루프별 공용 세션
+# ---------------------------------------------------------------------
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], WSSession]]" = weakref.WeakKeyDictionary()
+
+
+async def get_ws_session(token: str, url: Optional[str] = None) -> WSSession:
+    """현재 루프에서 (token, url)별로 하나의 로그인된 세션을 공유 (끊겼으면 다시 접속)"""
+    loop = asyncio.get_running_loop()
+    sessions = _sessions.setdefault(loop, {})
+    key = (token, _resolve_url(url))
+    session = sessions.get(key)
+    if session is None:
+        session = sessions[key] = WSSession(token, key[1])
+    return await session.start()
+
+
+async def close_ws_sessions() -> None:
+    """현재 루프의 공용 세션을 모두 닫습니다. asyncio.run() 종료 전에 호출하세요."""
+    sessions = _sessions.pop(asyncio.get_running_loop(), {})
+    for session in sessions.values():
+        await session.close()
+
+
+# ---------------------------------------------------------------------
+# 동기 코드용 공용 세션 스레드
+# ---------------------------------------------------------------------
+class WSSessionThread:
+    """
+    별도 스레드의 이벤트 루프 하나에서 get_ws_session() 공용 세션을 돌립니다.
+    동기 코드(main)의 조건검색/실시간 시세 등이 모두 이 루프에서 로그인된 소켓 하나를 씁니다.
+    host = shared_ws_thread(token)
+    conds = host.run(request_condition_list)     # fn(session) 코루틴을 실행하고 결과 대기
+    fut = host.submit(fn)                        # concurrent.futures.Future (async 코드는 asyncio.wrap_future)
+    """
+    def __init__(self, token: str, url: Optional[str] = None):
+        self.token = token
+        self.url = url
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        return self._loop
+
+    def start(self) -> "WSSessionThread":
+        with self._lock:
+            if self._thread is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="ws-session", daemon=True)
+                self._thread.start()
+        return self
+
+    def call(self, coro: Awaitable[Any], timeout: Optional[float] = 30.0) -> Any:
+        """코루틴을 세션 루프에서 실행하고 결과를 기다림"""
+        return asyncio.run_coroutine_threadsafe(coro, self.start()._loop).result(timeout)
+
+    def submit(self, fn: Callable[[WSSession], Awaitable[Any]]) -> concurrent.futures.Future:
+        """fn(공용 세션)을 세션 루프에서 실행 (접속/로그인/재접속은 get_ws_session이 처리)"""
+        async def _run():
+            return await fn(await get_ws_session(self.token, self.url))
+        return asyncio.run_coroutine_threadsafe(_run(), self.start()._loop)
+
+    def run(self, fn: Callable[[WSSession], Awaitable[Any]], timeout: Optional[float] = 30.0) -> Any:
+        return self.submit(fn).result(timeout)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """공용 세션을 닫고 남은 태스크를 취소한 뒤 스레드 종료"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop, self._thread = None, None
+        if loop is None:
+            return
+
+        async def _shutdown():
+            await close_ws_sessions()
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(_shutdown(), loop).result(timeout)
+        except Exception as e:
+            logging.warning(f"[WS] 세션 종료 중 오류: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5.0)
+        loop.close()
+
+
+_threads: Dict[Tuple[str, str], WSSessionThread] = {}
+_threads_lock = threading.Lock()
+
+
+def shared_ws_thread(token: str, url: Optional[str] = None) -> WSSessionThread:
+    """프로세스 전체에서 (token, url)별 세션 스레드 하나를 공유 (시작된 상태로 반환)"""
+    key = (token, _resolve_url(url))
+    with _threads_lock:
+        host = _threads.get(key)
+        if host is None:
+            host = _threads[key] = WSSessionThread(token, key[1])
+    return host.start()
+
+
+def stop_ws_threads() -> None:
+    """shared_ws_thread()로 만든 세션 스레드를 모두 종료 (프로세스 종료 전에 호출)"""
+    with _threads_lock:
+        hosts = list(_threads.values())
+        _threads.clear()
+    for host in hosts:
+        host.stop()
@@ -0,0 +1,94 @@
+"""
+전 종목 종가 패널 로딩 벤치마크 (합성 데이터)
+
+    python -m benchmarks.bench_candle_panel --codes 2500 --days 1500
+
+1) 종목별 테이블 SQLite: 테이블마다 read_sql → concat → pivot_table (기존 screener 방식)
+2) candles 통합 테이블: CandleStore.load_panel (쿼리 1회)
+3) Arrow 아카이브: CandleArchive.load_panel (memory map + zero-copy view)
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from db.candle_archive import CandleArchive, write_dataset
+from db.candle_store import CandleStore, connect, write_candles
+
+
+def _synthetic(n_codes: int, n_days: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2019-07-01", periods=n_days).strftime("%Y-%m-%d")
+    codes = [f"{i:06d}.{'KOSPI' if i % 2 else 'KOSDAQ'}" for i in range(n_codes)]
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_codes, n_days)), axis=1))
+    return pd.DataFrame({
+        "code": np.repeat(codes, n_days),
+        "date": np.tile(dates, n_codes),
+        "open": close.ravel(), "high": close.ravel(), "low": close.ravel(), "close": close.ravel(),
+        "volume": rng.integers(1, 1_000_000, n_codes * n_days),
+    })
+
+
+def _measure(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    # 메모리는 별도 실행으로 측정 (tracemalloc이 켜져 있으면 시간이 왜곡됨)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms   peak {peak / 2**20:8.1f} MiB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--codes", type=int, default=500)
+    parser.add_argument("--days", type=int, default=1000)
+    args = parser.parse_args()
+
+    df = _synthetic(args.codes, args.days)
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "candle_data.db")
+        store_path = os.path.join(tmp, "candles.db")
+        archive_root = os.path.join(tmp, "archive")
+
+        with sqlite3.connect(legacy_path) as con:
+            for code, part in df.groupby("code", sort=False):
+                part.drop(columns="code").rename(columns={"date": "Date", "close": "Close"}).to_sql(code, con, index=False)
+        con = connect(store_path)
+        for code, part in df.groupby("code", sort=False):
+            write_candles(con, code, part)
+        con.commit()
+        con.close()
+        write_dataset("daily", df, root=archive_root)
+        print(f"{args.codes} codes x {args.days} days = {len(df):,} rows")
+
+        def legacy():
+            con = sqlite3.connect(legacy_path)
+            tables = [r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type='table';")]
+            dfs = [pd.read_sql(f"SELECT Date, Close FROM '{t}' WHERE Date>='2019-07-01'", con).assign(ticker=t) for t in tables]
+            con.close()
+            return pd.concat(dfs).pivot_table(index="Date", columns="ticker", values="Close")
+
+        def store():
+            with CandleStore(store_path) as s:
+                return s.load_panel("close", start="2019-07-01")
+
+        def archive():
+            return CandleArchive(archive_root).load_panel("close")[2]
+
+        a = _measure("per-ticker sqlite + pivot", legacy)
+        b = _measure("CandleStore.load_panel", store)
+        c = _measure("CandleArchive.load_panel", archive)
+        assert a.shape == b.shape == c.shape
+
+
+if __name__ == "__main__":
+    main()
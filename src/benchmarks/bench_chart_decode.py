@@ -0,0 +1,119 @@
+"""
+ka10081 페이지 디코딩 벤치마크 (합성 응답, 한 페이지 = 600행)
+
+    python -m benchmarks.bench_chart_decode --rows 600 --repeat 300
+
+- before: apply 기반 _convert_to_dataframe + _clean_price/_clean_int 정규화 (변경 전 구현)
+- after:  utils.decode_utils 기반 _convert_to_dataframe + _normalize_daily_df
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from api.stock_chart_service import StockChartService
+from trading.data_downloader import _normalize_daily_df
+
+
+def legacy_convert_to_dataframe(chart_data, is_intraday=False):
+    """변경 전 StockChartService._convert_to_dataframe"""
+    if not is_intraday:
+        columns = ['cur_prc', 'trde_qty', 'trde_prica', 'dt', 'open_pric', 'high_pric', 'low_pric']
+    else:
+        columns = ['cur_prc', 'trde_qty', 'cntr_tm', 'open_pric', 'high_pric', 'low_pric']
+    df = pd.DataFrame(chart_data, columns=columns)
+    for col in ['cur_prc', 'open_pric', 'high_pric', 'low_pric']:
+        df[col] = df[col].apply(lambda x: int(x.replace('+', '').replace('-', '')) if isinstance(x, str) else x)
+    df['trde_qty'] = pd.to_numeric(df['trde_qty'], errors='coerce')
+    if 'trde_prica' in df.columns:
+        df['trde_prica'] = pd.to_numeric(df['trde_prica'], errors='coerce')
+    if 'dt' in df.columns:
+        df['dt'] = pd.to_datetime(df['dt'], format='%Y%m%d')
+        df.set_index('dt', inplace=True)
+    else:
+        df['cntr_tm'] = pd.to_datetime(df['cntr_tm'], format='%Y%m%d%H%M%S')
+        df.set_index('cntr_tm', inplace=True)
+    df = df.rename(columns={'cur_prc': 'close', 'trde_qty': 'volume', 'open_pric': 'open',
+                            'high_pric': 'high', 'low_pric': 'low'})
+    return df.astype(int).sort_index()
+
+
+def _legacy_clean_price(x):
+    if x is None:
+        return None
+    s = "".join(ch for ch in str(x).strip().replace(",", "") if ch.isdigit() or ch in "+-.")
+    if s in ("", "+", "-"):
+        return None
+    try:
+        return float(s)
+    except Exception:
+        return None
+
+
+def _legacy_clean_int(x):
+    if x is None:
+        return None
+    s = "".join(ch for ch in str(x) if ch.isdigit())
+    return int(s) if s else None
+
+
+def legacy_normalize_daily_df(df):
+    """변경 전 data_downloader._normalize_daily_df (값 정리 부분)"""
+    df = df.reset_index().rename(columns={"dt": "date"})
+    for c in ("open", "high", "low", "close"):
+        df[c] = df[c].apply(_legacy_clean_price)
+    df["volume"] = df["volume"].apply(_legacy_clean_int)
+    df["date"] = df["date"].apply(lambda s: str(s).strip())
+    cols = ["date", "open", "high", "low", "close", "volume"]
+    return df[cols].dropna(subset=["date"]).drop_duplicates(subset=["date"]).sort_values("date").reset_index(drop=True)
+
+
+def synthetic_page(rows: int):
+    rng = random.Random(0)
+    dates = pd.bdate_range(end="2024-12-30", periods=rows)[::-1].strftime("%Y%m%d")
+    page = []
+    for dt in dates:
+        sign = rng.choice("+-")
+        page.append({
+            "cur_prc": f"{sign}{rng.randint(1000, 900000)}", "trde_qty": str(rng.randint(0, 10**7)),
+            "trde_prica": str(rng.randint(0, 10**6)), "dt": dt,
+            "open_pric": f"{sign}{rng.randint(1000, 900000)}", "high_pric": f"{sign}{rng.randint(1000, 900000)}",
+            "low_pric": f"{sign}{rng.randint(1000, 900000)}", "upd_stkpc_tp": "", "upd_rt": "",
+        })
+    return page
+
+
+def _bench(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=600)
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    page = synthetic_page(args.rows)
+    svc = StockChartService("bench")
+
+    before_conv = _bench(lambda: legacy_convert_to_dataframe(page), args.repeat)
+    after_conv = _bench(lambda: svc._convert_to_dataframe(page), args.repeat)
+    df = svc._convert_to_dataframe(page)
+    before_norm = _bench(lambda: legacy_normalize_daily_df(df), args.repeat)
+    after_norm = _bench(lambda: _normalize_daily_df(df), args.repeat)
+
+    print(f"page = {args.rows} rows (ms / page)")
+    print(f"{'':<22}{'before':>10}{'after':>10}{'speedup':>10}")
+    for label, b, a in (("_convert_to_dataframe", before_conv, after_conv),
+                        ("_normalize_daily_df", before_norm, after_norm),
+                        ("total", before_conv + before_norm, after_conv + after_norm)):
+        print(f"{label:<22}{b:>10.3f}{a:>10.3f}{b / a:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
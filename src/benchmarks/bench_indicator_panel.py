@@ -0,0 +1,74 @@
+"""
+전 종목 지표 계산 벤치마크 (종목별 루프 vs IndicatorPanel 한 번)
+
+    python -m benchmarks.bench_indicator_panel --codes 2500 --days 600
+    python -m benchmarks.bench_indicator_panel --codes 2500 --days 2500 --sample 100
+
+1) 종목별 루프: compute_indicators(pandas_ta 설치 시) 또는 IndicatorEngine.frame(새 엔진, 전체 이력)
+   --sample 종목만 돌려 전 종목 시간으로 환산
+2) IndicatorPanel: (날짜 × 종목) 배열로 36개 지표 전체를 한 번에 계산 + latest()
+"""
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from trading.indicator_engine import IndicatorEngine
+from trading.indicator_panel import IndicatorPanel
+from trading.indicators import compute_indicators, ta
+
+
+def _synthetic(n_codes: int, n_days: int):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2015-01-02", periods=n_days, name="date")
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_days, n_codes)), axis=0))
+    open_ = close * np.exp(rng.normal(0, 0.01, close.shape))
+    high = np.maximum(open_, close) * (1 + rng.random(close.shape) * 0.02)
+    low = np.minimum(open_, close) * (1 - rng.random(close.shape) * 0.02)
+    volume = rng.integers(1_000, 1_000_000, close.shape).astype(float)
+    # 일부 종목은 늦게 상장
+    listed = rng.integers(0, n_days // 3, n_codes) * (rng.random(n_codes) < 0.2)
+    for a in (open_, high, low, close, volume):
+        a[np.arange(n_days)[:, None] < listed] = np.nan
+    codes = [f"{i:06d}.{'KS' if i % 2 else 'KQ'}" for i in range(n_codes)]
+    return dates, codes, (open_, high, low, close, volume)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--codes", type=int, default=2500)
+    parser.add_argument("--days", type=int, default=600)
+    parser.add_argument("--sample", type=int, default=200, help="종목별 루프를 실제로 돌릴 종목 수")
+    args = parser.parse_args()
+
+    dates, codes, fields = _synthetic(args.codes, args.days)
+    today = datetime(2030, 1, 1)
+    sample = min(args.sample, args.codes)
+    frames = {}
+    for j, code in enumerate(codes[:sample]):
+        df = pd.DataFrame({name: a[:, j] for name, a in zip(("open", "high", "low", "close", "volume"), fields)},
+                          index=dates)
+        frames[code] = df.dropna()
+
+    label = "compute_indicators" if ta is not None else "IndicatorEngine.frame"
+    start = time.perf_counter()
+    for code, df in frames.items():
+        if ta is not None:
+            compute_indicators(df.copy())
+        else:
+            IndicatorEngine("unused.pkl").frame(code, df, today=today)
+    loop = (time.perf_counter() - start) / sample * args.codes
+    print(f"{args.codes} codes × {args.days} days")
+    print(f"per-ticker {label:<22} {loop:8.3f} s (est. from {sample} codes)")
+
+    start = time.perf_counter()
+    panel = IndicatorPanel(dates, codes, *fields, today=today)
+    latest = panel.latest()
+    elapsed = time.perf_counter() - start
+    print(f"IndicatorPanel + latest()          {elapsed:8.3f} s   x{loop / elapsed:.1f}   ({len(latest)} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+JSON 코덱 마이크로 벤치마크 (REAL / CNSRREQ / ka10081)
+
+    python -m benchmarks.bench_json_codec
+    python -m benchmarks.bench_json_codec --capture-dir captures/   # 실제 수신 프레임(*.json)으로 측정
+
+--capture-dir의 파일명 앞부분이 payload 이름이 됩니다 (예: REAL_0B.json, CNSRREQ.json, ka10081.json).
+캡처가 없으면 키움 응답 형식을 따르는 합성 payload를 사용합니다.
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+from benchmarks.bench_chart_decode import synthetic_page
+from utils import json_codec
+
+
+def _real_frame(n_items: int = 20) -> dict:
+    rng = random.Random(1)
+    data = []
+    for i in range(n_items):
+        price = rng.randint(1000, 900000)
+        data.append({
+            "type": "0B", "name": "주식체결", "item": f"{i:06d}",
+            "values": {
+                "20": "093015", "10": f"+{price}", "11": "+500", "12": "+0.70", "27": f"+{price + 100}",
+                "28": f"+{price}", "15": f"+{rng.randint(1, 999)}", "13": str(rng.randint(1, 10**7)),
+                "14": str(rng.randint(1, 10**6)), "16": f"+{price - 500}", "17": f"+{price + 900}",
+                "18": f"+{price - 900}", "25": "2", "26": "-1200", "29": "+12345", "30": "-98.5",
+                "31": "0.05", "32": "15", "228": "98.70", "311": "4270000", "290": "2", "691": "0",
+                "567": "0", "568": "0", "851": "", "1890": "", "1891": "", "1892": "", "1030": "", "1031": "",
+                "1032": "", "1071": "", "1072": "", "1313": "", "1315": "", "1316": "", "1314": "", "1497": "",
+                "1498": "", "620": "", "732": "", "852": "", "9081": "1",
+            },
+        })
+    return {"trnm": "REAL", "data": data}
+
+
+def _cnsrreq_frame(n_items: int = 100) -> dict:
+    rng = random.Random(2)
+    data = []
+    for i in range(n_items):
+        price = rng.randint(1000, 900000)
+        data.append({
+            "9001": f"A{i:06d}", "302": f"종목{i}", "10": f"{price:09d}", "25": "2",
+            "11": f"-{rng.randint(0, 9999):08d}", "12": f"-{rng.randint(0, 999):09d}",
+            "13": f"{rng.randint(0, 10**7):010d}", "16": f"{price:09d}", "17": f"{price:09d}", "18": f"{price:09d}",
+        })
+    return {"trnm": "CNSRREQ", "seq": "1", "cont_yn": "N", "next_key": "", "return_code": 0,
+            "return_msg": "", "data": data}
+
+
+def _ka10081_page() -> dict:
+    return {"stk_cd": "005930", "stk_dt_pole_chart_qry": synthetic_page(600),
+            "return_code": 0, "return_msg": "정상적으로 처리되었습니다"}
+
+
+def load_payloads(capture_dir=None):
+    if capture_dir:
+        payloads = {}
+        for fname in sorted(os.listdir(capture_dir)):
+            if fname.endswith(".json"):
+                with open(os.path.join(capture_dir, fname), "rb") as f:
+                    payloads[fname[:-5]] = f.read()
+        return payloads
+    return {name: json.dumps(obj, ensure_ascii=False).encode("utf-8") for name, obj in (
+        ("REAL_0B", _real_frame()), ("CNSRREQ", _cnsrreq_frame()), ("ka10081", _ka10081_page()),
+    )}
+
+
+def _bench(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--capture-dir", default=None)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.capture_dir)
+    backends = ["stdlib"]
+    if json_codec.set_backend("orjson") == "orjson":
+        backends.append("orjson")
+
+    print(f"{'payload':<12}{'bytes':>9}" + "".join(f"{b + ' loads':>15}{b + ' dumps':>15}" for b in backends) + "   (us / call)")
+    for name, raw in payloads.items():
+        obj = json.loads(raw)
+        row = f"{name:<12}{len(raw):>9}"
+        for backend in backends:
+            json_codec.set_backend(backend)
+            row += f"{_bench(lambda: json_codec.loads(raw), args.repeat):>15.1f}"
+            row += f"{_bench(lambda: json_codec.dumps(obj), args.repeat):>15.1f}"
+        print(row)
+    json_codec.set_backend("auto")
+
+
+if __name__ == "__main__":
+    main()
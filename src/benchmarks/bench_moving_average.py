@@ -0,0 +1,63 @@
+"""
+moving_average 벤치마크 (rolling().apply 구현 대비 numpy 커널)
+
+    python -m benchmarks.bench_moving_average
+    python -m benchmarks.bench_moving_average --bars 600 2520 --lengths 20 60 --repeat 50
+
+600봉(스크리너 기본 조회 길이)과 10년 일봉(약 2520봉) 종가로 WMA/HMA를 비교.
+SMA/EMA는 구현 변경이 없어 참고용으로만 측정합니다.
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from trading.indicators import moving_average
+
+
+def _rolling_wma(s: pd.Series, n: int) -> pd.Series:
+    weights = np.arange(1, n + 1)
+    return s.rolling(window=n).apply(lambda x: np.dot(x, weights) / weights.sum(), raw=True)
+
+
+def _rolling_hma(s: pd.Series, n: int) -> pd.Series:
+    diff = 2 * _rolling_wma(s, int(n / 2)) - _rolling_wma(s, n)
+    return _rolling_wma(diff, int(np.sqrt(n)))
+
+
+def _measure(label, fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    p50 = statistics.median(times)
+    print(f"{label:<36} p50 {p50 * 1000:8.3f} ms   max {max(times) * 1000:8.3f} ms")
+    return p50
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bars", type=int, nargs="+", default=[600, 2520])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[20, 60])
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for bars in args.bars:
+        close = pd.Series(10000 * np.exp(np.cumsum(rng.normal(0, 0.02, bars))), name="close")
+        print(f"\n[{bars} bars]")
+        for length in args.lengths:
+            for ma_type, old in (("WMA", _rolling_wma), ("HMA", _rolling_hma)):
+                before = _measure(f"{ma_type}({length}) rolling.apply", lambda: old(close, length), args.repeat)
+                after = _measure(f"{ma_type}({length}) numpy", lambda: moving_average(close, length, ma_type),
+                                 args.repeat)
+                print(f"{'':<36} x{before / after:.1f}")
+            for ma_type in ("SMA", "EMA"):
+                _measure(f"{ma_type}({length}) pandas", lambda: moving_average(close, length, ma_type), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
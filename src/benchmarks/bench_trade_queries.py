@@ -0,0 +1,148 @@
+"""
+executions / trades 조회 벤치마크 (합성 데이터, 인덱스 추가 전후 비교)
+
+    python -m benchmarks.bench_trade_queries --execs 300000
+    python -m benchmarks.bench_trade_queries --url postgresql+psycopg2://user:pw@localhost/bench_db
+
+1) 미청산 BUY 조회 (_fetch_open_buy_executions, FIFO 매칭/원장 적재 경로)
+2) list_trades(account_id, ticker, 기간)
+--url 을 주면 해당 DB에 테이블을 새로 만들고 지웁니다 (빈 테스트용 DB를 사용하세요).
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# ensure_indexes()가 만드는 인덱스 (models.trade_entities __table_args__)
+NEW_INDEXES = {
+    "orders": ["ix_orders_status"],
+    "executions": ["ix_executions_open_buy", "ix_executions_account_ticker_side"],
+    "trades": ["ix_trades_account_ticker_closed"],
+}
+
+T0 = datetime(2024, 1, 2, 9, 0, 0)
+
+
+def _seed(engine, Execution, Trade, n_execs: int, n_accounts: int, n_tickers: int, open_ratio: float):
+    rng = np.random.default_rng(0)
+    acc = rng.integers(0, n_accounts, n_execs)
+    tic = rng.integers(0, n_tickers, n_execs)
+    side = np.where(rng.random(n_execs) < 0.5, "BUY", "SELL")
+    is_open = (side == "BUY") & (rng.random(n_execs) < open_ratio)
+    minutes = np.sort(rng.integers(0, 60 * 24 * 365, n_execs))
+    rows = [{
+        "exec_id": f"E{i}", "order_no": f"O{i}", "account_id": f"ACC{acc[i]}", "ticker": f"{tic[i]:06d}",
+        "market": "KRX", "side": side[i], "qty": 10, "price": 1000, "commission": 0, "tax": 0,
+        "exec_time": T0 + timedelta(minutes=int(minutes[i])), "remaining_qty": 5 if is_open[i] else 0,
+    } for i in range(n_execs)]
+    trades = [{
+        "account_id": r["account_id"], "ticker": r["ticker"], "market": "KRX", "broker_code": "KIWOOM",
+        "qty": 10, "buy_avg_price": 1000, "sell_avg_price": 1010, "buy_value": 10000, "sell_value": 10100,
+        "buy_commission": 0, "sell_commission": 0, "sell_tax": 0, "pnl_gross": 100, "pnl_net": 100,
+        "pnl_net_pct": 0.01, "buy_exec_ids": "", "sell_exec_ids": r["exec_id"],
+        "opened_at": r["exec_time"], "closed_at": r["exec_time"], "holding_seconds": 0,
+    } for r in rows if r["side"] == "SELL"]
+    with engine.begin() as conn:
+        for i in range(0, len(rows), 20000):
+            conn.execute(Execution.__table__.insert(), rows[i:i + 20000])
+        for i in range(0, len(trades), 20000):
+            conn.execute(Trade.__table__.insert(), trades[i:i + 20000])
+    return len(rows), len(trades), int(is_open.sum())
+
+
+def _drop_new_indexes(engine):
+    with engine.begin() as conn:
+        for names in NEW_INDEXES.values():
+            for name in names:
+                conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("ANALYZE")
+        else:
+            conn.exec_driver_sql("ANALYZE executions; ANALYZE trades")
+
+
+def _explain(engine, stmt) -> str:
+    compiled = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(prefix + str(compiled)).all()
+    return "\n".join("    " + str(r[-1]) for r in rows)
+
+
+def _measure(label, fn, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    print(f"{label:<36} p50 {statistics.median(times) * 1000:8.3f} ms   "
+          f"max {max(times) * 1000:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--execs", type=int, default=300_000)
+    parser.add_argument("--accounts", type=int, default=4)
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--open-ratio", type=float, default=0.02)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = args.url or f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+    # DATABASE_URL을 정한 뒤에 import (db.db가 import 시점에 engine 생성)
+    from sqlalchemy import select
+    from db.db import SessionLocal, _fetch_open_buy_executions, engine, ensure_indexes
+    from models.trade_entities import Base, Execution, Trade
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    try:
+        n_execs, n_trades, n_open = _seed(engine, Execution, Trade, args.execs, args.accounts, args.tickers,
+                                          args.open_ratio)
+        print(f"{engine.dialect.name}: executions {n_execs:,} (open BUY {n_open:,}), trades {n_trades:,}")
+
+        rng = np.random.default_rng(1)
+        keys = [(f"ACC{a}", f"{t:06d}") for a, t in zip(rng.integers(0, args.accounts, args.repeat),
+                                                       rng.integers(0, args.tickers, args.repeat))]
+        start, end = T0 + timedelta(days=90), T0 + timedelta(days=120)
+
+        def open_buys():
+            with SessionLocal() as s:
+                for acc, ticker in keys:
+                    _fetch_open_buy_executions(s, acc, ticker)
+
+        def trades_stmt(acc, ticker):
+            return select(Trade).where(Trade.account_id == acc, Trade.ticker == ticker,
+                                       Trade.closed_at >= start, Trade.closed_at < end)
+
+        def list_trades():
+            with SessionLocal() as s:
+                for acc, ticker in keys:
+                    s.execute(trades_stmt(acc, ticker)).scalars().all()
+
+        open_stmt = (select(Execution)
+                     .where(Execution.account_id == keys[0][0], Execution.ticker == keys[0][1],
+                            Execution.side == "BUY", Execution.remaining_qty > 0)
+                     .order_by(Execution.exec_time.asc(), Execution.id.asc()))
+
+        for label, setup in (("before", _drop_new_indexes), ("after", ensure_indexes)):
+            setup(engine)
+            print(f"\n[{label}]")
+            print(_explain(engine, open_stmt))
+            print(_explain(engine, trades_stmt(*keys[0])))
+            # 쿼리 1건당 시간으로 환산하려면 repeat로 나누면 됨
+            _measure(f"open BUY x{args.repeat}", open_buys, 5)
+            _measure(f"list_trades x{args.repeat}", list_trades, 5)
+    finally:
+        Base.metadata.drop_all(engine)
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
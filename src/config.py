@@ -30,6 +30,18 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 
 USE_MOCK = bool(os.getenv("USE_MOCK"))
 
+# REST 커넥션 풀 / 타임아웃
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", 4))   # 호스트별 풀 개수
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 16))                # 풀당 최대 커넥션 수
+HTTP_KEEP_ALIVE = os.getenv("HTTP_KEEP_ALIVE", "1") != "0"
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 10))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 0))
+
+# REST 호출 제한 (초당 호출 수). 예) RATE_LIMIT_BUDGETS="ka10081=3,kt10000=5"
+RATE_LIMIT_GLOBAL = float(os.getenv("RATE_LIMIT_GLOBAL", 5))
+RATE_LIMIT_BUDGETS = os.getenv("RATE_LIMIT_BUDGETS", "ka10081=3,ka10080=3,kt10000=5,kt10001=5")
+
 class AppConfig:
     def __init__(self):
         self.domain = APP_DOMAIN
@@ -46,6 +58,28 @@ class DBConfig:
         self.user = DB_USER
         self.password = DB_PASSWORD
 
+class HttpConfig:
+    def __init__(self):
+        self.pool_connections = HTTP_POOL_CONNECTIONS
+        self.pool_size = HTTP_POOL_SIZE
+        self.keep_alive = HTTP_KEEP_ALIVE
+        self.connect_timeout = HTTP_CONNECT_TIMEOUT
+        self.read_timeout = HTTP_READ_TIMEOUT
+        self.max_retries = HTTP_MAX_RETRIES
+
+    @property
+    def timeout(self):
+        return (self.connect_timeout, self.read_timeout)
+
+class RateLimitConfig:
+    def __init__(self):
+        self.global_rate = RATE_LIMIT_GLOBAL
+        self.budgets = {}
+        for item in RATE_LIMIT_BUDGETS.split(","):
+            if "=" in item:
+                api_id, rate = item.split("=", 1)
+                self.budgets[api_id.strip()] = float(rate)
+
 class LogConfig:
     def __init__(self):
         self.level = LOG_LEVEL
@@ -55,6 +89,8 @@ class Config:
     def __init__(self):
         self.app = AppConfig()
         self.db = DBConfig()
+        self.http = HttpConfig()
+        self.rate_limit = RateLimitConfig()
         self.log = LogConfig()
 
 # 설정 객체 생성
@@ -0,0 +1,239 @@
+# src/db/candle_archive.py
+"""
+일봉 / 펀더멘털 컬럼형 아카이브 (Arrow IPC, 선택 기능)
+
+레이아웃:
+    {root}/{dataset}/market={시장}/year={연도}.arrow
+    - dataset: 'daily' (일봉), 'fundamental' (펀더멘털)
+    - code: dictionary<int32, string>, date: timestamp[s] (자정), 나머지 값 컬럼: float64 (결측은 NaN)
+
+비압축 IPC 파일을 memory map으로 열기 때문에 값 컬럼은 복사 없이 numpy view로 읽힙니다.
+pyarrow가 없으면 이 모듈의 함수 호출 시 RuntimeError가 발생합니다 (다른 기능에는 영향 없음).
+
+    python -m db.candle_archive export-candles [--start 2024-01-01]
+    python -m db.candle_archive export-fundamentals --src sqlite3/fundamental.db
+"""
+import argparse
+import os
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+CANDLE_ARCHIVE_DIR = os.getenv("CANDLE_ARCHIVE_DIR", os.path.join(project_root, "archive"))
+
+DAILY = "daily"
+FUNDAMENTAL = "fundamental"
+NO_MARKET = "ALL"  # 코드에 시장 접미사가 없는 데이터(펀더멘털 등)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("컬럼형 아카이브에는 pyarrow가 필요합니다: pip install pyarrow") from e
+    return pa
+
+
+def _market_of(code: str) -> str:
+    return code.split('.', 1)[1] if '.' in code else NO_MARKET
+
+
+def _partition_path(root: str, dataset: str, market: str, year: int) -> str:
+    return os.path.join(root, dataset, f"market={market}", f"year={year}.arrow")
+
+
+def _to_table(df: pd.DataFrame, fields: Sequence[str]):
+    pa = _require_pyarrow()
+    arrays = [
+        pa.array(df["code"].astype(str).to_numpy(), type=pa.string()).dictionary_encode(),
+        # date32는 numpy 변환 시 복사가 필요하므로 datetime64[s]와 메모리 레이아웃이 같은 timestamp[s]로 저장
+        pa.array(df["date"].to_numpy(dtype="datetime64[s]"), type=pa.timestamp("s")),
+    ]
+    names = ["code", "date"]
+    for field in fields:
+        arrays.append(pa.array(pd.to_numeric(df[field], errors="coerce").to_numpy(dtype=np.float64), type=pa.float64()))
+        names.append(field)
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def write_dataset(dataset: str, df: pd.DataFrame, fields: Optional[Sequence[str]] = None,
+                  root: str = CANDLE_ARCHIVE_DIR) -> Dict[Tuple[str, int], int]:
+    """
+    long format DataFrame(code, date, 값 컬럼...)을 market/year 파티션 파일로 저장합니다.
+    각 파티션 파일은 통째로 교체되므로, df에는 해당 연도 데이터 전체가 들어 있어야 합니다.
+    반환: {(market, year): 행 수}
+    """
+    pa = _require_pyarrow()
+    if fields is None:
+        fields = [c for c in df.columns if c not in ("code", "date")]
+    frame = df.copy()
+    frame["date"] = pd.to_datetime(frame["date"].astype(str).str[:10], format="mixed")
+    frame["_market"] = frame["code"].astype(str).map(_market_of)
+    frame["_year"] = frame["date"].dt.year
+
+    written = {}
+    for (market, year), part in frame.groupby(["_market", "_year"], sort=True):
+        part = part.sort_values(["code", "date"]).drop_duplicates(["code", "date"], keep="last")
+        table = _to_table(part, fields)
+        path = _partition_path(root, dataset, market, int(year))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with pa.OSFile(tmp, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table.combine_chunks())
+        os.replace(tmp, path)  # 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 교체
+        written[(market, int(year))] = table.num_rows
+    return written
+
+
+def export_candles_from_store(store_path: Optional[str] = None, start: Optional[str] = None,
+                              root: str = CANDLE_ARCHIVE_DIR) -> Dict[Tuple[str, int], int]:
+    """
+    candles 통합 테이블 → daily 아카이브.
+    start가 주어지면 그 해 1월 1일부터 다시 씁니다 (파티션 단위 교체이므로 연 단위로 내림).
+    """
+    from db.candle_store import CANDLE_STORE_PATH, CandleStore, PRICE_FIELDS
+
+    if start:
+        start = f"{str(start)[:4]}-01-01"
+    with CandleStore(store_path or CANDLE_STORE_PATH) as store:
+        df = store.load(start=start)
+    if df.empty:
+        return {}
+    return write_dataset(DAILY, df, PRICE_FIELDS, root=root)
+
+
+def export_fundamentals_from_sqlite(src_path: str, root: str = CANDLE_ARCHIVE_DIR) -> Dict[Tuple[str, int], int]:
+    """fundamental.db (날짜별 테이블, index=티커) → fundamental 아카이브"""
+    con = sqlite3.connect(src_path)
+    try:
+        tables = [r[0] for r in con.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' ORDER BY name;").fetchall()]
+        frames = []
+        for table in tables:
+            if not (len(table) == 8 and table.isdigit()):
+                continue
+            df = pd.read_sql(f"SELECT * FROM '{table}'", con)
+            df = df.rename(columns={df.columns[0]: "code"}).assign(date=table)
+            frames.append(df)
+    finally:
+        con.close()
+    if not frames:
+        return {}
+    df = pd.concat(frames, ignore_index=True)
+    df["date"] = pd.to_datetime(df["date"], format="%Y%m%d")
+    return write_dataset(FUNDAMENTAL, df, root=root)
+
+
+class CandleArchive:
+    """
+    memory map 기반 아카이브 리더.
+    archive = CandleArchive()
+    dates, codes, close = archive.load_panel('close', markets=['KOSPI', 'KOSDAQ'], years=range(2019, 2026))
+    """
+    def __init__(self, root: str = CANDLE_ARCHIVE_DIR):
+        self.root = root
+
+    def partitions(self, dataset: str = DAILY, markets: Optional[Iterable[str]] = None,
+                   years: Optional[Iterable[int]] = None) -> List[str]:
+        base = os.path.join(self.root, dataset)
+        if not os.path.isdir(base):
+            return []
+        markets = set(markets) if markets is not None else None
+        years = {int(y) for y in years} if years is not None else None
+        paths = []
+        for mdir in sorted(os.listdir(base)):
+            if not mdir.startswith("market="):
+                continue
+            if markets is not None and mdir[len("market="):] not in markets:
+                continue
+            for fname in sorted(os.listdir(os.path.join(base, mdir))):
+                if not (fname.startswith("year=") and fname.endswith(".arrow")):
+                    continue
+                if years is not None and int(fname[len("year="):-len(".arrow")]) not in years:
+                    continue
+                paths.append(os.path.join(base, mdir, fname))
+        return paths
+
+    def _open(self, path: str):
+        pa = _require_pyarrow()
+        source = pa.memory_map(path, "r")
+        return pa.ipc.open_file(source).read_all()
+
+    def read_table(self, dataset: str = DAILY, markets=None, years=None, columns: Optional[Sequence[str]] = None):
+        """선택한 파티션들을 하나의 pyarrow.Table로 (복사 없이 chunk로 이어 붙임)"""
+        pa = _require_pyarrow()
+        tables = [self._open(p) for p in self.partitions(dataset, markets, years)]
+        if not tables:
+            return None
+        if columns is not None:
+            tables = [t.select(["code", "date", *[c for c in columns if c not in ("code", "date")]]) for t in tables]
+        return pa.concat_tables(tables, promote_options="permissive")
+
+    def iter_views(self, dataset: str = DAILY, markets=None, years=None,
+                   columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        파티션별 zero-copy numpy view.
+        yield {'codes': 코드 사전(list), 'code_idx': int32 view, 'date': datetime64[s] view, 필드: float64 view}
+        """
+        for path in self.partitions(dataset, markets, years):
+            table = self._open(path)
+            if table.num_rows == 0:
+                continue
+            code_col = table.column("code").chunk(0)
+            views = {
+                "codes": code_col.dictionary.to_pylist(),
+                "code_idx": code_col.indices.to_numpy(zero_copy_only=True),
+                "date": table.column("date").chunk(0).to_numpy(zero_copy_only=True),
+            }
+            names = columns if columns is not None else [n for n in table.column_names if n not in ("code", "date")]
+            for name in names:
+                views[name] = table.column(name).chunk(0).to_numpy(zero_copy_only=True)
+            yield views
+
+    def load_panel(self, field: str = "close", dataset: str = DAILY, markets=None, years=None):
+        """
+        date × code 패널을 view에서 바로 채워 반환 (중간 DataFrame/concat/pivot 없음)
+        반환: (dates: datetime64[D] 배열, codes: list, values: float64 2차원 배열, 없는 칸은 NaN)
+        """
+        parts = list(self.iter_views(dataset, markets, years, columns=[field]))
+        if not parts:
+            return np.array([], dtype="datetime64[D]"), [], np.empty((0, 0))
+        dates = np.unique(np.concatenate([p["date"] for p in parts]))
+        codes = sorted({c for p in parts for c in p["codes"]})
+        code_pos = {c: i for i, c in enumerate(codes)}
+
+        values = np.full((len(dates), len(codes)), np.nan, dtype=np.float64)
+        for p in parts:
+            remap = np.fromiter((code_pos[c] for c in p["codes"]), dtype=np.int64, count=len(p["codes"]))
+            values[np.searchsorted(dates, p["date"]), remap[p["code_idx"]]] = p[field]
+        return dates.astype("datetime64[D]"), codes, values
+
+    def load_frame(self, field: str = "close", dataset: str = DAILY, markets=None, years=None) -> pd.DataFrame:
+        """load_panel 결과를 DataFrame(index=date, columns=code)으로"""
+        dates, codes, values = self.load_panel(field, dataset, markets, years)
+        return pd.DataFrame(values, index=pd.DatetimeIndex(dates, name="date"), columns=codes, copy=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="컬럼형 아카이브 도구")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export-candles", help="candles 통합 테이블 → daily 아카이브")
+    exp.add_argument("--start", default=None, help="이 날짜가 속한 연도부터 다시 씀 (기본: 전체)")
+    fun = sub.add_parser("export-fundamentals", help="fundamental.db → fundamental 아카이브")
+    fun.add_argument("--src", default=os.path.join(project_root, "sqlite3", "fundamental.db"))
+    args = parser.parse_args(argv)
+
+    if args.command == "export-candles":
+        written = export_candles_from_store(start=args.start)
+    else:
+        written = export_fundamentals_from_sqlite(args.src)
+    print(f"[ARCHIVE] {len(written)}개 파티션 / {sum(written.values())}행 기록")
+
+
+if __name__ == "__main__":
+    main()
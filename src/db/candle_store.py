@@ -0,0 +1,272 @@
+# src/db/candle_store.py
+"""
+일봉 통합 저장소 (SQLite, long format)
+
+종목마다 테이블을 만들던 candle_data.db 대신 candles(code, date) 하나의 테이블에 저장합니다.
+- code: 기존 테이블명과 같은 '종목코드.시장' (예: '005930.KOSPI')
+- date: 'YYYY-MM-DD'
+여러 종목 × 여러 날짜를 한 번의 쿼리로 읽어 DataFrame / numpy 배열로 돌려줍니다.
+
+마이그레이션:
+    python -m db.candle_store migrate --src sqlite3/candle_data.db --dst sqlite3/candles.db
+"""
+import argparse
+import os
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+CANDLE_STORE_PATH = os.getenv("CANDLE_STORE_PATH", os.path.join(project_root, "sqlite3", "candles.db"))
+
+CANDLE_TABLE = "candles"
+# 지표 캐시 (trading.indicator_cache). 캔들을 쓰면 같은 트랜잭션에서 해당 종목 캐시를 지움
+INDICATOR_CACHE_TABLE = "indicator_cache"
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def ensure_schema(con: sqlite3.Connection):
+    """candles 테이블 / 인덱스 생성"""
+    con.execute(f"""
+    CREATE TABLE IF NOT EXISTS {CANDLE_TABLE} (
+        code   TEXT NOT NULL,
+        date   TEXT NOT NULL,
+        open   REAL,
+        high   REAL,
+        low    REAL,
+        close  REAL,
+        volume INTEGER,
+        PRIMARY KEY (code, date)
+    ) WITHOUT ROWID;
+    """)
+    # 횡단면 조회(특정 날짜의 전 종목)용
+    con.execute(f"CREATE INDEX IF NOT EXISTS ix_{CANDLE_TABLE}_date_code ON {CANDLE_TABLE} (date, code);")
+    # ticker: 시장 구분 없는 종목코드 ('005930') — candles는 '005930.KOSPI', 분석은 '005930.KS'로 부름
+    con.execute(f"""
+    CREATE TABLE IF NOT EXISTS {INDICATOR_CACHE_TABLE} (
+        ticker    TEXT NOT NULL,
+        last_date TEXT NOT NULL,
+        version   TEXT NOT NULL,
+        bar       TEXT NOT NULL,
+        vals      TEXT NOT NULL,
+        used_at   REAL NOT NULL,
+        PRIMARY KEY (ticker, last_date, version)
+    );
+    """)
+    con.execute(f"CREATE INDEX IF NOT EXISTS ix_{INDICATOR_CACHE_TABLE}_used_at ON {INDICATOR_CACHE_TABLE} (used_at);")
+    con.commit()
+
+
+def connect(path: str = CANDLE_STORE_PATH, timeout: float = 30) -> sqlite3.Connection:
+    """WAL 모드 커넥션 (스키마 보장)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    con = sqlite3.connect(path, timeout=timeout)
+    con.execute("PRAGMA journal_mode=WAL;")
+    con.execute("PRAGMA synchronous=NORMAL;")
+    ensure_schema(con)
+    return con
+
+
+def _normalize_dates(values) -> pd.Series:
+    """'20240102', '2024-01-02', '2024-01-02 00:00:00', Timestamp → 'YYYY-MM-DD'"""
+    s = pd.Series(values).astype(str).str.strip()
+    compact = s.str.fullmatch(r"\d{8}")
+    s = s.where(~compact, s.str[0:4] + "-" + s.str[4:6] + "-" + s.str[6:8])
+    return s.str[:10]
+
+
+def last_date(con: sqlite3.Connection, code: str) -> Optional[str]:
+    """종목의 마지막 저장 날짜 (PK 인덱스 사용)"""
+    row = con.execute(f"SELECT MAX(date) FROM {CANDLE_TABLE} WHERE code = ?;", (code,)).fetchone()
+    return row[0] if row and row[0] else None
+
+
+def last_dates(con: sqlite3.Connection) -> Dict[str, str]:
+    """전 종목의 마지막 저장 날짜"""
+    return dict(con.execute(f"SELECT code, MAX(date) FROM {CANDLE_TABLE} GROUP BY code;").fetchall())
+
+
+def write_candles(con: sqlite3.Connection, code: str, df: pd.DataFrame) -> int:
+    """
+    표준 컬럼(date, open, high, low, close, volume) DataFrame을 저장 (같은 날짜는 덮어씀)
+    해당 종목의 지표 캐시도 함께 삭제. commit은 호출자 책임. 반환: 저장 행 수
+    """
+    if df is None or df.empty:
+        return 0
+    frame = pd.DataFrame({
+        "code": code,
+        "date": _normalize_dates(df["date"].to_numpy()),
+    })
+    for field in PRICE_FIELDS:
+        frame[field] = df[field].to_numpy() if field in df.columns else None
+    frame = frame.astype(object).where(frame.notna(), None)
+    con.executemany(
+        f"""
+        INSERT INTO {CANDLE_TABLE} (code, date, open, high, low, close, volume)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(code, date) DO UPDATE SET
+            open = excluded.open, high = excluded.high, low = excluded.low,
+            close = excluded.close, volume = excluded.volume;
+        """,
+        frame.itertuples(index=False, name=None),
+    )
+    con.execute(f"DELETE FROM {INDICATOR_CACHE_TABLE} WHERE ticker = ?;", (code.split(".")[0],))
+    return len(frame)
+
+
+def _select(codes: Optional[Sequence[str]], start: Optional[str], end: Optional[str],
+            fields: Sequence[str], con: sqlite3.Connection) -> Tuple[str, list]:
+    """codes가 많아도 한 번에 조회하도록 임시 테이블과 JOIN"""
+    cols = ", ".join(f"c.{f}" for f in fields)
+    sql = f"SELECT c.code, c.date, {cols} FROM {CANDLE_TABLE} c"
+    params: list = []
+    if codes is not None:
+        con.execute("CREATE TEMP TABLE IF NOT EXISTS _want_codes (code TEXT PRIMARY KEY);")
+        con.execute("DELETE FROM _want_codes;")
+        con.executemany("INSERT OR IGNORE INTO _want_codes (code) VALUES (?);", ((c,) for c in codes))
+        sql += " JOIN _want_codes w ON w.code = c.code"
+    where = []
+    if start:
+        where.append("c.date >= ?")
+        params.append(start)
+    if end:
+        where.append("c.date <= ?")
+        params.append(end)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return sql, params
+
+
+class CandleStore:
+    """
+    candles 테이블 읽기/쓰기 클라이언트.
+    with CandleStore() as store:
+        df = store.load(codes, start='2019-07-01')
+    """
+    def __init__(self, path: str = CANDLE_STORE_PATH):
+        self.path = path
+        self.con: Optional[sqlite3.Connection] = None
+
+    def connect(self) -> sqlite3.Connection:
+        if self.con is None:
+            self.con = connect(self.path)
+        return self.con
+
+    def close(self):
+        if self.con is not None:
+            self.con.close()
+            self.con = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -----------------------------
+    # 쓰기
+    # -----------------------------
+    def upsert(self, code: str, df: pd.DataFrame) -> int:
+        con = self.connect()
+        saved = write_candles(con, code, df)
+        con.commit()
+        return saved
+
+    # -----------------------------
+    # 조회
+    # -----------------------------
+    def codes(self) -> List[str]:
+        rows = self.connect().execute(f"SELECT DISTINCT code FROM {CANDLE_TABLE} ORDER BY code;").fetchall()
+        return [r[0] for r in rows]
+
+    def last_dates(self) -> Dict[str, str]:
+        return last_dates(self.connect())
+
+    def load(self, codes: Optional[Iterable[str]] = None, start: Optional[str] = None,
+             end: Optional[str] = None, fields: Sequence[str] = PRICE_FIELDS) -> pd.DataFrame:
+        """
+        N종목 × M일 일봉을 한 번의 쿼리로 조회 (long format: code, date, fields...)
+        codes=None이면 전 종목. 정렬: code, date
+        """
+        con = self.connect()
+        sql, params = _select(list(codes) if codes is not None else None, start, end, fields, con)
+        return pd.read_sql(sql + " ORDER BY c.code, c.date;", con, params=params)
+
+    def load_panel(self, field: str = "close", codes: Optional[Iterable[str]] = None,
+                   start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """date × code 형태의 단일 필드 패널 (예: 전 종목 종가)"""
+        df = self.load(codes, start, end, fields=(field,))
+        return df.pivot(index="date", columns="code", values=field)
+
+    def load_array(self, codes: Optional[Iterable[str]] = None, start: Optional[str] = None,
+                   end: Optional[str] = None, fields: Sequence[str] = PRICE_FIELDS):
+        """
+        연속 메모리 배열로 조회.
+        반환: (dates, codes, values) — values.shape == (len(fields), len(dates), len(codes)), 없는 칸은 NaN
+        """
+        df = self.load(codes, start, end, fields=fields)
+        date_idx, dates = pd.factorize(df["date"], sort=True)
+        code_idx, code_list = pd.factorize(df["code"], sort=True)
+        values = np.full((len(fields), len(dates), len(code_list)), np.nan, dtype=np.float64)
+        for i, field in enumerate(fields):
+            values[i, date_idx, code_idx] = df[field].to_numpy(dtype=np.float64, na_value=np.nan)
+        return np.asarray(dates), list(code_list), values
+
+
+# -----------------------------
+# 마이그레이션 (종목별 테이블 → candles)
+# -----------------------------
+_LEGACY_COLUMNS = {"date": "date", "open": "open", "high": "high", "low": "low", "close": "close", "volume": "volume"}
+
+
+def migrate_per_ticker_db(src_path: str, dst_path: str = CANDLE_STORE_PATH, commit_every: int = 200) -> Dict[str, int]:
+    """
+    기존 candle_data.db(종목별 테이블)를 candles 테이블로 옮깁니다.
+    컬럼명은 대소문자 무시(Date/date 등), date/close가 없는 테이블은 건너뜁니다.
+    반환: {'tables': 옮긴 테이블 수, 'rows': 행 수, 'skipped': 건너뛴 테이블 수}
+    """
+    src = sqlite3.connect(src_path)
+    dst = connect(dst_path)
+    stats = {"tables": 0, "rows": 0, "skipped": 0}
+    try:
+        tables = [r[0] for r in src.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' AND name NOT LIKE '\\_%' ESCAPE '\\';"
+        ).fetchall()]
+        for n, table in enumerate(tables, 1):
+            cols = [r[1] for r in src.execute(f"PRAGMA table_info('{table}');").fetchall()]
+            mapping = {c: _LEGACY_COLUMNS[c.lower()] for c in cols if c.lower() in _LEGACY_COLUMNS}
+            if "date" not in mapping.values() or "close" not in mapping.values():
+                stats["skipped"] += 1
+                continue
+            select = ", ".join(f'"{c}"' for c in mapping)
+            df = pd.read_sql(f"SELECT {select} FROM '{table}'", src).rename(columns=mapping)
+            df = df.dropna(subset=["date"])
+            stats["rows"] += write_candles(dst, table, df)
+            stats["tables"] += 1
+            if n % commit_every == 0:
+                dst.commit()
+        dst.commit()
+    finally:
+        src.close()
+        dst.close()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="일봉 통합 저장소 도구")
+    sub = parser.add_subparsers(dest="command", required=True)
+    mig = sub.add_parser("migrate", help="종목별 테이블 DB → candles 테이블")
+    mig.add_argument("--src", default=os.path.join(project_root, "sqlite3", "candle_data.db"))
+    mig.add_argument("--dst", default=CANDLE_STORE_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        stats = migrate_per_ticker_db(args.src, args.dst)
+        print(f"[MIGRATE] {stats['tables']}개 테이블 / {stats['rows']}행 이전, 건너뜀 {stats['skipped']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,12 @@ from datetime import datetime, timezone
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Optional, List, Tuple
 
-from sqlalchemy import create_engine, select, update
+from sqlalchemy import create_engine, inspect, select, update
 from sqlalchemy.orm import sessionmaker
 
 # 내부적으로만 엔티티를 참조하고, 외부 모듈에는 노출하지 않음
 from models.trade_entities import Base, Order, Execution, Trade, Hold
+from db.fifo import LEDGER
 
 # ---------------------------------------------------------------------
 # 기본 세팅
@@ -33,8 +34,30 @@ SessionLocal = sessionmaker(
 )
 
 def init_db() -> None:
-    """테이블 생성"""
+    """테이블 생성 (+ 기존 테이블에 빠진 인덱스 추가)"""
     Base.metadata.create_all(bind=engine)
+    ensure_indexes()
+
+def ensure_indexes(bind=None) -> List[str]:
+    """
+    모델에 선언된 인덱스 중 DB에 없는 것만 생성 (create_all은 이미 있는 테이블의 인덱스를 추가하지 않음).
+    SQLite / PostgreSQL 공통. 반환: 새로 만든 인덱스 이름
+    """
+    bind = bind if bind is not None else engine
+    created = []
+    with bind.begin() as conn:
+        insp = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if not insp.has_table(table.name):
+                continue
+            existing = {ix["name"] for ix in insp.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda ix: ix.name):
+                if index.name not in existing:
+                    index.create(bind=conn)
+                    created.append(index.name)
+        if created and conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("ANALYZE")   # planner 통계 갱신
+    return created
 
 @contextmanager
 def get_session():
@@ -130,100 +153,16 @@ def list_orders_by_status(status: str) -> List[Order]:
 # FIFO 매칭 & Trade 생성
 # ---------------------------------------------------------------------
 
-def _fetch_open_buy_executions(session, account_id: str, ticker: str) -> List[Execution]:
-    stmt = (
-        select(Execution)
-        .where(
-            Execution.account_id == account_id,
-            Execution.ticker == ticker,
-            Execution.side == "BUY",
-            Execution.remaining_qty > 0
-        )
-        .order_by(Execution.exec_time.asc(), Execution.id.asc())
-    )
-    return list(session.execute(stmt).scalars().all())
-
 def _fifo_match_and_create_trades(session, sell_exec: Execution) -> List[int]:
-    """SELL 체결을 기존 BUY 체결들과 FIFO 매칭하여 Trade 생성. 생성된 trade_id 목록 반환."""
-    created_trade_ids: List[int] = []
-    sell_qty_to_match = _D(sell_exec.qty)
-    sell_price = _D(sell_exec.price)
-
-    if sell_qty_to_match <= 0:
-        return created_trade_ids
-
-    open_buys = _fetch_open_buy_executions(session, sell_exec.account_id, sell_exec.ticker)
-    if not open_buys:
-        return created_trade_ids
-
-    from decimal import ROUND_HALF_UP
-    def q2(x: Decimal) -> Decimal:
-        return x.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-
-    for buy_ex in open_buys:
-        if sell_qty_to_match <= 0:
-            break
-
-        available = _D(buy_ex.remaining_qty)
-        if available <= 0:
-            continue
-
-        use_qty = sell_qty_to_match if sell_qty_to_match <= available else available
-
-        buy_price = _D(buy_ex.price)
-        # 비례 분배
-        buy_commission_part = (_D(buy_ex.commission) * (use_qty / _D(buy_ex.qty))) if _D(buy_ex.qty) > 0 else _D(0)
-        sell_commission_part = (_D(sell_exec.commission) * (use_qty / _D(sell_exec.qty))) if _D(sell_exec.qty) > 0 else _D(0)
-        sell_tax_part = (_D(sell_exec.tax) * (use_qty / _D(sell_exec.qty))) if _D(sell_exec.qty) > 0 else _D(0)
-
-        buy_value = _D(use_qty) * buy_price
-        sell_value = _D(use_qty) * sell_price
-
-        pnl_gross = sell_value - buy_value
-        pnl_net = pnl_gross - (buy_commission_part + sell_commission_part + sell_tax_part)
-        pnl_net_pct = (pnl_net / buy_value) if buy_value > 0 else _D(0)
-
-        opened_at = buy_ex.exec_time
-        closed_at = sell_exec.exec_time
-
-        print(opened_at)
-        print(closed_at)
-        
-        holding_seconds = int((closed_at - opened_at).total_seconds()) if opened_at and closed_at else 0
-
-        trade = Trade(
-            account_id=sell_exec.account_id,
-            ticker=sell_exec.ticker,
-            market=sell_exec.market,
-            broker_code="KIWOOM",
-            qty=_D(use_qty),
-            buy_avg_price=_D(buy_price),
-            sell_avg_price=_D(sell_price),
-            buy_value=q2(buy_value),
-            sell_value=q2(sell_value),
-            buy_commission=q2(buy_commission_part),
-            sell_commission=q2(sell_commission_part),
-            sell_tax=q2(sell_tax_part),
-            pnl_gross=q2(pnl_gross),
-            pnl_net=q2(pnl_net),
-            pnl_net_pct=pnl_net_pct.quantize(Decimal("0.000001"), rounding=ROUND_HALF_UP),
-            buy_exec_ids=str(buy_ex.exec_id),
-            sell_exec_ids=str(sell_exec.exec_id),
-            opened_at=opened_at,
-            closed_at=closed_at,
-            holding_seconds=holding_seconds
-        )
-        session.add(trade)
-        session.flush()              # trade_id 확보
-        created_trade_ids.append(trade.trade_id)
-
-        # BUY 남은 수량 차감
-        buy_ex.remaining_qty = _D(available) - _D(use_qty)
-        session.add(buy_ex)
-
-        sell_qty_to_match -= _D(use_qty)
-
-    return created_trade_ids
+    """
+    SELL 체결을 메모리 로트 원장(LEDGER)으로 FIFO 매칭하여 Trade 생성. 생성된 trade_id 목록 반환.
+    LEDGER.transaction(get_session) 안에서 호출해야 실패 시 원장이 DB와 함께 되돌려집니다.
+    """
+    LEDGER.ensure_loaded(session)
+    trades = LEDGER.match_sell(session, sell_exec)
+    session.flush()                  # trade_id 확보 (매칭 건수와 무관하게 1회)
+    LEDGER.persist(session)          # BUY remaining_qty 일괄 갱신
+    return [t.trade_id for t in trades]
 
 def record_buy_execution(
     *,
@@ -241,7 +180,7 @@ def record_buy_execution(
     if exec_time is None:
         exec_time = _now_tz()
 
-    with get_session() as s:
+    with LEDGER.transaction(get_session) as s:
         e = Execution(
             exec_id=exec_id,
             order_no=order_no,
@@ -258,6 +197,7 @@ def record_buy_execution(
         )
         s.add(e)
         s.flush()
+        LEDGER.add_buy(e)
 
         # 주문 상태 FILLED
         s.execute(
@@ -288,7 +228,7 @@ def record_sell_execution(
     if exec_time is None:
         exec_time = _now_tz()
 
-    with get_session() as s:
+    with LEDGER.transaction(get_session) as s:
         e = Execution(
             exec_id=exec_id,
             order_no=order_no,
@@ -367,17 +307,177 @@ def record_execution(
     else:
         raise ValueError(f"Unsupported side: {side}")
 
+# ---------------------------------------------------------------------
+# 체결 일괄 반영 (실시간 체결 버스트용)
+# ---------------------------------------------------------------------
+# 이벤트(dict) 키:
+#   order_no, side(BUY/SELL), status(주문 상태: ACCEPTED/CANCELLED/AMENDED/FILLED/PARTIALLY_FILLED)
+#   exec_id(없으면 주문 상태만 갱신), account_id, ticker, market, qty, price,
+#   commission, tax, exec_time, order_qty(주문 신규 생성 시 수량)
+
+def _apply_fill_to_hold(hold: Hold, ev: dict, now_ts: datetime, max_splits: int,
+                        target_pct: Decimal, stop_pct: Decimal) -> None:
+    """hold_list 한 행에 체결 1건 반영 (BUY: 평단/분할횟수/목표·손절, SELL: 수량 차감)"""
+    qty, price = _D(ev["qty"]), _D(ev["price"])
+    fee, tax = _D(ev.get("commission") or 0), _D(ev.get("tax") or 0)
+    if ev["side"] == "BUY":
+        old_qty = _D(hold.qty or 0)
+        new_qty = old_qty + qty
+        new_avg = (_D(hold.buy_avg_price or 0) * old_qty + price * qty) / (new_qty if new_qty != 0 else Decimal("1"))
+        new_avg = new_avg.quantize(Decimal("0.000001"), rounding=ROUND_HALF_UP)
+        hold.qty = new_qty
+        hold.remain_qty = new_qty
+        hold.buy_avg_price = new_avg
+        hold.n_trade = min(int(hold.n_trade or 0) + 1, max_splits)
+        if hold.buy_time is None:
+            hold.buy_time = now_ts
+        hold.last_buy_time = now_ts
+        hold.target_price = _q_round(new_avg * (Decimal("1") + target_pct))
+        hold.stop_price = _q_round(new_avg * (Decimal("1") + stop_pct))
+        hold.last_order_id = ev.get("order_no")
+    else:
+        hold.qty = max(_D(hold.qty or 0) - qty, Decimal("0"))
+        hold.remain_qty = max(_D(hold.remain_qty or 0) - qty, Decimal("0"))
+    hold.fee_accum = _D(hold.fee_accum or 0) + fee
+    hold.tax_accum = _D(hold.tax_accum or 0) + tax
+    hold.updated_at = now_ts
+
+def ingest_executions(
+    events: List[dict],
+    *,
+    default_account_id: Optional[str] = None,
+    update_holds: bool = True,
+    max_splits: int = 4,
+    target_pct: float = 0.10,
+    stop_pct: float = -0.10,
+) -> dict:
+    """
+    체결/주문상태 이벤트 묶음을 한 트랜잭션으로 반영합니다.
+    - orders: 없으면 생성, 있으면 상태 갱신 (배치 내 마지막 상태)
+    - executions: exec_id 기준 멱등 (이미 있거나 배치 내 중복이면 건너뜀)
+    - SELL은 메모리 로트 원장(LEDGER)으로 FIFO 매칭해 trades 생성, update_holds=True면 hold_list(ORM)도 갱신
+    - account_id/ticker는 기존 주문 정보를 우선 사용
+    반환: {"inserted": [exec_id...], "duplicates": n, "orders_created": n, "orders_updated": n, "trades": [trade_id...]}
+    """
+    result = {"inserted": [], "duplicates": 0, "orders_created": 0, "orders_updated": 0, "trades": []}
+    if not events:
+        return result
+    now_ts = _now_tz()
+    target_pct, stop_pct = _D(target_pct), _D(stop_pct)
+
+    with LEDGER.transaction(get_session) as s:
+        # 1) 기존 주문 / 이미 기록된 exec_id를 한 번에 조회
+        order_nos = list(dict.fromkeys(ev["order_no"] for ev in events if ev.get("order_no")))
+        orders = {}
+        if order_nos:
+            orders = {o.order_no: o for o in s.execute(select(Order).where(Order.order_no.in_(order_nos))).scalars()}
+        exec_ids = list(dict.fromkeys(ev["exec_id"] for ev in events if ev.get("exec_id")))
+        seen = set()
+        if exec_ids:
+            seen = set(s.execute(select(Execution.exec_id).where(Execution.exec_id.in_(exec_ids))).scalars())
+
+        # 2) 주문 upsert + 신규 체결 선별
+        fills: List[dict] = []
+        for ev in events:
+            order_no = ev.get("order_no")
+            order = orders.get(order_no) if order_no else None
+            if order is None and order_no:
+                order = Order(
+                    order_no=order_no,
+                    account_id=ev.get("account_id") or default_account_id,
+                    ticker=ev.get("ticker"),
+                    side=ev["side"],
+                    qty=_D(ev.get("order_qty") or ev.get("qty") or 0),
+                    price=_D(ev.get("price") or 0),
+                    status=ev.get("status") or "PLACED",
+                    placed_at=ev.get("exec_time") or now_ts,
+                    updated_at=now_ts,
+                )
+                s.add(order)
+                orders[order_no] = order
+                result["orders_created"] += 1
+            elif order is not None and ev.get("status"):
+                order.status = ev["status"]
+                order.updated_at = now_ts
+                result["orders_updated"] += 1
+
+            exec_id = ev.get("exec_id")
+            if not exec_id:
+                continue
+            if exec_id in seen:
+                result["duplicates"] += 1
+                continue
+            seen.add(exec_id)
+            fill = dict(ev)
+            if order is not None:
+                fill["account_id"] = order.account_id or ev.get("account_id") or default_account_id
+                fill["ticker"] = order.ticker or ev.get("ticker")
+            else:
+                fill["account_id"] = ev.get("account_id") or default_account_id
+            fills.append(fill)
+
+        # 3) 체결 기록 + 메모리 로트 원장으로 FIFO 매칭 (DB 조회 없음)
+        trades: List[Trade] = []
+        for f in fills:
+            side = f["side"]
+            if side not in ("BUY", "SELL"):
+                raise ValueError(f"Unsupported side: {side}")
+            e = Execution(
+                exec_id=f["exec_id"],
+                order_no=f.get("order_no") or "UNKNOWN",
+                account_id=f["account_id"],
+                ticker=f["ticker"],
+                market=f.get("market") or "KRX",
+                side=side,
+                qty=_D(f["qty"]),
+                price=_D(f["price"]),
+                commission=_D(f.get("commission") or 0),
+                tax=_D(f.get("tax") or 0) if side == "SELL" else _D(0),
+                exec_time=f.get("exec_time") or now_ts,
+                remaining_qty=_D(f["qty"]) if side == "BUY" else _D(0),
+            )
+            s.add(e)
+            if side == "BUY":
+                LEDGER.add_buy(e)
+            else:
+                trades.extend(LEDGER.match_sell(s, e))
+            result["inserted"].append(e.exec_id)
+
+        # 4) hold_list
+        if update_holds and fills:
+            accounts = {f["account_id"] for f in fills}
+            tickers = {f["ticker"] for f in fills}
+            holds = {
+                (h.account_id, h.ticker): h
+                for h in s.execute(select(Hold).where(Hold.account_id.in_(accounts), Hold.ticker.in_(tickers))).scalars()
+            }
+            for f in fills:
+                key = (f["account_id"], f["ticker"])
+                hold = holds.get(key)
+                if hold is None:
+                    if f["side"] == "SELL":
+                        continue
+                    hold = Hold(account_id=key[0], ticker=key[1], market=f.get("market") or "KRX",
+                                qty=Decimal("0"), remain_qty=Decimal("0"), buy_avg_price=Decimal("0"),
+                                n_trade=0, fee_accum=Decimal("0"), tax_accum=Decimal("0"))
+                    s.add(hold)
+                    holds[key] = hold
+                _apply_fill_to_hold(hold, f, now_ts, max_splits, target_pct, stop_pct)
+
+        s.flush()
+        LEDGER.persist(s)            # 매칭된 BUY remaining_qty를 executemany 한 번으로
+        result["trades"] = [t.trade_id for t in trades]
+    return result
+
 # ---------------------------------------------------------------------
 # 포지션/체결 헬퍼
 # ---------------------------------------------------------------------
 def get_open_position_qty(account_id: str, ticker: str) -> Decimal:
     """
-    현재 보유 수량(= BUY 체결의 remaining_qty 합) 반환.
+    현재 보유 수량(= BUY 체결의 remaining_qty 합) 반환. FIFO 매칭과 같은 로트 원장(LEDGER)에서 읽음
     """
-    with get_session() as s:
-        buys = _fetch_open_buy_executions(s, account_id, ticker)
-        total = sum((_D(b.remaining_qty) for b in buys), _D("0"))
-        return total
+    with LEDGER.transaction(get_session):
+        return LEDGER.open_qty(account_id, ticker)
 
 def list_executions(
     *,
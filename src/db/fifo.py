@@ -0,0 +1,229 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Callable, Deque, Dict, List, Tuple
+
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.orm import Session
+
+from models.trade_entities import Execution, Trade
+
+# ---------------------------------------------------------------------
+# FIFO 로트 원장 (메모리)
+# ---------------------------------------------------------------------
+# (account, ticker)별 미청산 BUY 체결(로트)을 deque로 들고 있다가
+# SELL이 오면 앞에서부터 차감합니다. DB 조회 없이 매칭 로트 수만큼만 일합니다.
+# - 처음 사용할 때 executions.remaining_qty > 0 인 BUY를 한 번에 읽어 적재
+# - 트랜잭션마다 executions의 max(id)를 확인해, 다른 프로세스가 체결을 기록했으면 다시 적재
+#   (체결 기록 없이 remaining_qty만 바꾸는 외부 쓰기는 감지하지 못함 → 그런 경우 invalidate() 호출)
+# - 매칭 결과(Trade, 남은 수량)는 호출 측 트랜잭션에서 persist()로 한 번에 기록
+# - 트랜잭션이 실패하면 invalidate()로 버리고 다음 사용 때 DB에서 다시 적재
+
+_ZERO = Decimal("0")
+_Q2 = Decimal("0.01")
+_Q6 = Decimal("0.000001")
+
+Key = Tuple[str, str]
+
+
+def _D(x) -> Decimal:
+    if isinstance(x, Decimal):
+        return x
+    return Decimal(str(x)) if x is not None else _ZERO
+
+
+def _q2(x: Decimal) -> Decimal:
+    return x.quantize(_Q2, rounding=ROUND_HALF_UP)
+
+
+class _Lot:
+    __slots__ = ("exec_id", "qty", "remaining", "price", "commission", "exec_time")
+
+    def __init__(self, exec_id: str, qty, remaining, price, commission, exec_time):
+        self.exec_id = exec_id
+        self.qty = _D(qty)
+        self.remaining = _D(remaining)
+        self.price = _D(price)
+        self.commission = _D(commission)
+        self.exec_time = exec_time
+
+
+class LotLedger:
+    """
+    with LEDGER.transaction(get_session) as session:
+        LEDGER.add_buy(buy_exec)
+        trades = LEDGER.match_sell(session, sell_exec)   # Trade를 session에 추가
+        ...
+        session.flush()
+        LEDGER.persist(session)                          # 바뀐 remaining_qty 일괄 UPDATE
+    """
+    def __init__(self):
+        self._lots: Dict[Key, Deque[_Lot]] = {}
+        self._dirty: Dict[str, Decimal] = {}
+        self._loaded = False
+        self._mark = None  # 마지막으로 본 executions max(id)
+        self.lock = threading.RLock()
+        self.stats = {"loads": 0, "lots": 0, "matched": 0}
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, session: Session) -> int:
+        """executions에서 미청산 BUY 로트 적재. 반환: 로트 수"""
+        with self.lock:
+            rows = session.execute(
+                select(Execution.account_id, Execution.ticker, Execution.exec_id, Execution.qty,
+                       Execution.remaining_qty, Execution.price, Execution.commission, Execution.exec_time)
+                .where(Execution.side == "BUY", Execution.remaining_qty > 0)
+                .order_by(Execution.exec_time.asc(), Execution.id.asc())
+            ).all()
+            self._lots = {}
+            self._dirty = {}
+            for acc, ticker, exec_id, qty, remaining, price, commission, exec_time in rows:
+                self._lots.setdefault((acc, ticker), deque()).append(
+                    _Lot(exec_id, qty, remaining, price, commission, exec_time))
+            self._loaded = True
+            self._mark = self._watermark(session)
+            self.stats["loads"] += 1
+            self.stats["lots"] = len(rows)
+            return len(rows)
+
+    def _watermark(self, session: Session):
+        return session.execute(select(func.max(Execution.id))).scalar()
+
+    def ensure_loaded(self, session: Session) -> None:
+        """처음이거나 마지막 확인 이후 다른 커넥션/프로세스가 체결을 기록했으면 DB에서 다시 적재"""
+        if not self._loaded or self._watermark(session) != self._mark:
+            self.load(session)
+
+    def invalidate(self) -> None:
+        """메모리 원장을 버림 (다음 ensure_loaded에서 DB 기준으로 다시 적재)"""
+        with self.lock:
+            self._lots = {}
+            self._dirty = {}
+            self._loaded = False
+
+    @contextmanager
+    def transaction(self, session_scope: Callable):
+        """
+        session_scope(예: db.get_session)로 연 트랜잭션 안에서 원장 갱신.
+        커밋까지 포함해 예외가 나면(DB 롤백) 원장도 무효화합니다.
+        """
+        with self.lock:
+            try:
+                with session_scope() as session:
+                    self.ensure_loaded(session)
+                    yield session
+                    session.flush()
+                    self._mark = self._watermark(session)  # 자기 트랜잭션의 체결은 재적재 대상이 아님
+            except BaseException:
+                self.invalidate()
+                raise
+
+    # -----------------------------
+    # 조회
+    # -----------------------------
+    def open_lots(self, account_id: str, ticker: str) -> List[Tuple[str, Decimal]]:
+        return [(lot.exec_id, lot.remaining) for lot in self._lots.get((account_id, ticker), ())]
+
+    def open_qty(self, account_id: str, ticker: str) -> Decimal:
+        return sum((lot.remaining for lot in self._lots.get((account_id, ticker), ())), _ZERO)
+
+    # -----------------------------
+    # 갱신
+    # -----------------------------
+    def add_buy(self, e: Execution) -> None:
+        remaining = _D(e.remaining_qty if e.remaining_qty is not None else e.qty)
+        if remaining <= 0:
+            return
+        self._lots.setdefault((e.account_id, e.ticker), deque()).append(
+            _Lot(e.exec_id, e.qty, remaining, e.price, e.commission, e.exec_time))
+
+    def match_sell(self, session: Session, sell_exec: Execution) -> List[Trade]:
+        """SELL 1건을 FIFO로 매칭해 Trade를 session에 추가 (flush는 호출 측)"""
+        created: List[Trade] = []
+        sell_qty_to_match = _D(sell_exec.qty)
+        lots = self._lots.get((sell_exec.account_id, sell_exec.ticker))
+        if sell_qty_to_match <= 0 or not lots:
+            return created
+
+        sell_price = _D(sell_exec.price)
+        sell_qty = _D(sell_exec.qty)
+        sell_commission = _D(sell_exec.commission)
+        sell_tax = _D(sell_exec.tax)
+
+        while lots and sell_qty_to_match > 0:
+            lot = lots[0]
+            use_qty = sell_qty_to_match if sell_qty_to_match <= lot.remaining else lot.remaining
+
+            # 비례 분배
+            buy_commission_part = lot.commission * (use_qty / lot.qty) if lot.qty > 0 else _ZERO
+            sell_commission_part = sell_commission * (use_qty / sell_qty) if sell_qty > 0 else _ZERO
+            sell_tax_part = sell_tax * (use_qty / sell_qty) if sell_qty > 0 else _ZERO
+
+            buy_value = use_qty * lot.price
+            sell_value = use_qty * sell_price
+            pnl_gross = sell_value - buy_value
+            pnl_net = pnl_gross - (buy_commission_part + sell_commission_part + sell_tax_part)
+            pnl_net_pct = (pnl_net / buy_value) if buy_value > 0 else _ZERO
+
+            opened_at = lot.exec_time
+            closed_at = sell_exec.exec_time
+            holding_seconds = int((closed_at - opened_at).total_seconds()) if opened_at and closed_at else 0
+
+            trade = Trade(
+                account_id=sell_exec.account_id,
+                ticker=sell_exec.ticker,
+                market=sell_exec.market,
+                broker_code="KIWOOM",
+                qty=use_qty,
+                buy_avg_price=lot.price,
+                sell_avg_price=sell_price,
+                buy_value=_q2(buy_value),
+                sell_value=_q2(sell_value),
+                buy_commission=_q2(buy_commission_part),
+                sell_commission=_q2(sell_commission_part),
+                sell_tax=_q2(sell_tax_part),
+                pnl_gross=_q2(pnl_gross),
+                pnl_net=_q2(pnl_net),
+                pnl_net_pct=pnl_net_pct.quantize(_Q6, rounding=ROUND_HALF_UP),
+                buy_exec_ids=str(lot.exec_id),
+                sell_exec_ids=str(sell_exec.exec_id),
+                opened_at=opened_at,
+                closed_at=closed_at,
+                holding_seconds=holding_seconds
+            )
+            session.add(trade)
+            created.append(trade)
+
+            lot.remaining -= use_qty
+            self._dirty[lot.exec_id] = lot.remaining
+            if lot.remaining <= 0:
+                lots.popleft()
+            sell_qty_to_match -= use_qty
+
+        if not lots:
+            del self._lots[(sell_exec.account_id, sell_exec.ticker)]
+        self.stats["matched"] += len(created)
+        return created
+
+    def persist(self, session: Session) -> int:
+        """바뀐 로트의 remaining_qty를 executemany UPDATE 한 번으로 기록. 반환: 갱신 행 수"""
+        if not self._dirty:
+            return 0
+        params = [{"b_exec_id": exec_id, "b_remaining": remaining} for exec_id, remaining in self._dirty.items()]
+        table = Execution.__table__
+        session.execute(
+            table.update()
+            .where(table.c.exec_id == bindparam("b_exec_id"))
+            .values(remaining_qty=bindparam("b_remaining")),
+            params,
+        )
+        self._dirty = {}
+        return len(params)
+
+
+# 프로세스 공용 원장
+LEDGER = LotLedger()
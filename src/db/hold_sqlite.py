@@ -1,15 +1,60 @@
 # src/db/hold_sqlite.py
 import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, List, Tuple
 import pandas as pd
 
 from config import config
 
 DB_PATH = getattr(config.db, "sqlite_path", "./sqlite3/trade_test.db")
 
+HOLD_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS hold_list (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account_id TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    market TEXT DEFAULT 'KRX',
+    name TEXT,
+    qty NUMERIC DEFAULT 0,
+    remain_qty NUMERIC DEFAULT 0,
+    buy_avg_price NUMERIC DEFAULT 0,
+    n_trade INTEGER DEFAULT 0,
+    buy_time TIMESTAMP,
+    last_buy_time TIMESTAMP,
+    due_date TIMESTAMP,
+    target_price NUMERIC DEFAULT 0,
+    stop_price NUMERIC DEFAULT 0,
+    fee_accum NUMERIC DEFAULT 0,
+    tax_accum NUMERIC DEFAULT 0,
+    last_order_id TEXT,
+    updated_at TIMESTAMP,
+    UNIQUE(account_id, ticker)
+);
+"""
+
+# hold_list에 반영한 체결 exec_id (체결 원장(executions)과 DB가 달라도 hold 쪽만으로 멱등)
+HOLD_APPLIED_SQL = """
+CREATE TABLE IF NOT EXISTS hold_applied_exec (
+    exec_id TEXT PRIMARY KEY,
+    applied_at TIMESTAMP
+);
+"""
+
+HOLD_COLUMNS = (
+    "id", "account_id", "ticker", "market", "name",
+    "qty", "remain_qty", "buy_avg_price", "n_trade",
+    "buy_time", "last_buy_time", "due_date",
+    "target_price", "stop_price", "fee_accum", "tax_accum",
+    "last_order_id", "updated_at",
+)
+_DECIMAL_COLUMNS = ("qty", "remain_qty", "buy_avg_price", "target_price", "stop_price", "fee_accum", "tax_accum")
+_INT_COLUMNS = ("qty", "remain_qty")  # 스냅샷에서 정수(int64)로 유지 (주문 수량 str(qty) == "10")
+_TIME_COLUMNS = ("buy_time", "last_buy_time", "due_date", "updated_at")
+
 def _get_conn():
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
     conn = sqlite3.connect(DB_PATH)
@@ -17,32 +62,9 @@ def _get_conn():
     return conn
 
 def init_hold_table():
-    sql = """
-    CREATE TABLE IF NOT EXISTS hold_list (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        account_id TEXT NOT NULL,
-        ticker TEXT NOT NULL,
-        market TEXT DEFAULT 'KRX',
-        name TEXT,
-        qty NUMERIC DEFAULT 0,
-        remain_qty NUMERIC DEFAULT 0,
-        buy_avg_price NUMERIC DEFAULT 0,
-        n_trade INTEGER DEFAULT 0,
-        buy_time TIMESTAMP,
-        last_buy_time TIMESTAMP,
-        due_date TIMESTAMP,
-        target_price NUMERIC DEFAULT 0,
-        stop_price NUMERIC DEFAULT 0,
-        fee_accum NUMERIC DEFAULT 0,
-        tax_accum NUMERIC DEFAULT 0,
-        last_order_id TEXT,
-        updated_at TIMESTAMP,
-        UNIQUE(account_id, ticker)
-    );
-    """
-    with _get_conn() as conn:
-        conn.execute(sql)
-        conn.commit()
+    with HOLD_BOOK.write() as conn:
+        conn.execute(HOLD_TABLE_SQL)
+        conn.execute(HOLD_APPLIED_SQL)
 
 def _dec(x) -> Decimal:
     if isinstance(x, Decimal):
@@ -55,15 +77,284 @@ def _dec(x) -> Decimal:
 def _round_px(x: Decimal, q="0.01") -> Decimal:
     return x.quantize(Decimal(q), rounding=ROUND_HALF_UP)
 
-def get_hold(account_id: str, ticker: str) -> Optional[sqlite3.Row]:
-    with _get_conn() as conn:
-        cur = conn.execute(
-            "SELECT * FROM hold_list WHERE account_id=? AND ticker=?",
-            (account_id, ticker)
+def _ts(x) -> Optional[datetime]:
+    if x is None or isinstance(x, datetime):
+        return x
+    try:
+        return datetime.fromisoformat(str(x))
+    except ValueError:
+        return None
+
+# ---------------------------------------------------------------------
+# 보유 종목 메모리 캐시 (HoldBook)
+# ---------------------------------------------------------------------
+# hold_list 전체를 (account_id, ticker) → HoldRow 로 한 번 읽어 두고,
+# 쓰기는 같은 커넥션으로 DB에 기록한 뒤 캐시도 함께 갱신합니다(write-through).
+# 다른 커넥션/프로세스가 파일을 바꾸면 PRAGMA data_version이 달라지므로 그때만 다시 읽습니다.
+
+class HoldRow:
+    """hold_list 한 행 (수량/가격은 Decimal, 시각은 datetime). row["qty"] 형태 접근도 지원"""
+    __slots__ = HOLD_COLUMNS
+
+    def __init__(self, **values):
+        for name in HOLD_COLUMNS:
+            value = values.get(name)
+            if name in _DECIMAL_COLUMNS:
+                value = _dec(value if value is not None else 0)
+            elif name in _TIME_COLUMNS:
+                value = _ts(value)
+            elif name == "n_trade":
+                value = int(value or 0)
+            setattr(self, name, value)
+
+    def __getitem__(self, name: str):
+        return getattr(self, name)
+
+    def keys(self) -> Tuple[str, ...]:
+        return HOLD_COLUMNS
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in HOLD_COLUMNS}
+
+    def __repr__(self) -> str:
+        return f"HoldRow({self.account_id}, {self.ticker}, qty={self.qty}, avg={self.buy_avg_price})"
+
+
+class HoldBook:
+    """
+    HOLD_BOOK.get(account_id, ticker)   → HoldRow | None (DB 접속 없음)
+    HOLD_BOOK.snapshot()                → DataFrame (변경이 없으면 같은 프레임 재사용)
+    HOLD_BOOK.on_change.append(fn)      → fn(kind, row) 호출 (kind: "insert" / "update")
+    - 실행감시 writer 스레드와 메인 스레드가 함께 쓰므로 lock으로 보호
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.on_change: List[Callable[[str, HoldRow], Any]] = []
+        self.lock = threading.RLock()
+        self.stats = {"loads": 0, "reads": 0, "writes": 0}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._rows: Dict[Tuple[str, str], HoldRow] = {}
+        self._loaded = False
+        self._data_version = None
+        self._version = 0
+        self._frame: Optional[pd.DataFrame] = None
+        self._frame_version = -1
+        self._pending: Optional[List[Tuple[str, HoldRow]]] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            path = self.path or DB_PATH
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute(HOLD_TABLE_SQL)
+            self._conn.execute(HOLD_APPLIED_SQL)
+            self._conn.commit()
+        return self._conn
+
+    def close(self) -> None:
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self._loaded = False
+            self._version += 1
+
+    def refresh(self) -> None:
+        """처음이거나 다른 커넥션이 DB를 바꿨으면 전체를 다시 읽음"""
+        with self.lock:
+            conn = self._connect()
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._loaded and data_version == self._data_version:
+                return
+            self._rows = {
+                (r["account_id"], r["ticker"]): HoldRow(**dict(r))
+                for r in conn.execute("SELECT * FROM hold_list")
+            }
+            self._data_version = data_version
+            self._loaded = True
+            self._version += 1
+            self.stats["loads"] += 1
+
+    # -----------------------------
+    # 조회
+    # -----------------------------
+    def get(self, account_id: str, ticker: str) -> Optional[HoldRow]:
+        with self.lock:
+            self.refresh()
+            self.stats["reads"] += 1
+            return self._rows.get((account_id, ticker))
+
+    def rows(self, where: Optional[Callable[[HoldRow], bool]] = None) -> List[HoldRow]:
+        with self.lock:
+            self.refresh()
+            self.stats["reads"] += 1
+            rows = sorted(self._rows.values(), key=lambda r: r.id or 0)
+        return [r for r in rows if where(r)] if where is not None else rows
+
+    def snapshot(self, where: Optional[Callable[[HoldRow], bool]] = None) -> pd.DataFrame:
+        """
+        get_hold_list()와 같은 열 구성의 DataFrame. 조건 없는 전체 프레임은 캐시해 두고
+        변경이 있을 때만 다시 만듭니다 (반환값은 얕은 복사본).
+        """
+        with self.lock:
+            self.refresh()
+            if where is None and self._frame_version == self._version:
+                return self._frame.copy(deep=False)
+            version = self._version
+            rows = self.rows(where)
+        frame = pd.DataFrame(
+            [[getattr(r, c) for c in HOLD_COLUMNS] for r in rows], columns=list(HOLD_COLUMNS)
         )
-        return cur.fetchone()
+        for c in _DECIMAL_COLUMNS:
+            frame[c] = frame[c].astype("int64" if c in _INT_COLUMNS else "float64")
+        for c in _TIME_COLUMNS:
+            frame[c] = pd.to_datetime(frame[c])
+        if where is None:
+            with self.lock:
+                self._frame, self._frame_version = frame, version
+            return frame.copy(deep=False)
+        return frame
+
+    # -----------------------------
+    # 쓰기 (write-through)
+    # -----------------------------
+    @contextmanager
+    def write(self):
+        """
+        with HOLD_BOOK.write() as conn:
+            HOLD_BOOK.save(conn, row)
+        블록이 끝나면 커밋, 실패하면 롤백 후 캐시를 버림 (다음 조회 때 DB에서 다시 읽음)
+        """
+        with self.lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")   # 다른 프로세스의 쓰기와 겹치지 않도록 먼저 잠금
+            self.refresh()
+            pending: List[Tuple[str, HoldRow]] = []
+            self._pending = pending
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                self.invalidate()
+                raise
+            finally:
+                self._pending = None
+            # 자기 커넥션의 커밋은 data_version을 바꾸지 않으므로 캐시를 그대로 유지
+            for kind, row in pending:
+                self._rows[(row.account_id, row.ticker)] = row
+            if pending:
+                self._version += 1
+                self.stats["writes"] += len(pending)
+        for kind, row in pending:
+            for fn in self.on_change:
+                try:
+                    fn(kind, row)
+                except Exception as e:
+                    print(f"[HOLD] on_change error: {e}")
+
+    def save(self, conn: sqlite3.Connection, row: HoldRow) -> HoldRow:
+        """write() 블록 안에서 row를 INSERT(id 없음) 또는 UPDATE"""
+        values = [_sql_value(getattr(row, c)) for c in HOLD_COLUMNS[1:]]
+        if row.id is None:
+            cur = conn.execute(
+                f"INSERT INTO hold_list ({', '.join(HOLD_COLUMNS[1:])}) "
+                f"VALUES ({', '.join('?' * (len(HOLD_COLUMNS) - 1))})",
+                values,
+            )
+            row.id = cur.lastrowid
+            kind = "insert"
+        else:
+            conn.execute(
+                f"UPDATE hold_list SET {', '.join(c + '=?' for c in HOLD_COLUMNS[1:])} WHERE id=?",
+                values + [row.id],
+            )
+            kind = "update"
+        self._pending.append((kind, row))
+        return row
+
+    def peek(self, account_id: str, ticker: str) -> Optional[HoldRow]:
+        """write() 블록 안에서 아직 커밋 전인 변경까지 반영된 행"""
+        for _, row in reversed(self._pending or []):
+            if (row.account_id, row.ticker) == (account_id, ticker):
+                return row
+        return self._rows.get((account_id, ticker))
 
-def get_hold_list(filter: str='') -> pd.DataFrame:
+
+def _sql_value(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+
+# 프로세스 공용 캐시
+HOLD_BOOK = HoldBook()
+
+# ---------------------------------------------------------------------
+# 체결 반영 규칙 (매수: 평단/분할횟수/목표·손절가 재계산, 매도: 수량 차감)
+# ---------------------------------------------------------------------
+def _after_buy(row: Optional[HoldRow], *, account_id: str, ticker: str, market: str,
+               exec_qty: Decimal, exec_price: Decimal, commission: Decimal, tax: Decimal,
+               now_ts: datetime, max_splits: int, target_pct: Decimal, stop_pct: Decimal,
+               last_order_id: Optional[str]) -> HoldRow:
+    if row is None:
+        avg = exec_price
+        new = HoldRow(account_id=account_id, ticker=ticker, market=market or "KRX",
+                      qty=exec_qty, remain_qty=exec_qty, buy_avg_price=avg, n_trade=1,
+                      buy_time=now_ts, fee_accum=commission, tax_accum=tax)
+    else:
+        new = HoldRow(**row.as_dict())
+        old_qty = row.qty
+        new_qty = old_qty + exec_qty
+        if new_qty > 0:
+            avg = (row.buy_avg_price * old_qty + exec_price * exec_qty) / new_qty
+        else:
+            avg = Decimal("0")
+        avg = avg.quantize(Decimal("0.000001"), rounding=ROUND_HALF_UP)
+        new.qty = new.remain_qty = new_qty
+        new.buy_avg_price = avg
+        new.n_trade = min(row.n_trade + 1, max_splits)
+        new.fee_accum = row.fee_accum + commission
+        new.tax_accum = row.tax_accum + tax
+    # 평단 기반 목표/손절 재계산
+    new.target_price = _round_px(avg * (Decimal("1") + target_pct))
+    new.stop_price = _round_px(avg * (Decimal("1") + stop_pct))
+    new.last_buy_time = now_ts
+    new.last_order_id = last_order_id
+    new.updated_at = now_ts
+    return new
+
+def _after_sell(row: HoldRow, *, exec_qty: Decimal, commission: Decimal, tax: Decimal,
+                now_ts: datetime) -> HoldRow:
+    new = HoldRow(**row.as_dict())
+    new.qty = max(row.qty - exec_qty, Decimal("0"))
+    new.remain_qty = max(row.remain_qty - exec_qty, Decimal("0"))
+    new.fee_accum = row.fee_accum + commission
+    new.tax_accum = row.tax_accum + tax
+    new.updated_at = now_ts
+    return new
+
+# ---------------------------------------------------------------------
+# 조회 / 갱신 API
+# ---------------------------------------------------------------------
+def get_hold(account_id: str, ticker: str) -> Optional[HoldRow]:
+    return HOLD_BOOK.get(account_id, ticker)
+
+def get_hold_list(filter: str='', where: Optional[Callable[[HoldRow], bool]] = None) -> pd.DataFrame:
+    """
+    보유 목록 DataFrame. 기본은 HOLD_BOOK 스냅샷(DB 접속 없음), where로 행 조건 지정.
+    filter(SQL 문자열)를 주면 예전처럼 DB에서 직접 읽음.
+    """
+    if not filter:
+        return HOLD_BOOK.snapshot(where)
     with _get_conn() as conn:
         query = "SELECT * FROM hold_list" + filter
         df = pd.read_sql(query, con=conn)
@@ -87,60 +378,16 @@ def upsert_hold_after_buy(
     stop_pct: Decimal = Decimal("-0.10"),
     last_order_id: Optional[str] = None,
 ):
-    row = get_hold(account_id, ticker)
-    with _get_conn() as conn:
-        if row is None:
-            qty = exec_qty
-            avg = exec_price
-            n_trade = 1
-            target = _round_px(avg * (Decimal("1") + target_pct))
-            stop   = _round_px(avg * (Decimal("1") + stop_pct))
-            conn.execute(
-                """
-                INSERT INTO hold_list
-                (account_id, ticker, market, qty, remain_qty, buy_avg_price, n_trade,
-                 buy_time, last_buy_time, target_price, stop_price,
-                 fee_accum, tax_accum, last_order_id, updated_at)
-                VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-                """,
-                (
-                    account_id, ticker, market,
-                    str(qty), str(qty), str(avg), n_trade,
-                    now_ts, now_ts, str(target), str(stop),
-                    str(commission), str(tax), last_order_id, now_ts
-                )
-            )
-        else:
-            old_qty = _dec(row["qty"])
-            new_qty = old_qty + exec_qty
-            if new_qty > 0:
-                new_avg = (_dec(row["buy_avg_price"]) * old_qty + exec_price * exec_qty) / new_qty
-            else:
-                new_avg = Decimal("0")
-            new_avg = new_avg.quantize(Decimal("0.000001"), rounding=ROUND_HALF_UP)
-            new_n   = min(int(row["n_trade"]) + 1, max_splits)
-            new_fee = _dec(row["fee_accum"]) + commission
-            new_tax = _dec(row["tax_accum"]) + tax
-            # 평단 기반 목표/손절 재계산
-            target = _round_px(new_avg * (Decimal("1") + target_pct))
-            stop   = _round_px(new_avg * (Decimal("1") + stop_pct))
-
-            conn.execute(
-                """
-                UPDATE hold_list
-                SET qty=?, remain_qty=?, buy_avg_price=?, n_trade=?,
-                    last_buy_time=?, target_price=?, stop_price=?,
-                    fee_accum=?, tax_accum=?, last_order_id=?, updated_at=?
-                WHERE account_id=? AND ticker=?
-                """,
-                (
-                    str(new_qty), str(new_qty), str(new_avg), new_n,
-                    now_ts, str(target), str(stop),
-                    str(new_fee), str(new_tax), last_order_id, now_ts,
-                    account_id, ticker
-                )
-            )
-        conn.commit()
+    with HOLD_BOOK.write() as conn:
+        row = _after_buy(
+            HOLD_BOOK.peek(account_id, ticker),
+            account_id=account_id, ticker=ticker, market=market,
+            exec_qty=_dec(exec_qty), exec_price=_dec(exec_price),
+            commission=_dec(commission), tax=_dec(tax), now_ts=now_ts,
+            max_splits=max_splits, target_pct=_dec(target_pct), stop_pct=_dec(stop_pct),
+            last_order_id=last_order_id,
+        )
+        HOLD_BOOK.save(conn, row)
 
 def apply_sell_to_hold(
     *,
@@ -151,23 +398,62 @@ def apply_sell_to_hold(
     tax: Decimal,
     now_ts: datetime,
 ):
-    row = get_hold(account_id, ticker)
-    if row is None:
-        return
-    old_qty = _dec(row["qty"])
-    old_rem = _dec(row["remain_qty"])
-    new_qty = max(old_qty - exec_qty, Decimal("0"))
-    new_rem = max(old_rem - exec_qty, Decimal("0"))
-    new_fee = _dec(row["fee_accum"]) + commission
-    new_tax = _dec(row["tax_accum"]) + tax
+    with HOLD_BOOK.write() as conn:
+        row = HOLD_BOOK.peek(account_id, ticker)
+        if row is None:
+            return
+        HOLD_BOOK.save(conn, _after_sell(row, exec_qty=_dec(exec_qty), commission=_dec(commission),
+                                         tax=_dec(tax), now_ts=now_ts))
 
-    with _get_conn() as conn:
-        conn.execute(
-            """
-            UPDATE hold_list
-            SET qty=?, remain_qty=?, fee_accum=?, tax_accum=?, updated_at=?
-            WHERE account_id=? AND ticker=?
-            """,
-            (str(new_qty), str(new_rem), str(new_fee), str(new_tax), now_ts, account_id, ticker)
-        )
-        conn.commit()
+def apply_fills(
+    fills,
+    *,
+    now_ts: Optional[datetime] = None,
+    max_splits: int = 4,
+    target_pct: Decimal = Decimal("0.10"),
+    stop_pct: Decimal = Decimal("-0.10"),
+) -> int:
+    """
+    체결 묶음을 한 커넥션/한 트랜잭션으로 hold_list에 반영 (upsert_hold_after_buy / apply_sell_to_hold의 배치판)
+    fills: [{"account_id", "ticker", "market", "side", "qty", "price", "commission", "tax", "order_no", "exec_id"}, ...]
+    - exec_id가 있으면 hold_applied_exec에 같은 트랜잭션으로 기록하고, 이미 기록된 체결은 건너뜀
+      → 같은 체결을 다시 넘겨도(재시도/재전송) 한 번만 반영
+    반환: 반영한 체결 수
+    """
+    if now_ts is None:
+        now_ts = datetime.now()
+    target_pct, stop_pct = _dec(target_pct), _dec(stop_pct)
+    applied = 0
+    with HOLD_BOOK.write() as conn:
+        exec_ids = list(dict.fromkeys(f["exec_id"] for f in fills if f.get("exec_id")))
+        done = set()
+        if exec_ids:
+            done = {r[0] for r in conn.execute(
+                f"SELECT exec_id FROM hold_applied_exec WHERE exec_id IN ({', '.join('?' * len(exec_ids))})",
+                exec_ids,
+            )}
+        for f in fills:
+            exec_id = f.get("exec_id")
+            if exec_id:
+                if exec_id in done:
+                    continue
+                done.add(exec_id)
+                conn.execute("INSERT INTO hold_applied_exec (exec_id, applied_at) VALUES (?, ?)",
+                             (exec_id, _sql_value(now_ts)))
+            row = HOLD_BOOK.peek(f["account_id"], f["ticker"])
+            exec_qty = _dec(f["qty"])
+            fee, tax = _dec(f.get("commission") or 0), _dec(f.get("tax") or 0)
+            if f["side"] == "BUY":
+                row = _after_buy(
+                    row, account_id=f["account_id"], ticker=f["ticker"], market=f.get("market") or "KRX",
+                    exec_qty=exec_qty, exec_price=_dec(f["price"]), commission=fee, tax=tax, now_ts=now_ts,
+                    max_splits=max_splits, target_pct=target_pct, stop_pct=stop_pct,
+                    last_order_id=f.get("order_no"),
+                )
+            else:  # SELL: 보유 없으면 무시
+                if row is None:
+                    continue
+                row = _after_sell(row, exec_qty=exec_qty, commission=fee, tax=tax, now_ts=now_ts)
+            HOLD_BOOK.save(conn, row)
+            applied += 1
+    return applied
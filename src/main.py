@@ -1,9 +1,9 @@
 import os
 import sys
 import logging
+import asyncio
 import pause
 from decimal import Decimal
-from time import sleep
 from datetime import datetime
 
 # sys path 설정
@@ -13,20 +13,31 @@ sys.path.append(src_path)
 
 # 서비스 모듈 import
 from api.oauth import OAuthClient
-from api.market import MarketAPI
+from api.market import MarketAPI, AsyncMarketAPI
+from api.async_client import close_async_http_session
+from api.ws_session import shared_ws_thread, stop_ws_threads
 from api.account_service import AccountService
 from api.order import OrderAPI
 from db.hold_sqlite import get_hold_list
 from db.db import create_order, init_db
+from trading.condition_stream import BackgroundConditionStreams
 from trading.data_downloader import main as download_main
+from trading.quote_cache import BackgroundQuoteFeed, QuoteCache
 from utils.calculate_utils import calculate_tick_price
 from helpers import *
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
-HOLD_INTERVAL = 0.5
 ACCOUNT_ID = os.getenv("ACC_ID", "81091874")
+QUOTE_STREAM = os.getenv("QUOTE_STREAM", "1") == "1"  # 0이면 실시간 시세 없이 REST만 사용
+CONDITION_STREAM = os.getenv("CONDITION_STREAM", "1") == "1"  # 0이면 매수 시점에 CNSRREQ로 다시 조회
+BUY_CONDITIONS = ("1", "2")  # 매수 후보 조건식 seq
+
+# 실시간 시세 캐시 / 실시간 조건검색 (main()에서 시작, 같은 공용 WebSocket 세션 사용)
+QUOTES = QuoteCache()
+QUOTE_FEED = None
+CONDITION_STREAMS = None
 
 def open_yaml(file_path: str):
     import yaml
@@ -38,12 +49,65 @@ def open_yaml(file_path: str):
     return data
 
 
-# 현재가 조회
+# 현재가 조회: 실시간 시세 캐시 → (없거나 오래되면) REST ka10001
 def get_current_price(token: str, stock_code: str) -> int:
+    price = QUOTES.price(stock_code)
+    if price:
+        return price
     market = MarketAPI()
     info = market.get_stock_info(token=token, stock_code=stock_code)
     info = parse_stock_info(info)
-    return info.get("cur_prc")
+    price = info.get("cur_prc")
+    if price:
+        QUOTES.update(stock_code, price=price)
+    return price
+
+async def _get_current_prices(token: str, codes: list) -> dict:
+    """여러 종목 현재가: 캐시에 없는 종목만 하나의 이벤트 루프에서 동시에 REST 조회"""
+    unique_codes = list(dict.fromkeys(codes))
+    prices = QUOTES.prices(unique_codes)
+    missing = [code for code in unique_codes if code not in prices]
+    if missing:
+        market = AsyncMarketAPI()
+        infos = await asyncio.gather(*(market.get_stock_info(token=token, stock_code=code) for code in missing))
+        for code, info in zip(missing, infos):
+            price = parse_stock_info(info).get("cur_prc")
+            prices[code] = price
+            if price:
+                QUOTES.update(code, price=price)
+    return prices
+
+def _watch_quotes(codes) -> None:
+    """실시간 시세 구독 추가 (구독 실패 시 REST로만 동작)"""
+    if QUOTE_FEED is None:
+        return
+    try:
+        QUOTE_FEED.watch([str(c) for c in codes])
+    except Exception as e:
+        logging.warning(f"[QUOTE] 실시간 시세 등록 실패 → REST 사용: {e}")
+
+def _condition_hits():
+    """실시간 조건검색 스트림의 현재 편입 종목 {seq: [코드, ...]} (스트림이 없거나 실패하면 None)"""
+    if CONDITION_STREAMS is None:
+        return None
+    try:
+        return CONDITION_STREAMS.snapshot()
+    except Exception as e:
+        logging.warning(f"[COND] 실시간 조건검색 조회 실패 → CNSRREQ 재조회: {e}")
+        return None
+
+async def _collect_buy_candidates(token: str, max_hold: int, by_seq=None):
+    """조건검색 → 후보 종목 현재가 조회를 한 번의 asyncio.run 안에서 처리 (by_seq: 스트림 결과)"""
+    from trading.condition_ws import fetch_many_condition_codes
+    try:
+        if by_seq is None:
+            # 조건식을 시세 피드와 같은 공용 WebSocket 세션(스레드 루프)에서 동시에 조회
+            by_seq = await asyncio.wrap_future(shared_ws_thread(token).submit(
+                lambda ws: fetch_many_condition_codes(token, BUY_CONDITIONS, stex_tp="K", session=ws, refresh=True)))
+        codes = [c for seq in BUY_CONDITIONS for c in by_seq[seq][:max_hold]]
+        return codes, await _get_current_prices(token, codes)
+    finally:
+        await close_async_http_session()
 
 # 매도 주문
 def place_sell_order(token: str, code: str, qty: int, price: int):
@@ -107,9 +171,8 @@ def cal_account_balance(token: str, seed: float) -> float:
 # 09:00 매도 주문
 def opening_orders(token: str, config: dict):
     hold_list = get_hold_list()
+    _watch_quotes(hold_list['ticker'])
     for _, row in hold_list.iterrows():
-        sleep(HOLD_INTERVAL)
-
         code = row['ticker']
         avg_price = row["buy_avg_price"]
         qty = row["qty"]
@@ -128,7 +191,7 @@ def opening_orders(token: str, config: dict):
 
 # 15:20 매수 주문
 def closing_buy_orders(token: str, config: dict):
-    hold_list = get_hold_list(' WHERE last_order_id is not NULL')
+    hold_list = get_hold_list(where=lambda row: row.last_order_id is not None)
     max_hold = config['max_hold_stocks']
     if hold_list.shape[0] >= max_hold:
         logging.info(f"보유 종목이 {max_hold}개 이상입니다.")
@@ -139,16 +202,12 @@ def closing_buy_orders(token: str, config: dict):
         logging.info("매수 가능 잔고가 없습니다.")
         return
 
-    # 조건 검색식 기반 종목 코드 조회
-    from trading.condition_ws import fetch_condition_codes
-    import asyncio
-    codes = asyncio.run(fetch_condition_codes(token, seq="1", stex_tp="K"))[:max_hold] + \
-        asyncio.run(fetch_condition_codes(token, seq="2", stex_tp="K"))[:max_hold]
+    # 조건 검색식 기반 종목 코드(실시간 스트림 → 없으면 재조회) + 현재가 조회 (단일 이벤트 루프)
+    codes, prices = asyncio.run(_collect_buy_candidates(token, max_hold, _condition_hits()))
 
     for code in codes:
-        sleep(HOLD_INTERVAL)
-        price = get_current_price(token, code)
-        if price == 0:
+        price = prices.get(code)
+        if not price:
             continue
         qty = int(balance // (price * len(codes)))
         buy_price = calculate_tick_price(price)
@@ -156,12 +215,29 @@ def closing_buy_orders(token: str, config: dict):
 
 # 메인 함수
 def main():
+    global QUOTE_FEED, CONDITION_STREAMS
     config = open_yaml("config.yaml")
     
     set_access_token()
     token = get_access_token()
     init_db()
 
+    if QUOTE_STREAM:
+        try:
+            QUOTE_FEED = BackgroundQuoteFeed(token, QUOTES).start()
+            _watch_quotes(get_hold_list()['ticker'])
+        except Exception as e:
+            logging.warning(f"[QUOTE] 실시간 시세 연결 실패 → REST 사용: {e}")
+            QUOTE_FEED = None
+
+    if CONDITION_STREAM:
+        try:
+            # 장중 편입/이탈을 계속 반영해 두고 매수 시점에는 현재 목록만 읽음
+            CONDITION_STREAMS = BackgroundConditionStreams(token, BUY_CONDITIONS).start()
+        except Exception as e:
+            logging.warning(f"[COND] 실시간 조건검색 등록 실패 → 매수 시점에 재조회: {e}")
+            CONDITION_STREAMS = None
+
     now = datetime.now()
     open_time = now.replace(**config['time_settings']['open_time'])
     close_time = now.replace(**config['time_settings']['close_time'])
@@ -178,11 +254,18 @@ def main():
         pause.until(close_time)
         closing_buy_orders(token, config['trade'])
 
+    # 장 마감 이후에는 시세가 필요 없으므로 구독 해제 후 공용 WebSocket 세션 종료
+    if QUOTE_FEED is not None:
+        QUOTE_FEED.stop()
+    if CONDITION_STREAMS is not None:
+        CONDITION_STREAMS.stop()
+    stop_ws_threads()
+
     now = datetime.now()
     if now < download_time:
         logging.info(f"Download time까지 대기: {download_time}")
         pause.until(download_time)
-        download_main()
+        download_main([])  # main.py 자신의 sys.argv를 다운로더 인자로 해석하지 않도록 기본값으로 실행
 
     revoke_access_token()
 
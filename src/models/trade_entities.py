@@ -1,6 +1,6 @@
 from typing import Optional
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import String, Integer, Numeric, TIMESTAMP, Text, DateTime
+from sqlalchemy import String, Integer, Numeric, TIMESTAMP, Text, DateTime, Index, text
 from decimal import Decimal
 
 # Declarative Base (SQLAlchemy 2.x)
@@ -8,8 +8,14 @@ from decimal import Decimal
 class Base(DeclarativeBase):
     pass
 
+# 미청산 BUY 조건 (FIFO 매칭/원장 적재). 부분 인덱스 조건과 쿼리 조건이 같아야 planner가 사용함
+OPEN_BUY_WHERE = text("side = 'BUY' AND remaining_qty > 0")
+
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_status", "status"),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
     order_no: Mapped[str] = mapped_column(String(64), unique=True, index=True)
     account_id: Mapped[str] = mapped_column(String(32))
@@ -23,6 +29,13 @@ class Order(Base):
 
 class Execution(Base):
     __tablename__ = "executions"
+    __table_args__ = (
+        # _fetch_open_buy_executions: account/ticker 동등 조건 + exec_time, id 정렬을 인덱스 순서로 해결
+        Index("ix_executions_open_buy", "account_id", "ticker", "exec_time", "id",
+              sqlite_where=OPEN_BUY_WHERE, postgresql_where=OPEN_BUY_WHERE),
+        # list_executions(account_id, ticker, side)
+        Index("ix_executions_account_ticker_side", "account_id", "ticker", "side"),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
     exec_id: Mapped[str] = mapped_column(String(128), unique=True, index=True)
     order_no: Mapped[str] = mapped_column(String(64), index=True)
@@ -40,6 +53,10 @@ class Execution(Base):
 
 class Trade(Base):
     __tablename__ = "trades"
+    __table_args__ = (
+        # list_trades(account_id, ticker, start/end) → closed_at 범위 검색
+        Index("ix_trades_account_ticker_closed", "account_id", "ticker", "closed_at"),
+    )
     trade_id: Mapped[int] = mapped_column(primary_key=True)
 
     account_id: Mapped[str] = mapped_column(String(32))
@@ -1,15 +1,19 @@
 # tests/conftest.py
 import os
 import pathlib
+import shutil
+import tempfile
 import pytest
 
+# 테스트용 SQLite 파일 경로 (db.db import 전에 설정해야 엔진에 반영됨)
+# 소스 트리에 파일이 생기지 않도록 임시 디렉터리에 만듭니다.
+TEST_DB_DIR = pathlib.Path(tempfile.mkdtemp(prefix="trade_test_"))
+TEST_DB_PATH = TEST_DB_DIR / "trade_test.db"
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DB_PATH.as_posix()}"
+
 from db.db import engine, SessionLocal
 from models.trade_entities import Base
 
-# 테스트용 SQLite 파일 경로
-TEST_DB_PATH = pathlib.Path(__file__).parent / "trade_test.db"
-os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DB_PATH.as_posix()}"
-
 @pytest.fixture(scope="session", autouse=True)
 def initialize_database():
     """
@@ -20,8 +24,8 @@ def initialize_database():
         TEST_DB_PATH.unlink()
     Base.metadata.create_all(bind=engine)
     yield
-    # 필요 시 테스트 완료 후 삭제 가능
-    # TEST_DB_PATH.unlink(missing_ok=True)
+    engine.dispose()
+    shutil.rmtree(TEST_DB_DIR, ignore_errors=True)
 
 @pytest.fixture(scope="function")
 def db_session():
@@ -0,0 +1,76 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from api import base_client
+from api.base_client import BaseAPIClient, get_pool_stats
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive 허용
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        payload = json.dumps({"api_id": self.headers.get("api-id"), "echo": json.loads(body)}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_client.close_http_session()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    base_client.close_http_session()
+    server.shutdown()
+    server.server_close()
+
+
+def test_post_reuses_pooled_connection(local_server):
+    client = BaseAPIClient()
+    client.base_url = local_server
+
+    for i in range(5):
+        resp = client.post("/api/dostk/stkinfo", data={"stk_cd": f"00593{i}"}, headers={"api-id": "ka10001"})
+        assert resp.status_code == 200
+        assert resp.json()["api_id"] == "ka10001"
+
+    stats = get_pool_stats()
+    host = next(iter(stats.values()))
+    assert host["requests"] == 5
+    assert host["opened"] == 1
+    assert host["reused"] == 4
+    assert host["idle"] == 1
+
+
+def test_clients_share_one_session():
+    assert BaseAPIClient().session is BaseAPIClient().session
+
+
+def test_async_twin_uses_same_surface(local_server):
+    import asyncio
+    from api.async_client import close_async_http_session
+    from api.market import AsyncMarketAPI
+
+    async def run():
+        market = AsyncMarketAPI()
+        market.base_url = local_server
+        try:
+            results = await asyncio.gather(*(market.get_stock_info("tok", code) for code in ("005930", "000660")))
+        finally:
+            await close_async_http_session()
+        return results
+
+    results = asyncio.run(run())
+    assert [r["api_id"] for r in results] == ["ka10001", "ka10001"]
+    assert [r["echo"]["stk_cd"] for r in results] == ["005930", "000660"]
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from db.candle_archive import CandleArchive, export_candles_from_store, write_dataset
+from db.candle_store import CandleStore
+
+
+def _long(rows):
+    return pd.DataFrame(rows, columns=["code", "date", "open", "high", "low", "close", "volume"])
+
+
+def test_panel_from_partitions(tmp_path):
+    root = str(tmp_path / "archive")
+    written = write_dataset("daily", _long([
+        ("005930.KOSPI", "2023-12-28", 1, 1, 1, 78000, 10),
+        ("005930.KOSPI", "2024-01-02", 1, 1, 1, 79600, 11),
+        ("000660.KOSPI", "2024-01-02", 1, 1, 1, 140000, 12),
+        ("035720.KOSDAQ", "2024-01-03", 1, 1, 1, 55000, np.nan),
+    ]), root=root)
+    assert written == {("KOSDAQ", 2024): 1, ("KOSPI", 2023): 1, ("KOSPI", 2024): 2}
+
+    archive = CandleArchive(root)
+    dates, codes, close = archive.load_panel("close")
+    assert [str(d) for d in dates] == ["2023-12-28", "2024-01-02", "2024-01-03"]
+    assert codes == ["000660.KOSPI", "005930.KOSPI", "035720.KOSDAQ"]
+    assert close[1, 1] == 79600 and close[2, 2] == 55000
+    assert np.isnan(close[0, 0])
+
+    _, codes, _ = archive.load_panel("close", markets=["KOSPI"], years=[2024])
+    assert codes == ["000660.KOSPI", "005930.KOSPI"]
+
+
+def test_views_are_zero_copy(tmp_path):
+    root = str(tmp_path / "archive")
+    write_dataset("daily", _long([("005930.KOSPI", "2024-01-02", 1, 1, 1, 79600, 11)]), root=root)
+
+    view = next(CandleArchive(root).iter_views(columns=["close", "volume"]))
+    assert not view["close"].flags["OWNDATA"]
+    assert not view["close"].flags["WRITEABLE"]  # mmap 위의 읽기 전용 view
+    assert view["date"].dtype == np.dtype("datetime64[s]")
+    assert not view["date"].flags["OWNDATA"]
+    assert view["codes"][view["code_idx"][0]] == "005930.KOSPI"
+
+
+def test_export_from_candle_store(tmp_path):
+    store_path = str(tmp_path / "candles.db")
+    with CandleStore(store_path) as store:
+        store.upsert("005930.KOSPI", pd.DataFrame({
+            "date": ["2023-12-28", "2024-01-02"], "open": [1, 1], "high": [1, 1], "low": [1, 1],
+            "close": [78000, 79600], "volume": [10, 11],
+        }))
+
+    root = str(tmp_path / "archive")
+    assert export_candles_from_store(store_path, start="2024-06-01", root=root) == {("KOSPI", 2024): 1}
+    frame = CandleArchive(root).load_frame("close")
+    assert frame.loc["2024-01-02", "005930.KOSPI"] == 79600
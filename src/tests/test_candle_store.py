@@ -0,0 +1,71 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from db.candle_store import CandleStore, migrate_per_ticker_db
+
+
+def _daily(dates, closes):
+    return pd.DataFrame({
+        "date": dates, "open": closes, "high": closes, "low": closes, "close": closes,
+        "volume": [100] * len(dates),
+    })
+
+
+def test_load_many_codes_in_one_query(tmp_path):
+    with CandleStore(str(tmp_path / "candles.db")) as store:
+        store.upsert("005930.KOSPI", _daily(["20240102", "20240103"], [70000, 71000]))
+        store.upsert("000660.KOSPI", _daily(["2024-01-03", "2024-01-04"], [130000, 131000]))
+        store.upsert("035720.KOSDAQ", _daily(["2024-01-03"], [50000]))
+
+        df = store.load(["005930.KOSPI", "000660.KOSPI"], start="2024-01-03")
+        assert df[["code", "date", "close"]].values.tolist() == [
+            ["000660.KOSPI", "2024-01-03", 130000.0],
+            ["000660.KOSPI", "2024-01-04", 131000.0],
+            ["005930.KOSPI", "2024-01-03", 71000.0],
+        ]
+
+        panel = store.load_panel("close")
+        assert list(panel.columns) == ["000660.KOSPI", "005930.KOSPI", "035720.KOSDAQ"]
+        assert panel.loc["2024-01-02", "005930.KOSPI"] == 70000
+
+        dates, codes, values = store.load_array(fields=("close", "volume"))
+        assert values.shape == (2, 3, 3)
+        assert values.flags["C_CONTIGUOUS"]
+        assert np.isnan(values[0, 0, 0])  # 000660은 01-02 데이터 없음
+        assert values[0, list(dates).index("2024-01-04"), codes.index("000660.KOSPI")] == 131000
+
+
+def test_upsert_overwrites_same_day(tmp_path):
+    with CandleStore(str(tmp_path / "candles.db")) as store:
+        store.upsert("005930.KOSPI", _daily(["20240102"], [70000]))
+        store.upsert("005930.KOSPI", _daily(["20240102"], [70500]))
+        assert store.load()["close"].tolist() == [70500.0]
+        assert store.last_dates() == {"005930.KOSPI": "2024-01-02"}
+
+
+def test_migrate_from_per_ticker_tables(tmp_path):
+    legacy = tmp_path / "candle_data.db"
+    with sqlite3.connect(legacy) as con:
+        _daily(["2024-01-02", "2024-01-03"], [1, 2]).to_sql("005930.KOSPI", con, index=False)
+        pd.DataFrame({"Date": ["2024-01-02 00:00:00"], "Open": [5], "High": [5], "Low": [5], "Close": [5],
+                      "Volume": [1]}).to_sql("000660.KOSPI", con, index=False)
+        pd.DataFrame({"x": [1]}).to_sql("not_a_candle", con, index=False)
+
+    dst = str(tmp_path / "candles.db")
+    stats = migrate_per_ticker_db(str(legacy), dst)
+    assert stats == {"tables": 2, "rows": 3, "skipped": 1}
+
+    with CandleStore(dst) as store:
+        assert store.codes() == ["000660.KOSPI", "005930.KOSPI"]
+        assert store.load(["000660.KOSPI"])["date"].tolist() == ["2024-01-02"]
+
+
+def test_screen_universe_excludes_start_day(tmp_path):
+    from trading.screener import load_screen_universe
+
+    with CandleStore(str(tmp_path / "candles.db")) as store:
+        store.upsert("005930.KOSPI", _daily(["2019-06-28", "2019-07-01", "2019-07-02"], [100, 101, 102]))
+        (df,) = load_screen_universe(store, start="2019-07-01", min_rows=1)
+        assert df["Date"].tolist() == ["2019-07-02"] and df["market"].tolist() == ["KOSPI"]
@@ -0,0 +1,94 @@
+import sqlite3
+import threading
+
+import pandas as pd
+
+from trading.data_downloader import download_universe
+
+
+class _FakeChartService:
+    """get_daily_chart만 흉내내는 조회 서비스 (네트워크 없이 다운로더 검증용)"""
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def get_daily_chart(self, stk_cd, base_dt):
+        with self.lock:
+            self.threads.add(threading.current_thread().name)
+        if stk_cd in self.fail:
+            raise RuntimeError("boom")
+        idx = pd.to_datetime(["20240102", "20240103"], format="%Y%m%d")
+        return pd.DataFrame(
+            {"close": [100, 101], "volume": [10, 11], "open": [99, 100], "high": [102, 103], "low": [98, 99]},
+            index=pd.Index(idx, name="dt"),
+        )
+
+
+def test_download_universe_writes_all_codes(tmp_path):
+    db_path = str(tmp_path / "candle.db")
+    codes = [f"{i:06d}.KOSPI" for i in range(20)]
+    svc = _FakeChartService(fail={"000007"})
+
+    stats = download_universe(codes, svc, base_dt="20240103", workers=4, commit_every=3, db_path=db_path)
+
+    assert stats["codes"] == 20
+    assert stats["saved_codes"] == 19
+    assert stats["rows"] == 38
+    assert stats["errors"] == 1
+    assert len(svc.threads) > 1  # 실제로 병렬 조회
+
+    with sqlite3.connect(db_path) as con:
+        rows = con.execute("SELECT date, close, volume FROM candles WHERE code = '000001.KOSPI' ORDER BY date").fetchall()
+    assert rows == [("2024-01-02", 100.0, 10), ("2024-01-03", 101.0, 11)]
+
+
+def test_download_universe_appends_only_new_dates(tmp_path):
+    db_path = str(tmp_path / "candle.db")
+    codes = ["005930.KOSPI"]
+    download_universe(codes, _FakeChartService(), workers=1, db_path=db_path)
+    stats = download_universe(codes, _FakeChartService(), workers=1, db_path=db_path)
+    assert stats["rows"] == 0
+
+
+def test_download_universe_resumes_unfinished_codes(tmp_path):
+    db_path = str(tmp_path / "candle.db")
+    codes = [f"{i:06d}.KOSPI" for i in range(6)]
+
+    first = download_universe(codes, _FakeChartService(fail={"000002", "000004"}), base_dt="20240103",
+                              workers=2, db_path=db_path)
+    assert first["errors"] == 2
+
+    svc = _FakeChartService()
+    called = []
+    original = svc.get_daily_chart
+    svc.get_daily_chart = lambda stk_cd, base_dt: called.append(stk_cd) or original(stk_cd, base_dt)
+    second = download_universe(codes, svc, base_dt="20240103", workers=2, db_path=db_path)
+
+    assert sorted(called) == ["000002", "000004"]
+    assert second["skipped"] == 4
+    assert second["saved_codes"] == 2
+
+    with sqlite3.connect(db_path) as con:
+        statuses = dict(con.execute("SELECT code, status FROM _download_manifest").fetchall())
+    assert set(statuses.values()) == {"done"}
+
+
+def test_download_universe_skips_codes_that_keep_failing(tmp_path):
+    db_path = str(tmp_path / "candle.db")
+    codes = ["000001.KOSPI"]
+    for _ in range(2):
+        download_universe(codes, _FakeChartService(fail={"000001"}), base_dt="20240103", workers=1,
+                          db_path=db_path, max_errors=2)
+    stats = download_universe(codes, _FakeChartService(), base_dt="20240103", workers=1,
+                              db_path=db_path, max_errors=2)
+    assert stats["codes"] == 0 and stats["skipped"] == 1
+
+
+def test_shards_partition_the_universe():
+    from trading.data_downloader import parse_shard, shard_codes
+
+    codes = [f"{i:06d}.KOSDAQ" for i in range(200)]
+    parts = [shard_codes(codes, *parse_shard(f"{i}/3")) for i in range(3)]
+    assert sorted(sum(parts, [])) == codes
+    assert all(parts)
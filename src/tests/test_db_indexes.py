@@ -0,0 +1,34 @@
+from sqlalchemy import inspect, select
+
+from db.db import engine, ensure_indexes
+from models.trade_entities import Execution, Trade
+
+
+def _plan(stmt) -> str:
+    compiled = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        return " ".join(r[-1] for r in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled)))
+
+
+def test_ensure_indexes_adds_missing_indexes_to_existing_tables():
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_executions_open_buy")
+        conn.exec_driver_sql("DROP INDEX ix_trades_account_ticker_closed")
+
+    assert ensure_indexes() == ["ix_executions_open_buy", "ix_trades_account_ticker_closed"]
+    assert ensure_indexes() == []
+    names = {ix["name"] for ix in inspect(engine).get_indexes("executions")}
+    assert {"ix_executions_open_buy", "ix_executions_account_ticker_side", "ix_executions_exec_id"} <= names
+
+
+def test_hot_queries_use_indexes_without_sorting():
+    open_buys = (select(Execution)
+                 .where(Execution.account_id == "A", Execution.ticker == "005930",
+                        Execution.side == "BUY", Execution.remaining_qty > 0)
+                 .order_by(Execution.exec_time.asc(), Execution.id.asc()))
+    plan = _plan(open_buys)
+    assert "ix_executions_open_buy" in plan and "TEMP B-TREE" not in plan
+
+    trades = select(Trade).where(Trade.account_id == "A", Trade.ticker == "005930",
+                                 Trade.closed_at >= "2025-01-01")
+    assert "ix_trades_account_ticker_closed" in _plan(trades)
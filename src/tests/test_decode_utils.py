@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from api.stock_chart_service import StockChartService
+from benchmarks.bench_chart_decode import legacy_convert_to_dataframe
+from utils.decode_utils import decode_date, decode_datetime, decode_float, decode_int
+
+
+def test_decode_int_handles_sign_padding_and_blanks():
+    values = ["+00071500", "-1200", "000123", "", "1,234"]
+    assert decode_int(values).tolist() == [71500, -1200, 123, 0, 1234]
+    assert decode_int(values, absolute=True).tolist() == [71500, 1200, 123, 0, 1234]
+    assert decode_int(["", "7"], fill=-1).tolist() == [-1, 7]
+
+
+def test_decode_float_keeps_fraction_and_nan():
+    out = decode_float(["+12.50", "-0.25", "", "7"])
+    assert out[:2].tolist() == [12.5, -0.25]
+    assert np.isnan(out[2]) and out[3] == 7.0
+    assert decode_float(np.array([1, -2]), absolute=True).tolist() == [1.0, 2.0]
+
+
+def test_decode_dates():
+    assert decode_date(["20240229", "19991231"]).astype(str).tolist() == ["2024-02-29", "1999-12-31"]
+    assert decode_datetime(["20240102093015"]).astype(str).tolist() == ["2024-01-02T09:30:15"]
+    # 빈 값 / 숫자 없는 값은 NaT (0년 날짜로 바뀌지 않음)
+    assert decode_date(["20240102", "", "--"]).astype(str).tolist() == ["2024-01-02", "NaT", "NaT"]
+    assert decode_datetime(["", "20240102093015"]).astype(str).tolist() == ["NaT", "2024-01-02T09:30:15"]
+    assert decode_date(np.array([20240102.0, np.nan])).astype(str).tolist() == ["2024-01-02", "NaT"]
+
+
+def test_convert_matches_previous_implementation():
+    daily = [
+        {"cur_prc": "+71500", "trde_qty": "1200345", "trde_prica": "85000", "dt": "20240103",
+         "open_pric": "-71000", "high_pric": "+72000", "low_pric": "-70500", "upd_stkpc_tp": ""},
+        {"cur_prc": "-70900", "trde_qty": "998", "trde_prica": "70", "dt": "20240102",
+         "open_pric": "71000", "high_pric": "71200", "low_pric": "70100"},
+    ]
+    minute = [
+        {"cur_prc": "-71500", "trde_qty": "12", "cntr_tm": "20240103090100",
+         "open_pric": "+71000", "high_pric": "72000", "low_pric": "-70500"},
+        {"cur_prc": "71400", "trde_qty": "3", "cntr_tm": "20240103090000",
+         "open_pric": "71000", "high_pric": "71200", "low_pric": "70100"},
+    ]
+    svc = StockChartService("tok")
+    pd.testing.assert_frame_equal(svc._convert_to_dataframe(daily), legacy_convert_to_dataframe(daily))
+    pd.testing.assert_frame_equal(svc._convert_to_dataframe(minute, is_intraday=True), legacy_convert_to_dataframe(minute, is_intraday=True))
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading import indicators
+from trading.indicator_engine import INDICATOR_COLUMNS
+from trading.indicators import (FEATURE_COLUMNS, FEATURES, compute_indicators, register_feature, required_features,
+                                resolve_features)
+
+
+def _ohlcv(n: int = 300, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = close * np.exp(rng.normal(0, 0.01, n))
+    high = np.maximum(open_, close) * (1 + rng.random(n) * 0.02)
+    low = np.minimum(open_, close) * (1 - rng.random(n) * 0.02)
+    volume = rng.integers(1_000, 100_000, n).astype(float)
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume},
+                        index=pd.bdate_range("2022-01-03", periods=n, name="date"))
+
+
+def test_registry_covers_all_indicator_columns_in_order():
+    assert tuple(FEATURE_COLUMNS) == INDICATOR_COLUMNS
+    assert resolve_features() == list(FEATURES)
+
+
+def test_resolve_pulls_dependencies_and_ignores_unknown_names():
+    assert resolve_features(["vrate"]) == ["avg_volume", "vrate"]
+    assert resolve_features(["MACDs", "COR", "MACD"]) == ["macd", "COR"]
+    assert resolve_features(["close", "시가총액", "PBR", "DIV"]) == []
+    assert resolve_features(["bbands"]) == ["bbands"]
+
+
+def test_required_features_merges_filter_and_model_columns():
+    names = required_features({"features": ["PBR", "COR", "RSI"]}, "KQ")
+    assert names[:2] == ["COR", "vrate"] and names[-2:] == ["PBR", "RSI"]
+    assert names.count("COR") == 1
+    assert "days_since_max_high" in required_features({}, "KS")
+
+
+def test_selected_features_only_compute_requested_columns():
+    df = _ohlcv()
+    out = compute_indicators(df.copy(), features=["close", "COR", "vrate", "mapct_200", "recover_days", "PBR"])
+    assert list(out.columns) == list(df.columns) + ["avg_volume", "vrate", "mapct_200", "COR", "recover_days"]
+
+    avg = df["volume"].rolling(90).mean()
+    pd.testing.assert_series_equal(out["vrate"], df["volume"] / avg, check_names=False)
+    pd.testing.assert_series_equal(out["COR"], (df["high"] - df["open"]) / df["open"], check_names=False)
+    pd.testing.assert_series_equal(out["mapct_200"], (df["close"].rolling(200).mean() - df["close"]) / df["close"],
+                                   check_names=False)
+    assert (out["recover_days"] == (df.index[-1] - df["low"].idxmin()).days).all()
+
+
+def test_pandas_ta_feature_without_pandas_ta_raises(monkeypatch):
+    monkeypatch.setattr(indicators, "ta", None)
+    compute_indicators(_ohlcv(), features=["COR", "zlema", "baseline"])
+    with pytest.raises(ImportError):
+        compute_indicators(_ohlcv(), features=["RSI"])
+
+
+def test_register_rejects_unknown_dependency_and_duplicate_column():
+    before = dict(FEATURES)
+    with pytest.raises(ValueError):
+        register_feature("x_ratio", requires=("not_a_column",))(lambda df: None)
+    with pytest.raises(ValueError):
+        register_feature("x_rsi", columns=("RSI",))(lambda df: None)
+    assert FEATURES == before
+
+
+def test_subset_matches_full_computation():
+    pytest.importorskip("pandas_ta")
+    df = _ohlcv()
+    full = compute_indicators(df.copy())
+    names = ["COR", "vrate", "ADX", "mapct_20", "SMI", "CCI", "OBV", "days_since_max_high"]
+    subset = compute_indicators(df.copy(), features=names)
+    pd.testing.assert_frame_equal(subset[names], full[names])
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from db.db import engine, get_open_position_qty, get_session, ingest_executions, list_executions, list_trades
+from db.fifo import LEDGER, LotLedger
+from models.trade_entities import Execution
+
+ACC = "LEDGER-1"
+T0 = datetime(2025, 1, 3, 9, 0, 0)
+
+
+def _fill(exec_id, side, qty, price, minutes, account_id=ACC):
+    return {"exec_id": exec_id, "order_no": f"O-{exec_id}", "account_id": account_id, "ticker": "000660",
+            "market": "KRX", "side": side, "qty": qty, "price": price, "commission": 0, "tax": 0,
+            "exec_time": T0 + timedelta(minutes=minutes), "status": "FILLED"}
+
+
+def _count_statements(fn):
+    statements = []
+    listener = lambda conn, cursor, stmt, params, ctx, many: statements.append((stmt, many))
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return statements
+
+
+def test_sell_spanning_lots_matches_in_memory_and_persists_in_one_update():
+    ingest_executions([_fill(f"LG-B{i}", "BUY", 2, 100 + i, i) for i in range(5)])
+    assert [q for _, q in LEDGER.open_lots(ACC, "000660")] == [2] * 5
+
+    statements = _count_statements(lambda: ingest_executions([_fill("LG-S1", "SELL", 7, 200, 10)]))
+    assert not [s for s, _ in statements if s.startswith("SELECT") and "remaining_qty >" in s]  # 미청산 BUY 재조회 없음
+    updates = [many for s, many in statements if s.startswith("UPDATE executions")]
+    assert updates == [True]               # remaining_qty는 executemany 한 번
+
+    assert [(e, float(q)) for e, q in LEDGER.open_lots(ACC, "000660")] == [("LG-B3", 1), ("LG-B4", 2)]
+    remaining = {e.exec_id: float(e.remaining_qty) for e in list_executions(account_id=ACC, side="BUY")}
+    assert remaining == {"LG-B0": 0, "LG-B1": 0, "LG-B2": 0, "LG-B3": 1, "LG-B4": 2}
+    assert sorted(float(t.qty) for t in list_trades(account_id=ACC)) == [1, 2, 2, 2]
+
+    # DB에서 새로 적재한 원장도 같은 상태
+    fresh = LotLedger()
+    with get_session() as s:
+        fresh.load(s)
+    assert fresh.open_lots(ACC, "000660") == LEDGER.open_lots(ACC, "000660")
+
+
+def test_failed_transaction_invalidates_ledger_and_reloads_from_db():
+    acc = "LEDGER-2"
+    ingest_executions([_fill("LG2-B", "BUY", 3, 50, 0, account_id=acc)])
+
+    with pytest.raises(RuntimeError):
+        with LEDGER.transaction(get_session) as s:
+            e = Execution(**{k: v for k, v in _fill("LG2-S", "SELL", 2, 60, 1, account_id=acc).items()
+                             if k != "status"})
+            s.add(e)
+            LEDGER.match_sell(s, e)
+            raise RuntimeError("boom")
+
+    assert not LEDGER.loaded
+    assert list_trades(account_id=acc) == []
+    ingest_executions([_fill("LG2-S", "SELL", 2, 60, 1, account_id=acc)])
+    assert [float(q) for _, q in LEDGER.open_lots(acc, "000660")] == [1]
+    assert float(list_executions(account_id=acc, side="BUY")[0].remaining_qty) == 1
+
+
+def test_ledger_reloads_after_another_process_records_executions():
+    acc = "LEDGER-3"
+    ingest_executions([_fill("LG3-B1", "BUY", 2, 100, 0, account_id=acc)])
+    loads = LEDGER.stats["loads"]
+
+    # 다른 프로세스가 같은 DB에 BUY를 기록 (이 프로세스의 원장은 모름)
+    other = LotLedger()
+    with other.transaction(get_session) as s:
+        e = Execution(**{k: v for k, v in _fill("LG3-B2", "BUY", 3, 110, 1, account_id=acc).items()
+                         if k != "status"}, remaining_qty=3)
+        s.add(e)
+    assert LEDGER.open_qty(acc, "000660") == 2
+
+    assert float(get_open_position_qty(acc, "000660")) == 5
+    assert LEDGER.stats["loads"] == loads + 1
+    ingest_executions([_fill("LG3-S1", "SELL", 4, 120, 2, account_id=acc)])
+    assert [(e, float(q)) for e, q in LEDGER.open_lots(acc, "000660")] == [("LG3-B2", 1)]
+    assert LEDGER.stats["loads"] == loads + 1  # 자기 트랜잭션의 기록으로는 다시 적재하지 않음
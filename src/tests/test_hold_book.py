@@ -0,0 +1,115 @@
+import sqlite3
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from db import hold_sqlite
+from db.hold_sqlite import HoldBook
+
+T0 = datetime(2025, 1, 2, 9, 0, 0)
+
+
+@pytest.fixture
+def book(tmp_path, monkeypatch):
+    book = HoldBook(str(tmp_path / "hold.db"))
+    monkeypatch.setattr(hold_sqlite, "HOLD_BOOK", book)
+    yield book
+    book.close()
+
+
+def _buy(qty, price, order_no="O1", ticker="005930"):
+    hold_sqlite.upsert_hold_after_buy(account_id="A", ticker=ticker, market="KRX", exec_qty=Decimal(qty),
+                                      exec_price=Decimal(price), commission=Decimal("1"), tax=Decimal("0"),
+                                      now_ts=T0, last_order_id=order_no)
+
+
+def test_write_through_keeps_cache_and_db_in_sync_without_reloading(book):
+    events = []
+    book.on_change.append(lambda kind, row: events.append((kind, row.ticker, row.qty)))
+
+    _buy(10, 100)
+    _buy(10, 110, order_no="O2")
+    hold_sqlite.apply_sell_to_hold(account_id="A", ticker="005930", exec_qty=Decimal(5),
+                                   commission=Decimal("1"), tax=Decimal("2"), now_ts=T0)
+
+    row = hold_sqlite.get_hold("A", "005930")
+    assert (row.qty, row.buy_avg_price, row.n_trade, row["last_order_id"]) == (15, Decimal("105"), 2, "O2")
+    assert (row.target_price, row.stop_price, row.tax_accum) == (Decimal("115.50"), Decimal("94.50"), 2)
+    assert row.buy_time == T0
+    assert events == [("insert", "005930", 10), ("update", "005930", 20), ("update", "005930", 15)]
+    assert book.stats["loads"] == 1
+
+    with sqlite3.connect(book.path) as conn:
+        conn.row_factory = sqlite3.Row
+        db_row = conn.execute("SELECT * FROM hold_list").fetchone()
+    assert hold_sqlite.HoldRow(**dict(db_row)).as_dict() == row.as_dict()
+
+
+def test_snapshot_is_reused_until_changed_and_filters_rows(book):
+    _buy(10, 100)
+    first = hold_sqlite.get_hold_list()
+    assert first["qty"].tolist() == [10] and first["buy_avg_price"].dtype == "float64"
+    assert hold_sqlite.get_hold_list()["qty"].values.base is first["qty"].values.base
+
+    hold_sqlite.apply_fills([{"account_id": "A", "ticker": "000660", "side": "BUY", "qty": 3, "price": 50}],
+                            now_ts=T0)
+    assert hold_sqlite.get_hold_list()["ticker"].tolist() == ["005930", "000660"]
+    picked = hold_sqlite.get_hold_list(where=lambda r: r.ticker == "000660")
+    assert picked["last_order_id"].tolist() == [None]
+
+
+def test_snapshot_keeps_quantities_integral_for_order_payload(book, monkeypatch):
+    main = pytest.importorskip("main")
+    _buy(10, 100)
+    frame = hold_sqlite.get_hold_list()
+    assert frame["qty"].dtype == "int64" and frame["remain_qty"].dtype == "int64"
+    assert hold_sqlite.get_hold_list(where=lambda r: True)["qty"].dtype == "int64"
+
+    sent = []
+
+    class _OrderAPI:
+        def stock_sell_order(self, token, data):
+            sent.append(data)
+            return {"return_code": 1}
+
+    monkeypatch.setattr(main, "OrderAPI", _OrderAPI)
+    row = frame.iloc[0]
+    main.place_sell_order("T", row["ticker"], row["qty"], 110)
+    assert sent[0]["ord_qty"] == "10"
+
+
+def test_reloads_after_write_from_another_connection(book):
+    _buy(10, 100)
+    with sqlite3.connect(book.path) as other:
+        other.execute("UPDATE hold_list SET qty=7, remain_qty=7")
+    assert hold_sqlite.get_hold("A", "005930").qty == 7
+    assert book.stats["loads"] == 2
+
+
+def test_failed_batch_rolls_back_and_keeps_cache_consistent(book):
+    _buy(10, 100)
+    with pytest.raises(KeyError):
+        hold_sqlite.apply_fills([
+            {"account_id": "A", "ticker": "005930", "side": "SELL", "qty": 4},
+            {"account_id": "A", "side": "SELL", "qty": 1},          # ticker 누락
+        ], now_ts=T0)
+    assert hold_sqlite.get_hold("A", "005930").qty == 10
+
+
+def test_apply_fills_is_idempotent_by_exec_id(book):
+    fills = [{"account_id": "A", "ticker": "005930", "side": "BUY", "qty": 10, "price": 100, "exec_id": "E1"},
+             {"account_id": "A", "ticker": "005930", "side": "BUY", "qty": 10, "price": 100, "exec_id": "E1"}]
+    assert hold_sqlite.apply_fills(fills, now_ts=T0) == 1
+
+    # 실패한 묶음은 exec_id 기록도 롤백 → 재시도 때 반영
+    with pytest.raises(KeyError):
+        hold_sqlite.apply_fills([
+            {"account_id": "A", "ticker": "005930", "side": "BUY", "qty": 5, "price": 100, "exec_id": "E2"},
+            {"account_id": "A", "side": "SELL", "qty": 1, "exec_id": "E3"},
+        ], now_ts=T0)
+    assert hold_sqlite.get_hold("A", "005930").qty == 10
+
+    retry = [{"account_id": "A", "ticker": "005930", "side": "BUY", "qty": 5, "price": 100, "exec_id": "E2"}]
+    assert hold_sqlite.apply_fills(fills + retry, now_ts=T0) == 1
+    assert hold_sqlite.get_hold("A", "005930").qty == 15
@@ -0,0 +1,150 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from db import candle_store
+from trading import data_downloader, indicator_cache, indicators
+from trading.indicator_cache import IndicatorCache, cache_version
+from trading.indicators import compute_indicators
+
+FEATURES = ["COR", "vrate", "mapct_20", "recover_days", "close", "PBR"]
+
+
+def _ohlcv(n: int = 150, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = close * np.exp(rng.normal(0, 0.01, n))
+    return pd.DataFrame({"open": open_, "high": np.maximum(open_, close) * 1.01,
+                         "low": np.minimum(open_, close) * 0.99, "close": close,
+                         "volume": rng.integers(1_000, 100_000, n).astype(float)},
+                        index=pd.bdate_range("2024-01-02", periods=n, name="date"))
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    calls = []
+
+    def compute(df, features=None):
+        calls.append(len(df))
+        return compute_indicators(df, features=features)
+
+    monkeypatch.setattr(indicator_cache, "compute_indicators", compute)
+    return calls
+
+
+def test_hit_after_restart_skips_compute(tmp_path, counted):
+    path = str(tmp_path / "candles.db")
+    df = _ohlcv()
+    with IndicatorCache(path) as cache:
+        first = cache.frame("005930.KS", df.copy(), features=FEATURES)
+    with IndicatorCache(path) as cache:                   # 재시작
+        again = cache.frame("005930.KS", df.copy(), features=FEATURES)
+        assert cache.stats["hits"] == 1
+    assert counted == [150]
+    pd.testing.assert_frame_equal(first, again)
+    expected = compute_indicators(df.copy(), features=FEATURES).iloc[[-1]]
+    pd.testing.assert_frame_equal(again[expected.columns], expected, check_dtype=False)
+
+
+def test_miss_on_new_bar_revised_bar_or_other_feature_set(tmp_path, counted):
+    df = _ohlcv()
+    with IndicatorCache(str(tmp_path / "candles.db")) as cache:
+        cache.frame("005930.KS", df.iloc[:-1].copy(), features=FEATURES)
+        cache.frame("005930.KS", df.copy(), features=FEATURES)              # 새 봉
+        revised = df.copy()
+        revised.iloc[-1, revised.columns.get_loc("close")] *= 1.01          # 같은 날짜 봉 갱신 (장중)
+        cache.frame("005930.KS", revised, features=FEATURES)
+        cache.frame("005930.KS", revised.copy(), features=["COR"])          # 다른 지표 세트
+        cache.frame("005930.KS", revised.copy(), features=FEATURES)
+        assert counted == [149, 150, 150, 150]
+        assert cache.stats == {"hits": 1, "misses": 4, "evicted": 0}
+        assert len(cache) == 2                                              # 종목 × 버전당 1행
+    assert cache_version(FEATURES) == cache_version(["vrate", "COR", "recover_days", "mapct_20"])
+    assert cache_version(FEATURES) != cache_version(["COR"])
+
+
+def test_upsert_daily_candles_invalidates_ticker(tmp_path, monkeypatch, counted):
+    path = str(tmp_path / "candles.db")
+    monkeypatch.setattr(data_downloader, "DB_PATH", path)
+    df = _ohlcv()
+    with IndicatorCache(path) as cache:
+        cache.frame("005930.KS", df.copy(), features=FEATURES)
+        cache.frame("000660.KS", df.copy(), features=FEATURES)
+
+    raw = df.reset_index().rename(columns={"date": "dt"})
+    data_downloader.upsert_daily_candles("005930.KOSPI", raw.iloc[-5:])
+
+    with IndicatorCache(path) as cache:
+        assert len(cache) == 1
+        cache.frame("005930.KS", df.copy(), features=FEATURES)
+        cache.frame("000660.KS", df.copy(), features=FEATURES)
+        assert cache.stats["hits"] == 1
+    assert len(counted) == 3
+
+
+def test_size_bound_evicts_least_recently_used(tmp_path, counted):
+    df = _ohlcv(40)
+    with IndicatorCache(str(tmp_path / "candles.db"), max_entries=3) as cache:
+        for code in ("A", "B", "C"):
+            cache.frame(code, df.copy(), features=FEATURES)
+        cache.frame("A", df.copy(), features=FEATURES)                     # A 사용 → B가 가장 오래됨
+        cache.frame("D", df.copy(), features=FEATURES)
+        assert len(cache) == 3 and cache.stats["evicted"] == 1
+        cache.frame("B", df.copy(), features=FEATURES)
+        cache.frame("A", df.copy(), features=FEATURES)
+    assert len(counted) == 5
+
+
+def test_write_candles_clears_cache_in_same_transaction(tmp_path):
+    con = candle_store.connect(str(tmp_path / "candles.db"))
+    try:
+        con.execute(f"INSERT INTO {candle_store.INDICATOR_CACHE_TABLE} VALUES ('005930', '2024-01-02', 'v', '[]', '{{}}', 0)")
+        con.commit()
+        candle_store.write_candles(con, "005930.KOSPI", pd.DataFrame({"date": ["2024-01-03"], "close": [1.0]}))
+        con.rollback()
+        assert con.execute(f"SELECT COUNT(*) FROM {candle_store.INDICATOR_CACHE_TABLE}").fetchone()[0] == 1
+        candle_store.write_candles(con, "005930.KOSPI", pd.DataFrame({"date": ["2024-01-03"], "close": [1.0]}))
+        con.commit()
+        assert con.execute(f"SELECT COUNT(*) FROM {candle_store.INDICATOR_CACHE_TABLE}").fetchone()[0] == 0
+    finally:
+        con.close()
+
+
+def test_dated_feature_is_recomputed_on_hit(tmp_path, monkeypatch, counted):
+    class _Day:
+        today_ = datetime(2024, 7, 1)
+
+        @classmethod
+        def today(cls):
+            return cls.today_
+
+    monkeypatch.setattr(indicators, "datetime", _Day)
+    features = ["days_since_max_high", "COR"]
+    df = _ohlcv()
+    with IndicatorCache(str(tmp_path / "candles.db")) as cache:
+        first = cache.frame("005930.KS", df.copy(), features=features)
+        _Day.today_ = datetime(2024, 7, 11)                               # 캔들 그대로, 다음 실행일
+        again = cache.frame("005930.KS", df.copy(), features=features)
+        stored = cache.connect().execute(f"SELECT vals FROM {candle_store.INDICATOR_CACHE_TABLE}").fetchone()[0]
+        assert cache.stats["hits"] == 1
+    assert counted == [150, 150]                                          # 두 번째는 dated 단계만 계산
+    assert again["days_since_max_high"].iloc[0] == first["days_since_max_high"].iloc[0] + 10
+    assert again["COR"].iloc[0] == first["COR"].iloc[0]
+    assert "days_since_max_high" not in stored
+
+
+def test_hits_do_not_write_until_flush(tmp_path, counted):
+    df = _ohlcv(40)
+    with IndicatorCache(str(tmp_path / "candles.db")) as cache:
+        cache.frame("A", df.copy(), features=FEATURES)
+        con = cache.connect()
+        used_at = con.execute(f"SELECT used_at FROM {candle_store.INDICATOR_CACHE_TABLE}").fetchone()[0]
+        writes = con.total_changes
+        for _ in range(3):
+            cache.frame("A", df.copy(), features=FEATURES)
+        assert con.total_changes == writes
+        cache.flush()
+        assert con.total_changes == writes + 1
+        assert con.execute(f"SELECT used_at FROM {candle_store.INDICATOR_CACHE_TABLE}").fetchone()[0] > used_at
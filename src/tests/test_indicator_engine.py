@@ -0,0 +1,148 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading.indicator_engine import INDICATOR_COLUMNS, IndicatorEngine
+from trading.indicators import moving_average, zlema
+
+TODAY = datetime(2025, 6, 30)
+
+
+def _ohlcv(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = close * np.exp(rng.normal(0, 0.01, n))
+    high = np.maximum(open_, close) * (1 + rng.random(n) * 0.02)
+    low = np.minimum(open_, close) * (1 - rng.random(n) * 0.02)
+    volume = rng.integers(1_000, 100_000, n).astype(float)
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume},
+                        index=pd.bdate_range("2022-01-03", periods=n, name="date"))
+
+
+def _assert_close(expected: dict, row: pd.Series, columns):
+    for c in columns:
+        assert np.isclose(expected[c], row[c], rtol=1e-8, atol=1e-9, equal_nan=True), (c, expected[c], row[c])
+
+
+# -----------------------------
+# pandas 기준 구현 (pandas_ta 기본값과 같은 식)
+# -----------------------------
+def _pta_ema(s: pd.Series, n: int) -> pd.Series:
+    s = s.copy()
+    seed = s.iloc[:n].mean()
+    s.iloc[:n - 1] = np.nan
+    s.iloc[n - 1] = seed
+    return s.ewm(span=n, adjust=False).mean()
+
+
+def _rma(s: pd.Series, n: int) -> pd.Series:
+    return s.ewm(alpha=1 / n, min_periods=n).mean()
+
+
+def _reference(df: pd.DataFrame) -> dict:
+    h, l, c, o, v = df["high"], df["low"], df["close"], df["open"], df["volume"]
+    diff = c.diff()
+    rsi = 100 * _rma(diff.clip(lower=0), 14) / (_rma(diff.clip(lower=0), 14) + _rma(diff.clip(upper=0), 14).abs())
+    tr = pd.concat([h - l, h - c.shift(), c.shift() - l], axis=1).abs().max(axis=1)
+    tr.iloc[0] = np.nan
+    atr = _rma(tr, 14)
+    up, dn = h.diff(), -l.diff()
+    pos = (((up > dn) & (up > 0)) * up).where(up.notna())
+    neg = (((dn > up) & (dn > 0)) * dn).where(dn.notna())
+    dmp, dmn = 100 / atr * _rma(pos, 14), 100 / atr * _rma(neg, 14)
+    macd = _pta_ema(c, 12) - _pta_ema(c, 26)
+    signal = _pta_ema(macd.loc[macd.first_valid_index():], 9)
+    mid, sd = c.rolling(20).mean(), c.rolling(20).std(ddof=0)
+    tp = (h + l + c) / 3
+    mad = tp.rolling(20).apply(lambda x: np.abs(x - x.mean()).mean(), raw=True)
+    smi = 100 * _pta_ema(_pta_ema(diff, 14), 3) / _pta_ema(_pta_ema(diff.abs(), 14), 3)
+    lo, hi = rsi.rolling(14).min(), rsi.rolling(14).max()
+    stoch_rsi = (100 * (rsi - lo) / (hi - lo)).rolling(3).mean()
+    band = tr.rolling(20).mean()
+    x = np.arange(1, 21)
+    linreg = lambda y: np.polyval(np.polyfit(x, y, 1), 19)     # pandas_ta linreg: m*(n-1)+b
+    sqz = (c - (0.25 * (h.rolling(20).max() + l.rolling(20).min()) + 0.5 * mid)).rolling(20).apply(linreg, raw=True)
+    out = {
+        "RSI": rsi, "ATR": atr, "ADX": _rma(100 * (dmp - dmn).abs() / (dmp + dmn), 14),
+        "MACD": macd, "MACDs": signal, "MACDh": macd - signal,
+        "BB_mid": mid, "BB_lower_pct": (mid - 2 * sd - c) / c, "BB_upper_pct": (mid + 2 * sd - c) / c,
+        "BB_length": 4 * sd / (mid - 2 * sd),
+        "SMI": smi, "Stoch_RSI": stoch_rsi, "SQZ_VAL": sqz,
+        "SQZ_ON": ((mid - 2 * sd > mid - 1.5 * band) & (mid + 2 * sd < mid + 1.5 * band)).astype(int),
+        "CCI": (tp - tp.rolling(20).mean()) / (0.015 * mad),
+        "OBV": (np.sign(diff).fillna(1) * v).cumsum(),
+        "avg_volume": v.rolling(90).mean(), "vrate": v / v.rolling(90).mean(),
+        "COR": (h - o) / o, "LOR": (l - o) / o, "HOR": (h - o) / o,
+        "LCR": (l - c) / c, "HCR": (h - c) / c, "HLR": (h - l) / l,
+        "zlema": zlema(df.copy(), length=70)["zlema"],
+        "baseline": moving_average(c, 60, ma_type="HMA"),
+    }
+    for n in (5, 20, 60, 200):
+        out[f"mapct_{n}"] = (c.rolling(n).mean() - c) / c
+    last = {k: s.iloc[-1] for k, s in out.items()}
+    last.update({
+        "recover_days": (df.index[-1] - l.idxmin()).days,
+        "correct_days": (df.index[-1] - h.idxmax()).days,
+        "minmaxgap": (h.max() - l.min()) / l.min(),
+        "close_std": c.std(),
+        "profit_600": (c.iloc[-1] - c.iloc[0]) / c.iloc[0],
+        "days_since_max_high": (TODAY - df.tail(600)["high"].idxmax()).days,
+    })
+    return last
+
+
+@pytest.mark.parametrize("n", [45, 120, 700])
+def test_last_row_matches_vectorized_formulas(n):
+    df = _ohlcv(n, seed=n)
+    row = IndicatorEngine("unused.pkl").frame("A", df, today=TODAY).iloc[-1]
+    expected = _reference(df)
+    assert set(expected) == set(INDICATOR_COLUMNS)
+    _assert_close(expected, row, INDICATOR_COLUMNS)
+
+
+@pytest.mark.parametrize("n", [60, 250, 700])
+def test_last_row_matches_compute_indicators(n):
+    pytest.importorskip("pandas_ta")
+    from trading.indicators import compute_indicators
+
+    df = _ohlcv(n, seed=n)
+    batch = compute_indicators(df.copy()).iloc[-1]
+    row = IndicatorEngine("unused.pkl").frame("A", df).iloc[-1]
+    _assert_close(batch, row, INDICATOR_COLUMNS)
+
+
+def test_incremental_advance_after_reload_equals_full_rebuild(tmp_path):
+    df = _ohlcv(400, seed=1)
+    path = str(tmp_path / "state.pkl")
+
+    engine = IndicatorEngine(path)
+    assert engine.advance("A", df.iloc[:380]) == 380
+    engine.save()
+
+    resumed = IndicatorEngine.open(path)
+    assert "A" in resumed
+    assert resumed.advance("A", df.iloc[:390]) == 10
+    row = resumed.frame("A", df, today=TODAY).iloc[-1]
+    assert resumed.stats == {"bars": 20, "rebuilds": 0}
+
+    fresh = IndicatorEngine(path).frame("A", df, today=TODAY).iloc[-1]
+    _assert_close(fresh, row, INDICATOR_COLUMNS)
+    assert row["close"] == df["close"].iloc[-1]
+
+
+def test_rebuilds_when_stored_bar_changed_or_missing():
+    df = _ohlcv(100, seed=2)
+    engine = IndicatorEngine("unused.pkl")
+    engine.advance("A", df.iloc[:90])
+
+    revised = df.copy()
+    revised.iloc[89, revised.columns.get_loc("close")] *= 1.01     # 저장된 마지막 봉이 수정됨
+    engine.advance("A", revised)
+    assert engine.stats["rebuilds"] == 1
+    _assert_close(IndicatorEngine("unused.pkl").frame("A", revised, today=TODAY).iloc[-1],
+                  engine.frame("A", revised, today=TODAY).iloc[-1], INDICATOR_COLUMNS)
+
+    engine.advance("A", df.iloc[:50])                                # 저장된 마지막 봉이 없는 이력
+    assert engine.stats["rebuilds"] == 2 and engine.states["A"].n == 50
@@ -0,0 +1,108 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading.indicator_engine import INDICATOR_COLUMNS, IndicatorEngine
+from trading.indicator_panel import IndicatorPanel, _ewm, _rolling_extreme
+
+TODAY = datetime(2025, 6, 30)
+HISTORY = {"recover_days", "correct_days", "minmaxgap", "close_std", "profit_600", "days_since_max_high"}
+
+
+def _ohlcv(n: int, seed: int, start: str = "2022-01-03") -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = close * np.exp(rng.normal(0, 0.01, n))
+    high = np.maximum(open_, close) * (1 + rng.random(n) * 0.02)
+    low = np.minimum(open_, close) * (1 - rng.random(n) * 0.02)
+    volume = rng.integers(1_000, 100_000, n).astype(float)
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume},
+                        index=pd.bdate_range(start, periods=n, name="date"))
+
+
+def _universe() -> dict:
+    suspended = _ohlcv(300, seed=2)
+    return {
+        "000010.KS": _ohlcv(300, seed=0),
+        "000020.KQ": _ohlcv(220, seed=1, start="2022-04-01"),              # 늦게 상장
+        "000030.KS": suspended.drop(suspended.index[120:135]),             # 중간 거래정지
+        "000040.KQ": _ohlcv(40, seed=3, start="2023-01-02"),               # 짧은 이력
+        "000050.KS": _ohlcv(260, seed=4).iloc[:-20],                       # 먼저 끝남
+    }
+
+
+def _assert_close(expected, actual, columns):
+    for c in columns:
+        assert np.isclose(expected[c], actual[c], rtol=1e-8, atol=1e-9, equal_nan=True), (c, expected[c], actual[c])
+
+
+def test_latest_matches_per_ticker_engine():
+    data = _universe()
+    latest = IndicatorPanel.from_frames(data, today=TODAY).latest()
+    assert list(latest.index) == list(data)
+    for code, df in data.items():
+        row = IndicatorEngine("unused.pkl").frame(code, df, today=TODAY).iloc[-1]
+        _assert_close(row, latest.loc[code], INDICATOR_COLUMNS)
+        assert latest.loc[code, "date"] == df.index[-1]
+        assert latest.loc[code, "close"] == df["close"].iloc[-1]
+
+
+def test_cells_are_aligned_to_dates_and_match_truncated_history():
+    data = _universe()
+    panel = IndicatorPanel.from_frames(data, today=TODAY)
+    rsi = panel.frame("RSI")
+    for code, df in data.items():
+        missing = panel.dates.difference(df.index)
+        assert rsi.loc[missing, code].isna().all()
+        for k in (10, 100, len(df) // 2, len(df) - 1):
+            if k >= len(df):
+                continue
+            sub = df.iloc[:k + 1]
+            row = IndicatorEngine("unused.pkl").frame(code, sub, today=TODAY).iloc[-1]
+            j, i = panel.codes.index(code), panel.dates.get_loc(sub.index[-1])
+            cells = {name: panel[name][i, j] for name in INDICATOR_COLUMNS if name not in HISTORY}
+            _assert_close(row, cells, cells)
+
+
+def test_from_frames_accepts_integer_date_column():
+    df = _ohlcv(120, seed=5)
+    raw = df.reset_index()
+    raw["date"] = raw["date"].dt.strftime("%Y%m%d").astype(int)
+    a = IndicatorPanel.from_frames({"A": df}, today=TODAY).latest()
+    b = IndicatorPanel.from_frames({"A": raw}, today=TODAY).latest()
+    pd.testing.assert_frame_equal(a, b)
+    assert IndicatorPanel.from_frames({}).latest().empty
+
+
+@pytest.mark.parametrize("adjust,min_periods", [(True, 14), (False, 0)])
+def test_ewm_kernel_matches_pandas_with_gaps(adjust, min_periods):
+    x = np.random.default_rng(0).normal(size=(200, 6))
+    x[:30, 1] = np.nan
+    x[[50, 51, 90], 2] = np.nan
+    x[:, 3] = np.nan
+    expected = pd.DataFrame(x).ewm(alpha=1 / 14, adjust=adjust, min_periods=min_periods).mean().to_numpy()
+    np.testing.assert_allclose(_ewm(x, 1 / 14, adjust, min_periods), expected, rtol=1e-12, equal_nan=True)
+
+
+@pytest.mark.parametrize("n", [1, 3, 14, 20, 33])
+def test_rolling_extreme_matches_pandas(n):
+    x = np.random.default_rng(n).normal(size=(80, 4))
+    x[:10, 0] = np.nan
+    x[40, 1] = np.nan
+    frame = pd.DataFrame(x).rolling(n)
+    np.testing.assert_array_equal(_rolling_extreme(x, n, np.minimum), frame.min().to_numpy())
+    np.testing.assert_array_equal(_rolling_extreme(x, n, np.maximum), frame.max().to_numpy())
+
+
+def test_latest_matches_compute_indicators():
+    pytest.importorskip("pandas_ta")
+    from trading.indicators import compute_indicators
+
+    data = _universe()
+    latest = IndicatorPanel.from_frames(data).latest()
+    for code, df in data.items():
+        if len(df) < 60:
+            continue
+        _assert_close(compute_indicators(df.copy()).iloc[-1], latest.loc[code], INDICATOR_COLUMNS)
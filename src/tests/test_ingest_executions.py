@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from db.db import SessionLocal, create_order, ingest_executions, list_executions, list_trades
+from models.trade_entities import Hold, Order
+
+ACC = "INGEST-1"
+T0 = datetime(2025, 1, 2, 9, 0, 0)
+
+
+def _fill(exec_id, order_no, side, qty, price, minutes, **extra):
+    ev = {"exec_id": exec_id, "order_no": order_no, "account_id": ACC, "ticker": "005930", "market": "KRX",
+          "side": side, "qty": qty, "price": price, "commission": 0, "tax": 0,
+          "exec_time": T0 + timedelta(minutes=minutes), "status": "FILLED"}
+    ev.update(extra)
+    return ev
+
+
+def test_ingest_batch_upserts_orders_matches_fifo_and_is_idempotent():
+    create_order(order_no="ING-B1", account_id=ACC, ticker="005930", side="BUY", qty=10, price=100,
+                 status="PLACED", placed_at=T0)
+    events = [
+        {"order_no": "ING-B1", "side": "BUY", "status": "ACCEPTED"},             # 상태만
+        _fill("ING-X1", "ING-B1", "BUY", 10, 100, 1),
+        _fill("ING-X2", "ING-B2", "BUY", 5, 110, 2, order_qty=5),                 # 주문 신규 생성
+        _fill("ING-X2", "ING-B2", "BUY", 5, 110, 2),                              # 배치 내 중복
+        _fill("ING-X3", "ING-S1", "SELL", 12, 120, 3, tax=Decimal("2.4")),
+    ]
+    result = ingest_executions(events, update_holds=True, target_pct=0.1, stop_pct=-0.1)
+
+    assert result["inserted"] == ["ING-X1", "ING-X2", "ING-X3"]
+    assert result["duplicates"] == 1
+    assert result["orders_created"] == 2 and len(result["trades"]) == 2
+
+    trades = sorted(list_trades(account_id=ACC), key=lambda t: t.trade_id)
+    assert [(float(t.qty), float(t.buy_avg_price)) for t in trades] == [(10, 100), (2, 110)]
+    assert float(trades[0].pnl_gross) == 200 and float(trades[1].pnl_gross) == 20
+
+    buys = {e.exec_id: e for e in list_executions(account_id=ACC, side="BUY")}
+    assert float(buys["ING-X1"].remaining_qty) == 0 and float(buys["ING-X2"].remaining_qty) == 3
+
+    with SessionLocal() as s:
+        orders = {o.order_no: o for o in s.execute(select(Order).where(Order.account_id == ACC)).scalars()}
+        hold = s.execute(select(Hold).where(Hold.account_id == ACC)).scalars().one()
+    assert orders["ING-B1"].status == "FILLED" and float(orders["ING-B2"].qty) == 5
+    assert orders["ING-S1"].side == "SELL"
+    assert float(hold.qty) == 3 and hold.n_trade == 2
+    assert Decimal(str(hold.buy_avg_price)).quantize(Decimal("0.01")) == Decimal("103.33")
+    assert float(hold.tax_accum) == 2.4
+
+    # 같은 묶음을 다시 넣어도 아무 것도 중복 기록되지 않음
+    again = ingest_executions(events, update_holds=True)
+    assert again["inserted"] == [] and again["duplicates"] == 4 and again["trades"] == []
+    assert len(list_trades(account_id=ACC)) == 2
+
+
+def test_sell_in_later_batch_continues_fifo_from_db():
+    acc = "INGEST-2"
+    ingest_executions([_fill("ING2-B", "ING2-OB", "BUY", 4, 50, 0, account_id=acc)])
+    result = ingest_executions([
+        _fill("ING2-S1", "ING2-OS1", "SELL", 1, 60, 1, account_id=acc),
+        _fill("ING2-S2", "ING2-OS2", "SELL", 2, 70, 2, account_id=acc),
+    ])
+    trades = list_trades(account_id=acc)
+    assert len(result["trades"]) == 2
+    assert sorted(float(t.pnl_gross) for t in trades) == [10, 40]
+    buy = list_executions(account_id=acc, side="BUY")[0]
+    assert float(buy.remaining_qty) == 1
@@ -0,0 +1,34 @@
+import pytest
+
+from utils import json_codec
+
+
+@pytest.fixture(autouse=True)
+def restore_backend():
+    yield
+    json_codec.set_backend("auto")
+
+
+@pytest.mark.parametrize("backend", ["stdlib", "orjson"])
+def test_roundtrip(backend):
+    if json_codec.set_backend(backend) != backend:
+        pytest.skip(f"{backend} 미설치")
+    frame = {"trnm": "REAL", "data": [{"type": "0B", "item": "005930", "values": {"10": "+71500", "302": "삼성전자"}}]}
+
+    text = json_codec.dumps(frame)
+    assert isinstance(text, str) and "삼성전자" in text  # WebSocket 텍스트 프레임
+    assert isinstance(json_codec.dumps_bytes(frame), bytes)
+    assert json_codec.loads(text) == frame
+    assert json_codec.loads(json_codec.dumps_bytes(frame)) == frame
+
+
+def test_decode_error_is_stdlib_compatible():
+    for backend in ("stdlib", "orjson"):
+        json_codec.set_backend(backend)
+        with pytest.raises(json_codec.JSONDecodeError):
+            json_codec.loads(b"{not json")
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        json_codec.set_backend("yaml")
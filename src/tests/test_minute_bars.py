@@ -0,0 +1,50 @@
+import numpy as np
+
+from trading.minute_bars import CLOSE, HIGH, LOW, OPEN, TS, VOLUME, MinuteBarAggregator
+
+
+def _tick(code, hhmmss, price, volume):
+    return {"trnm": "REAL", "data": [{"type": "0B", "item": code,
+                                      "values": {"20": hhmmss, "10": f"-{price}", "15": f"+{volume}"}}]}
+
+
+def test_builds_multi_interval_bars_and_emits_close_events():
+    closed = []
+    bars = MinuteBarAggregator(intervals=(1, 3), capacity=8)
+    bars.on_close.append(lambda code, n, bar: closed.append((code, n, bar[OPEN], bar[CLOSE])))
+
+    for hhmmss, price, vol in [("090001", 100, 1), ("090030", 105, 2), ("090059", 98, 3),
+                               ("090100", 101, 4), ("090200", 102, 5), ("090300", 110, 6)]:
+        bars.on_real(_tick("005930", hhmmss, price, vol))
+
+    one = bars.last("005930", 1, 10)
+    assert one.shape == (3, 6)
+    assert one[0, [OPEN, HIGH, LOW, CLOSE, VOLUME]].tolist() == [100, 105, 98, 98, 6]
+    assert (np.diff(one[:, TS]) == 60).all()
+    three = bars.last("005930", 3, 10)
+    assert three[:, [OPEN, HIGH, LOW, CLOSE, VOLUME]].tolist() == [[100, 105, 98, 102, 15]]
+    assert ("005930", 3, 100, 102) in closed and len(closed) == 4
+    assert bars.current("005930", 1)[CLOSE] == 110
+
+
+def test_ring_view_is_zero_copy_and_keeps_last_capacity_bars():
+    bars = MinuteBarAggregator(intervals=(1,), capacity=4)
+    for m in range(10):
+        bars.add_tick("000660", f"09{m:02d}00", 100 + m, 1)
+    view = bars.last("000660", 1, 4)
+    assert view[:, CLOSE].tolist() == [105, 106, 107, 108]
+    assert not view.flags.owndata and not view.flags.writeable
+    assert bars.last("000660", 1, 2)[:, CLOSE].tolist() == [107, 108]
+    assert bars.count("000660", 1) == 9
+
+
+def test_market_clock_closes_idle_codes_and_late_ticks_amend():
+    bars = MinuteBarAggregator(intervals=(1,), capacity=4)
+    bars.add_tick("A", "090010", 10, 1)
+    bars.add_tick("B", "090100", 20, 1)   # 시계가 09:01 → A의 09:00 봉 마감
+    assert bars.count("A", 1) == 1
+    bars.add_tick("A", "090059", 12, 2)   # 늦게 온 09:00 틱 → 마감된 봉 수정
+    a = bars.last("A", 1, 1)[0]
+    assert (a[HIGH], a[CLOSE], a[VOLUME]) == (12, 12, 3)
+    assert bars.count("A", 1) == 1 and bars.stats["late"] == 1
+    assert bars.flush() == 1 and bars.count("B", 1) == 1
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading.indicators import moving_average
+
+
+def _rolling_wma(s: pd.Series, n: int) -> pd.Series:
+    """기존 rolling().apply 구현 (비교 기준)"""
+    weights = np.arange(1, n + 1)
+    return s.rolling(window=n).apply(lambda x: np.dot(x, weights) / weights.sum(), raw=True)
+
+
+def _rolling_hma(s: pd.Series, n: int) -> pd.Series:
+    diff = 2 * _rolling_wma(s, int(n / 2)) - _rolling_wma(s, n)
+    return _rolling_wma(diff, int(np.sqrt(n)))
+
+
+def _series(n: int, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.Series(close, index=pd.bdate_range("2015-01-02", periods=n, name="date"), name="close")
+
+
+@pytest.mark.parametrize("length", [1, 2, 5, 9, 20, 60])
+@pytest.mark.parametrize("n", [3, 60, 600])
+def test_wma_hma_match_rolling_apply(n, length):
+    s = _series(n, seed=n + length)
+    for ma_type, reference in (("WMA", _rolling_wma), ("HMA", _rolling_hma)):
+        if ma_type == "HMA" and length < 2:
+            continue
+        got, expected = moving_average(s, length, ma_type), reference(s, length)
+        assert got.index.equals(s.index) and got.name == s.name
+        assert (got.isna() == expected.isna()).all(), ma_type
+        np.testing.assert_allclose(got, expected, rtol=1e-12, equal_nan=True)
+
+
+def test_nan_inside_window_propagates_like_rolling():
+    s = _series(200, seed=3)
+    s.iloc[[0, 50, 51, 120]] = np.nan
+    for ma_type, reference in (("WMA", _rolling_wma), ("HMA", _rolling_hma)):
+        got, expected = moving_average(s, 20, ma_type), reference(s, 20)
+        assert (got.isna() == expected.isna()).all(), ma_type
+        np.testing.assert_allclose(got, expected, rtol=1e-12, equal_nan=True)
+
+
+def test_integer_series_and_unknown_type():
+    s = pd.Series(np.arange(1, 11))
+    np.testing.assert_allclose(moving_average(s, 3, "WMA"), _rolling_wma(s.astype(float), 3), equal_nan=True)
+    with pytest.raises(ValueError):
+        moving_average(s, 3, "KAMA")
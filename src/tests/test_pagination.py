@@ -0,0 +1,101 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from api import base_client
+from api.async_client import close_async_http_session
+from api.stock_chart_service import AsyncStockChartService, StockChartService
+
+# next-key -> (일봉 행, 다음 next-key)
+_PAGES = {
+    "": ([("20240105", 105), ("20240104", 104)], "k1"),
+    "k1": ([("20240103", 103), ("20240102", 102)], "k2"),
+    "k2": ([("20240101", 101), ("20231229", 99)], ""),
+}
+
+
+def _row(dt, price):
+    return {"dt": dt, "cur_prc": str(price), "trde_qty": "10", "trde_prica": "1", "open_pric": str(price),
+            "high_pric": str(price), "low_pric": str(price)}
+
+
+class _PagedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requested = []
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        key = self.headers.get("next-key", "")
+        self.requested.append((self.headers.get("cont-yn"), key))
+        rows, next_key = _PAGES[key]
+        payload = json.dumps({"stk_dt_pole_chart_qry": [_row(*r) for r in rows]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("cont-yn", "Y" if next_key else "N")
+        self.send_header("next-key", next_key)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def paged_server():
+    _PagedHandler.requested = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PagedHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_client.close_http_session()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    base_client.close_http_session()
+    server.shutdown()
+    server.server_close()
+
+
+def test_iter_daily_chart_follows_next_key(paged_server):
+    service = StockChartService("tok")
+    service.base_url = paged_server
+
+    frames = list(service.iter_daily_chart("005930", "20240105"))
+    assert len(frames) == 3
+    assert _PagedHandler.requested == [("N", ""), ("Y", "k1"), ("Y", "k2")]
+    assert sum(len(df) for df in frames) == 6
+
+
+def test_iter_daily_chart_stops_at_date(paged_server):
+    service = StockChartService("tok")
+    service.base_url = paged_server
+
+    frames = list(service.iter_daily_chart("005930", "20240105", stop_dt="20240103"))
+    # 두 번째 페이지에서 stop_dt 이전 행을 만나므로 세 번째 페이지는 요청하지 않음
+    assert len(_PagedHandler.requested) == 2
+    assert [d.strftime("%Y%m%d") for d in frames[-1].index] == ["20240103"]
+
+
+def test_iter_pages_is_lazy(paged_server):
+    service = StockChartService("tok")
+    service.base_url = paged_server
+
+    pages = service.iter_daily_chart("005930", "20240105")
+    next(pages)
+    assert len(_PagedHandler.requested) == 1
+    pages.close()
+
+
+def test_async_iter_daily_chart(paged_server):
+    async def run():
+        service = AsyncStockChartService("tok")
+        service.base_url = paged_server
+        try:
+            return [df async for df in service.iter_daily_chart("005930", "20240105", max_pages=2)]
+        finally:
+            await close_async_http_session()
+
+    frames = asyncio.run(run())
+    assert len(frames) == 2
+    assert _PagedHandler.requested == [("N", ""), ("Y", "k1")]
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import threading
+import time
+
+import numpy as np
+from websockets.asyncio.server import serve
+
+from api.ws_session import WSSession, stop_ws_threads
+from trading.quote_cache import QUOTE_QUEUE_MAX, BackgroundQuoteFeed, QuoteCache, QuoteFeed
+
+
+def _real(code, **values):
+    return {"trnm": "REAL", "data": [{"type": "0B", "name": "주식체결", "item": code, "values": values}]}
+
+
+def test_cache_update_keeps_missing_fields_and_grows():
+    cache = QuoteCache(capacity=2)
+    cache.on_real(_real("005930", **{"10": "+71500", "27": "+71600", "28": "-71400", "13": "1000"}))
+    # 0C(호가만) → 현재가는 유지
+    cache.on_real({"trnm": "REAL", "data": [{"type": "0C", "item": "005930", "values": {"27": "71700", "28": "71500"}}]})
+    for i in range(5):
+        cache.update(f"00000{i}", price=100 + i)
+
+    quote = cache.get("005930")
+    assert (quote["price"], quote["ask"], quote["bid"], quote["volume"]) == (71500, 71700, 71500, 1000)
+    assert len(cache) == 6 and cache.price("000004") == 104
+    assert cache.price("999999") is None
+
+
+def test_cache_max_age_and_bulk_prices():
+    cache = QuoteCache()
+    cache.update("005930", price=71500, ts=time.time() - 60)
+    cache.update("000660", price=120000)
+    cache.update("035420", bid=180000)  # 현재가 없음
+
+    assert cache.price("005930", max_age=10) is None
+    assert cache.price("005930", max_age=None) == 71500
+    assert cache.prices(["005930", "000660", "035420", "111111"], max_age=10) == {"000660": 120000}
+    assert np.isnan(cache.get("035420")["price"])
+
+
+def test_background_feed_registers_and_fills_cache():
+    received = []
+    ready = threading.Event()
+    state = {}
+
+    async def handler(ws):
+        async for raw in ws:
+            msg = json.loads(raw)
+            received.append(msg)
+            if msg["trnm"] == "LOGIN":
+                await ws.send(json.dumps({"trnm": "LOGIN", "return_code": 0}))
+            elif msg["trnm"] in ("REG", "REMOVE"):
+                await ws.send(json.dumps({"trnm": msg["trnm"], "return_code": 0}))
+                if msg["trnm"] == "REG":
+                    for code in msg["data"][0]["item"]:
+                        await ws.send(json.dumps(_real(code, **{"10": "-5000", "27": "5010", "28": "4990"})))
+
+    def run_server():
+        async def main():
+            async with serve(handler, "127.0.0.1", 0) as server:
+                state["port"] = server.sockets[0].getsockname()[1]
+                state["stop"] = asyncio.get_running_loop().create_future()
+                ready.set()
+                await state["stop"]
+        state["loop"] = asyncio.new_event_loop()
+        state["loop"].run_until_complete(main())
+
+    thread = threading.Thread(target=run_server, daemon=True)
+    thread.start()
+    ready.wait(5)
+
+    cache = QuoteCache()
+    feed = BackgroundQuoteFeed("tok", cache, url=f"ws://127.0.0.1:{state['port']}").start()
+    try:
+        assert feed.watch(["005930", "000660"]) == ["005930", "000660"]
+        assert feed.watch(["005930"]) == []  # 이미 등록된 종목은 다시 REG 하지 않음
+        deadline = time.time() + 2
+        while len(cache.prices(["005930", "000660"])) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert cache.prices(["005930", "000660"]) == {"005930": 5000, "000660": 5000}
+        assert cache.get("005930")["bid"] == 4990
+    finally:
+        feed.stop()
+        stop_ws_threads()
+        state["loop"].call_soon_threadsafe(state["stop"].set_result, None)
+        thread.join(5)
+
+    trnms = [m["trnm"] for m in received]
+    assert trnms == ["LOGIN", "REG", "REMOVE"]
+    assert received[1]["data"][0]["type"] == ["0B", "0C"]
+
+
+def test_feed_resubscribes_after_disconnect():
+    logins = []
+
+    async def handler(ws):
+        async for raw in ws:
+            msg = json.loads(raw)
+            if msg["trnm"] == "LOGIN":
+                logins.append(msg)
+                await ws.send(json.dumps({"trnm": "LOGIN", "return_code": 0}))
+            elif msg["trnm"] == "REG":
+                await ws.send(json.dumps({"trnm": "REG", "return_code": 0}))
+                price = str(5000 + 100 * len(logins))
+                for code in msg["data"][0]["item"]:
+                    await ws.send(json.dumps(_real(code, **{"10": price})))
+                if len(logins) == 1:
+                    await ws.close()  # 첫 연결은 REG 직후 끊김
+            elif msg["trnm"] == "REMOVE":
+                await ws.send(json.dumps({"trnm": "REMOVE", "return_code": 0}))
+
+    async def main():
+        async with serve(handler, "127.0.0.1", 0) as server:
+            url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+            cache = QuoteCache()
+            feed = QuoteFeed(WSSession("tok", url), cache)
+            await feed.start()
+            await feed.watch(["005930"])
+            while feed._task is not None:
+                await asyncio.sleep(0.01)
+            stale = (list(feed.watching), feed._real, cache.price("005930"))
+
+            await feed.start()  # 재접속 + 끊기기 전 종목 재등록
+            deadline = time.time() + 2
+            while cache.price("005930") != 5200 and time.time() < deadline:
+                await asyncio.sleep(0.01)
+            fresh = (list(feed.watching), feed._real.maxsize, cache.price("005930"))
+            await feed.stop()
+            await feed.session.close()
+            return stale, fresh
+
+    stale, fresh = asyncio.run(main())
+    assert stale == ([], None, 5100)
+    assert fresh == (["005930"], QUOTE_QUEUE_MAX, 5200)
+    assert len(logins) == 2
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+import time
+
+from api.rate_limiter import RateLimiter
+
+
+def test_global_rate_is_enforced():
+    limiter = RateLimiter(global_rate=50, global_burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire("ka10001")
+    elapsed = time.monotonic() - start
+    # 첫 호출은 즉시, 이후 5회는 1/50초 간격
+    assert 0.08 <= elapsed < 0.3
+    assert limiter.stats()["ka10001"]["calls"] == 6
+
+
+def test_api_budget_does_not_block_other_trs():
+    limiter = RateLimiter(global_rate=100, budgets={"ka10081": 5})
+    limiter.acquire("ka10081")
+    limiter.acquire("ka10081")
+    limiter.acquire("ka10081")
+    limiter.acquire("ka10081")
+    limiter.acquire("ka10081")
+
+    waited_chart = []
+    t = threading.Thread(target=lambda: waited_chart.append(limiter.acquire("ka10081")))
+    t.start()
+    time.sleep(0.02)
+    assert limiter.acquire("ka10001") < 0.05
+    t.join()
+    assert waited_chart[0] >= 0.1
+
+
+def test_order_tr_jumps_ahead_of_bulk_download():
+    limiter = RateLimiter(global_rate=10, global_burst=1)
+    limiter.acquire("ka10081")  # 버킷 비우기
+
+    order = []
+    bulk = threading.Thread(target=lambda: (limiter.acquire("ka10081"), order.append("ka10081")))
+    bulk.start()
+    time.sleep(0.02)
+    buy = threading.Thread(target=lambda: (limiter.acquire("kt10000"), order.append("kt10000")))
+    buy.start()
+    bulk.join()
+    buy.join()
+    assert order == ["kt10000", "ka10081"]
+
+
+def test_async_acquire_reports_wait():
+    limiter = RateLimiter(global_rate=20, global_burst=1)
+
+    async def run():
+        return await asyncio.gather(*(limiter.acquire_async("ka10080") for _ in range(3)))
+
+    waits = sorted(asyncio.run(run()))
+    assert waits[0] < 0.02
+    assert waits[-1] >= 0.09
+    assert limiter.stats()["ka10080"]["calls"] == 3
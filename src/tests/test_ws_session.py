@@ -0,0 +1,216 @@
+import asyncio
+import json
+import time
+
+from websockets.asyncio.server import serve
+
+from api.ws_session import CLOSED, WSSession, shared_ws_thread, stop_ws_threads
+from trading import condition_ws
+from trading.condition_stream import BackgroundConditionStreams, ConditionStream
+from trading.quote_cache import BackgroundQuoteFeed, QuoteCache
+
+# seq -> CNSRREQ 페이지 (next_key -> (코드, 다음 next_key))
+_CNSR_PAGES = {
+    "0": {"": (["A005930", "000660"], "p2"), "p2": (["035420", "005930"], "")},
+    "1": {"": (["068270"], "")},
+}
+
+
+class _FakeKiwoom:
+    """LOGIN / PING / CNSRLST / CNSRREQ / REG / REMOVE 만 흉내 내는 로컬 서버"""
+
+    def __init__(self):
+        self.received = []
+        self.pongs = 0
+
+    async def handler(self, ws):
+        async for raw in ws:
+            msg = json.loads(raw)
+            trnm = msg["trnm"]
+            self.received.append(trnm)
+            if trnm == "LOGIN":
+                ok = msg.get("token") == "good"
+                await ws.send(json.dumps({"trnm": "LOGIN", "return_code": 0 if ok else 1, "return_msg": "x"}))
+                # 로그인 직후 PING → 세션이 되돌려보내야 함
+                await ws.send(json.dumps({"trnm": "PING"}))
+            elif trnm == "PING":
+                self.pongs += 1
+            elif trnm == "CNSRLST":
+                await ws.send(json.dumps({"trnm": "CNSRLST", "return_code": 0, "data": [["0", "A"], ["1", "B"]]}))
+            elif trnm == "CNSRREQ" and msg["search_type"] == "1":
+                await ws.send(json.dumps({"trnm": "CNSRREQ", "seq": msg["seq"], "return_code": 0,
+                                          "data": [{"jmcode": "A005930"}, {"jmcode": "A000660"}]}))
+                for seq, code, kind in [("1", "035420", "I"), ("9", "111111", "I"), ("1", "005930", "D"),
+                                        ("1", "035420", "I"), ("1", "123456", "D")]:
+                    await ws.send(json.dumps({"trnm": "REAL", "data": [{
+                        "type": "02", "name": "조건검색", "item": code,
+                        "values": {"841": seq, "9001": code, "843": kind, "20": "090001"},
+                    }]}))
+            elif trnm == "CNSRCLR":
+                await ws.send(json.dumps({"trnm": "CNSRCLR", "seq": msg["seq"], "return_code": 0}))
+            elif trnm == "CNSRREQ":
+                codes, next_key = _CNSR_PAGES[msg["seq"]][msg["next_key"]]
+                await ws.send(json.dumps({
+                    "trnm": "CNSRREQ", "seq": msg["seq"], "return_code": 0,
+                    "cont_yn": "Y" if next_key else "N", "next_key": next_key,
+                    "data": [{"9001": c} for c in codes],
+                }))
+            elif trnm == "REG":
+                await ws.send(json.dumps({"trnm": "REG", "return_code": 0}))
+                await ws.send(json.dumps({"trnm": "REAL", "data": [{"type": "0B", "item": "005930"}]}))
+            elif trnm == "REMOVE":
+                await ws.send(json.dumps({"trnm": "REMOVE", "return_code": 0}))
+
+
+def _run(scenario):
+    async def main():
+        fake = _FakeKiwoom()
+        async with serve(fake.handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            return fake, await scenario(f"ws://127.0.0.1:{port}")
+    return asyncio.run(main())
+
+
+def test_condition_calls_share_one_session():
+    async def scenario(url):
+        async with WSSession("good", url) as session:
+            conds = await condition_ws.fetch_condition_list("good", session=session)
+            # 같은 세션에서 두 조건을 동시에 조회해도 seq로 응답이 구분됨
+            codes0, codes1 = await asyncio.gather(
+                condition_ws.fetch_condition_codes("good", "0", session=session),
+                condition_ws.fetch_condition_codes("good", "1", session=session),
+            )
+            await asyncio.sleep(0.05)
+            return conds, codes0, codes1, dict(session.stats)
+
+    fake, (conds, codes0, codes1, stats) = _run(scenario)
+    assert conds == [["0", "A"], ["1", "B"]]
+    assert codes0 == ["005930", "000660", "035420"]
+    assert codes1 == ["068270"]
+    assert fake.received.count("LOGIN") == 1
+    assert fake.pongs == 1 and stats["ping"] == 1
+
+
+def test_sync_consumers_share_one_login_on_session_thread():
+    def consumers(url):
+        # 시세 피드와 조건검색이 같은 스레드 루프의 공용 세션을 사용
+        feed = BackgroundQuoteFeed("good", QuoteCache(), url=url).start()
+        try:
+            feed.watch(["005930"])
+            host = shared_ws_thread("good", url)
+            conds = host.run(condition_ws.request_condition_list)
+            codes = host.run(lambda ws: condition_ws.fetch_condition_codes("good", "1", session=ws))
+        finally:
+            feed.stop()
+            stop_ws_threads()
+        return conds, codes
+
+    async def scenario(url):
+        return await asyncio.to_thread(consumers, url)
+
+    fake, (conds, codes) = _run(scenario)
+    assert conds == [["0", "A"], ["1", "B"]]
+    assert codes == ["068270"]
+    assert fake.received.count("LOGIN") == 1
+    assert fake.received.count("REMOVE") == 1
+
+
+def test_subscribers_receive_real_frames_and_close_marker():
+    async def scenario(url):
+        session = WSSession("good", url)
+        real = session.subscribe("REAL")
+        await session.start()
+        reg = await session.request({"trnm": "REG", "data": []})
+        frame = await asyncio.wait_for(real.get(), timeout=2)
+        await session.close()
+        closed = await asyncio.wait_for(real.get(), timeout=2)
+        return reg, frame, closed
+
+    _, (reg, frame, closed) = _run(scenario)
+    assert reg["return_code"] == 0
+    assert frame["data"][0]["item"] == "005930"
+    assert closed["trnm"] == CLOSED
+
+
+def test_login_failure_raises():
+    async def scenario(url):
+        try:
+            await WSSession("bad", url).start()
+        except RuntimeError as e:
+            return str(e)
+        return None
+
+    _, err = _run(scenario)
+    assert err and "로그인 실패" in err
+
+
+def test_fetch_many_condition_codes_validates_once_and_caches():
+    async def scenario(url):
+        async with WSSession("good", url) as session:
+            first = await condition_ws.fetch_many_condition_codes("good", ["0", "1", "0"], session=session)
+            again = await condition_ws.fetch_condition_codes("good", "1", session=session)
+            try:
+                await condition_ws.fetch_many_condition_codes("good", ["9"], session=session)
+            except ValueError as e:
+                missing = str(e)
+            return first, again, missing
+
+    fake, (first, again, missing) = _run(scenario)
+    assert first == {"0": ["005930", "000660", "035420"], "1": ["068270"]}
+    assert again == ["068270"]
+    assert "seq=9" in missing
+    assert fake.received.count("CNSRLST") == 1
+    # seq 0: 2페이지, seq 1: 1페이지 — 두 번째 호출은 캐시에서
+    assert fake.received.count("CNSRREQ") == 3
+
+
+def test_condition_stream_applies_insert_delete_incrementally():
+    async def scenario(url):
+        seen = []
+        async with WSSession("good", url) as session:
+            async with ConditionStream(session, "1", on_change=seen.append) as stream:
+                initial = set(stream.codes)
+                events = [await asyncio.wait_for(stream.events.get(), timeout=2) for _ in range(2)]
+                codes = set(stream.codes)
+            tail = [ev async for ev in stream]
+        return initial, [(e.code, e.kind) for e in events], codes, len(seen), tail, stream.stats
+
+    fake, (initial, events, codes, n_callbacks, tail, stats) = _run(scenario)
+    assert initial == {"005930", "000660"}
+    assert events == [("035420", "I"), ("005930", "D")]
+    assert codes == {"000660", "035420"}
+    assert n_callbacks == 2 and tail == []
+    # 다른 seq 알림은 무시, 중복 I / 없는 종목 D는 ignored
+    assert stats == {"inserted": 3, "deleted": 1, "ignored": 2, "dropped": 0}
+    assert "CNSRCLR" in fake.received
+
+
+def test_background_condition_streams_snapshot_and_reconnect():
+    def wait_for(streams, expected):
+        deadline = time.time() + 2
+        while time.time() < deadline:
+            snap = streams.snapshot()
+            if set(snap["1"]) == expected:
+                return snap
+            time.sleep(0.01)
+        return snap
+
+    def consumers(url):
+        streams = BackgroundConditionStreams("good", ["1"], url=url).start()
+        try:
+            first = wait_for(streams, {"000660", "035420"})
+            shared_ws_thread("good", url).run(lambda ws: ws.close())   # 연결 끊김
+            again = wait_for(streams, {"000660", "035420"})            # snapshot이 재접속/재등록
+        finally:
+            streams.stop()
+            stop_ws_threads()
+        return first, again
+
+    async def scenario(url):
+        return await asyncio.to_thread(consumers, url)
+
+    fake, (first, again) = _run(scenario)
+    assert first == {"1": ["000660", "035420"]}     # 편입 순서 유지
+    assert set(again["1"]) == {"000660", "035420"}
+    assert fake.received.count("LOGIN") == 2
+    assert fake.received.count("CNSRREQ") == 2 and "CNSRCLR" in fake.received
@@ -2,7 +2,8 @@ import logging
 import pandas as pd
 import sqlite3
 # import torch
-from trading.indicators import compute_indicators
+from trading.indicators import compute_indicators, required_features
+from trading.indicator_panel import IndicatorPanel
 from db.hold_sqlite import get_hold_list
 from utils.calculate_utils import calculate_tick_price
 from typing import List
@@ -101,10 +102,11 @@ def filter3(df, config):
 def filtering(df, config, market='KS'):
     return filter1(df) and filter2(df, market) # and filter3(df, config)
 
-def analyze_stocks(data: dict, config: dict) -> dict:
+def analyze_stocks(data: dict, config: dict, panel: bool = False) -> dict:
     """
     머신러닝 모델 등을 이용하여 매수/매도 시그널을 생성.
     - data: 종목별 일봉 데이터 (또는 분봉)
+    - panel: True면 전 종목 지표를 IndicatorPanel로 한 번에 계산 (종목별 마지막 행으로 필터링)
     - return: 분석 결과. 예) { '000660': ('BUY', 57000), '005930': ('SELL', 60000), ... }
     """
     logging.info("Analyzing stocks using ML models...")
@@ -120,20 +122,27 @@ def analyze_stocks(data: dict, config: dict) -> dict:
 
     con = sqlite3.connect('sqlite3/candle_data.db')
 
+    latest = IndicatorPanel.from_frames(data).latest() if panel else None
+
     # 아래는 단순 예시(다 BUY)
     signals = {}
     for code_, df in data.items():
         code, market = code_.split('.')
         if code not in df_funda.index:
             continue
+        if latest is not None:
+            if code_ not in latest.index:
+                continue
+            df = latest.loc[[code_]].drop(columns='date')
         
         df_old = pd.read_sql(f"SELECT 시가총액, 거래대금 FROM (SELECT * FROM '{code_}' ORDER BY Date DESC LIMIT 1)", con)
         for key, value in pd.concat([df_funda.loc[code], df_old.loc[0]]).items():
             df[key] = value
 
         df = df.astype(float)
-        df['date'] = pd.to_datetime(df['date'].astype(int), format='%Y%m%d')
-        df = compute_indicators(df.set_index('date'))
+        if latest is None:
+            df['date'] = pd.to_datetime(df['date'].astype(int), format='%Y%m%d')
+            df = compute_indicators(df.set_index('date'), features=required_features(config, market))
         
         print("====== ", code, " ======")
         if filtering(df, config, market):
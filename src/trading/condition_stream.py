@@ -0,0 +1,270 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from api.ws_session import CLOSED, WSSession, WSSessionThread, shared_ws_thread
+from trading.condition_ws import extract_codes_from_cnsrreq, norm_code, request_cnsrreq_once
+
+# ---------------------------------------------------------------------
+# 실시간 조건검색 (CNSRREQ search_type=1)
+# ---------------------------------------------------------------------
+# 등록 응답으로 현재 편입 종목 전체를 받고, 이후에는 REAL(type '02') 프레임으로
+# 편입(I)/이탈(D) 알림만 받습니다. 전체 목록을 다시 조회하지 않고 집합에 바로 반영합니다.
+#
+# REAL '02' values: 841=조건식 일련번호, 9001=종목코드, 843=삽입삭제구분(I/D), 20=체결시간
+#
+# 연결이 끊겼다가 start()를 다시 부르면 재등록 응답의 전체 목록과 비교해 그 사이의 편입/이탈을 이벤트로 반영합니다.
+
+REAL_TYPE_CONDITION = "02"
+INSERT, DELETE = "I", "D"
+CONDITION_EVENT_MAX = int(os.getenv("CONDITION_EVENT_MAX", "1000"))  # 백그라운드 스트림의 이벤트 큐 상한
+
+
+class ConditionEvent:
+    __slots__ = ("seq", "code", "kind", "at", "exch_time")
+
+    def __init__(self, seq: str, code: str, kind: str, at: float, exch_time: str = ""):
+        self.seq = seq
+        self.code = code
+        self.kind = kind          # I: 편입, D: 이탈
+        self.at = at              # 수신 시각 (time.time())
+        self.exch_time = exch_time
+
+    def __repr__(self) -> str:
+        return f"ConditionEvent(seq={self.seq}, code={self.code}, kind={self.kind})"
+
+
+class ConditionStream:
+    """
+    async with ConditionStream(session, seq="1") as stream:
+        print(list(stream.codes))      # 현재 편입 종목 (편입 순서)
+        async for ev in stream:        # 편입/이탈 이벤트
+            ...
+    - 이벤트는 집합이 실제로 바뀔 때만 발생 (중복 I / 없는 종목 D는 무시)
+    - on_change 콜백을 주면 수신 태스크에서 바로 호출
+    - max_events: 이벤트 큐 상한 (0이면 무제한, 넘으면 오래된 이벤트부터 버림)
+    """
+    def __init__(self, session: WSSession, seq: str, stex_tp: str = "K",
+                 on_change: Optional[Callable[[ConditionEvent], None]] = None,
+                 emit_initial: bool = False, max_events: int = 0):
+        self.session = session
+        self.seq = str(seq).strip()
+        self.stex_tp = stex_tp
+        self.on_change = on_change
+        self.emit_initial = emit_initial
+        self.codes: Dict[str, float] = {}  # 편입 종목 → 편입 시각 (편입 순서 유지)
+        self.events: asyncio.Queue = asyncio.Queue(maxsize=max_events)
+        self.stats = {"inserted": 0, "deleted": 0, "ignored": 0, "dropped": 0}
+        self._real: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._started = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> "ConditionStream":
+        """실시간 등록. 끊긴 뒤 다시 부르면 재등록하고 현재 목록과의 차이를 이벤트로 반영"""
+        if self.running:
+            return self
+        await self.session.start()
+        restart = self._started
+        if restart:
+            self._reset_events()
+        # 등록 응답과 첫 REAL 사이의 알림을 놓치지 않도록 먼저 구독
+        self._real = self.session.subscribe("REAL")
+        try:
+            resp = await request_cnsrreq_once(self.session, seq=self.seq, search_type="1", stex_tp=self.stex_tp)
+        except Exception:
+            self._finish()
+            raise
+        now = time.time()
+        fresh = extract_codes_from_cnsrreq(resp.get("data", []))
+        if restart:
+            keep = set(fresh)
+            for code in [c for c in self.codes if c not in keep]:
+                self._apply(DELETE, code, now, "")
+        for code in fresh:
+            self._apply(INSERT, code, now, "", emit=restart or self.emit_initial)
+        self._started = True
+        self._task = asyncio.create_task(self._pump())
+        return self
+
+    async def stop(self) -> None:
+        """CNSRCLR로 실시간 등록 해제 후 수신 태스크 정리"""
+        if self.session.connected:
+            try:
+                await self.session.request({"trnm": "CNSRCLR", "seq": self.seq},
+                                           match=lambda m: str(m.get("seq", self.seq)).strip() == self.seq,
+                                           timeout=5.0)
+            except Exception as e:
+                logging.warning(f"[COND] CNSRCLR seq={self.seq} 실패: {e}")
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._drain()
+        self._finish()
+
+    async def __aenter__(self) -> "ConditionStream":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> ConditionEvent:
+        ev = await self.events.get()
+        if ev is None:
+            self._emit(None)  # 다른 소비자도 종료되도록
+            raise StopAsyncIteration
+        return ev
+
+    # -----------------------------
+    # 내부
+    # -----------------------------
+    async def _pump(self) -> None:
+        while True:
+            if not self._handle(await self._real.get()):
+                logging.warning(f"[COND] seq={self.seq} 연결 종료 → 스트림 중단")
+                self._finish()
+                return
+
+    def _drain(self) -> None:
+        """이미 수신된 알림은 버리지 않고 반영"""
+        while self._real is not None and not self._real.empty():
+            if not self._handle(self._real.get_nowait()):
+                return
+
+    def _handle(self, msg) -> bool:
+        if msg.get("trnm") == CLOSED:
+            return False
+        now = time.time()
+        for item in msg.get("data") or []:
+            if item.get("type") != REAL_TYPE_CONDITION:
+                continue
+            values = item.get("values") or {}
+            if str(values.get("841", "")).strip() != self.seq:
+                continue
+            code = norm_code(values.get("9001") or item.get("item"))
+            kind = str(values.get("843", "")).strip().upper()
+            if code and kind in (INSERT, DELETE):
+                self._apply(kind, code, now, values.get("20", ""))
+        return True
+
+    def _apply(self, kind: str, code: str, at: float, exch_time: str, emit: bool = True) -> bool:
+        if kind == INSERT:
+            if code in self.codes:
+                self.stats["ignored"] += 1
+                return False
+            self.codes[code] = at
+            self.stats["inserted"] += 1
+        else:
+            if code not in self.codes:
+                self.stats["ignored"] += 1
+                return False
+            del self.codes[code]
+            self.stats["deleted"] += 1
+        if emit:
+            ev = ConditionEvent(self.seq, code, kind, at, exch_time)
+            self._emit(ev)
+            if self.on_change is not None:
+                try:
+                    self.on_change(ev)
+                except Exception as e:
+                    logging.error(f"[COND] on_change error: {e}")
+        return True
+
+    def _emit(self, ev: Optional[ConditionEvent]) -> None:
+        if self.events.full():
+            self.events.get_nowait()
+            self.stats["dropped"] += 1
+        self.events.put_nowait(ev)
+
+    def _reset_events(self) -> None:
+        """재시작: 종료 표식(None)만 빼고 아직 안 읽은 이벤트는 유지"""
+        pending = []
+        while not self.events.empty():
+            ev = self.events.get_nowait()
+            if ev is not None:
+                pending.append(ev)
+        for ev in pending:
+            self._emit(ev)
+
+    def _finish(self) -> None:
+        if self._real is not None:
+            self.session.unsubscribe("REAL", self._real)
+            self._real = None
+            self._emit(None)
+
+
+class BackgroundConditionStreams:
+    """
+    동기 코드(main)용: 공용 세션 스레드(shared_ws_thread)에서 조건식별 ConditionStream을 유지합니다.
+    매수 후보를 뽑을 때마다 CNSRREQ로 전체 목록을 다시 조회하지 않고 스트림이 들고 있는 편입 종목을 읽습니다.
+    streams = BackgroundConditionStreams(token, ["1", "2"]).start()
+    by_seq = streams.snapshot()      # {seq: [편입 종목, ...]} (편입 순서). 끊겼으면 재등록 후 반환
+    streams.stop()
+    """
+    def __init__(self, token: str, seqs: Iterable[str], stex_tp: str = "K", url: Optional[str] = None,
+                 on_change: Optional[Callable[[ConditionEvent], None]] = None):
+        self.token = token
+        self.seqs = [str(s).strip() for s in dict.fromkeys(seqs)]
+        self.stex_tp = stex_tp
+        self.url = url
+        self.on_change = on_change
+        self._host: Optional[WSSessionThread] = None
+        self._streams: Dict[str, ConditionStream] = {}
+
+    def start(self) -> "BackgroundConditionStreams":
+        if self._host is not None:
+            return self
+        self._host = shared_ws_thread(self.token, self.url)
+
+        async def _start(session: WSSession):
+            self._streams = {
+                seq: ConditionStream(session, seq, self.stex_tp, on_change=self.on_change,
+                                     max_events=CONDITION_EVENT_MAX)
+                for seq in self.seqs
+            }
+            await asyncio.gather(*(stream.start() for stream in self._streams.values()))
+
+        try:
+            self._host.run(_start)
+        except Exception:
+            self.stop()
+            raise
+        return self
+
+    def snapshot(self) -> Dict[str, List[str]]:
+        if self._host is None:
+            raise RuntimeError("조건검색 스트림이 시작되지 않았습니다.")
+        streams = self._streams
+
+        async def _snapshot():
+            # 수신 태스크(이벤트 루프)와 같은 스레드에서 읽어야 집합이 바뀌는 도중이 아님
+            await asyncio.gather(*(stream.start() for stream in streams.values() if not stream.running))
+            return {seq: list(stream.codes) for seq, stream in streams.items()}
+
+        return self._host.call(_snapshot())
+
+    def stop(self) -> None:
+        host, streams = self._host, self._streams
+        self._host, self._streams = None, {}
+        if host is None or not streams:
+            return
+
+        async def _stop():
+            await asyncio.gather(*(stream.stop() for stream in streams.values()), return_exceptions=True)
+
+        try:
+            host.call(_stop(), timeout=10.0)
+        except Exception as e:
+            logging.warning(f"[COND] 종료 중 오류: {e}")
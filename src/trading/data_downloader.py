@@ -1,9 +1,14 @@
 import os
 import sys
+import zlib
+import argparse
+import queue
 import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
-from time import sleep
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import requests
 from tqdm import tqdm
@@ -15,15 +20,22 @@ if src_path not in sys.path:
     sys.path.append(src_path)
 
 from api.stock_chart_service import StockChartService  # 제공하신 서비스 사용
+from db import candle_store
+from utils.decode_utils import decode_float
 
 # -----------------------------
 # 설정
 # -----------------------------
 DB_DIR = os.path.join(project_root, "sqlite3")
-DB_PATH = os.path.join(DB_DIR, "candle_data.db")
+DB_PATH = candle_store.CANDLE_STORE_PATH  # candles(code, date) 통합 테이블
+LEGACY_DB_PATH = os.path.join(DB_DIR, "candle_data.db")  # 종목별 테이블 (python -m db.candle_store migrate 로 이전)
 DB_URL = os.path.join(DB_DIR, 'meta.db')  # '종목코드' 컬럼
 BASE_DT = datetime.now().strftime("%Y%m%d")  # 당일 기준으로 요청
 # BASE_DT = '20240101'
+DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", 4))         # 동시 조회 스레드 수
+DOWNLOAD_COMMIT_EVERY = int(os.getenv("DOWNLOAD_COMMIT_EVERY", 50))  # 종목 N개마다 commit
+DOWNLOAD_MAX_ERRORS = int(os.getenv("DOWNLOAD_MAX_ERRORS", 3))     # 같은 기준일에 N회 실패한 종목은 재시도 생략
+MANIFEST_TABLE = "_download_manifest"
 
 # -----------------------------
 # 유틸
@@ -32,24 +44,6 @@ def _ensure_db_dir():
     if not os.path.exists(DB_DIR):
         os.makedirs(DB_DIR, exist_ok=True)
 
-def _clean_price(x: Optional[str]) -> Optional[float]:
-    """'+12345', '-12345' 등 문자열을 float로 변환"""
-    if x is None:
-        return None
-    s = str(x).strip().replace(",", "")
-    # 허용 문자만 남기기
-    buf = []
-    for ch in s:
-        if ch.isdigit() or ch in ['+', '-', '.']:
-            buf.append(ch)
-    s2 = "".join(buf)
-    if s2 in ("", "+", "-"):
-        return None
-    try:
-        return float(s2)
-    except Exception:
-        return None
-
 def _normalize_daily_df(df: pd.DataFrame) -> pd.DataFrame:
     """
     StockChartService.get_daily_chart 응답 DataFrame을
@@ -78,35 +72,26 @@ def _normalize_daily_df(df: pd.DataFrame) -> pd.DataFrame:
         if c not in df.columns:
             df[c] = None
 
-    # 값 정리
-    df["open"] = df["open"].apply(_clean_price)
-    df["high"] = df["high"].apply(_clean_price)
-    df["low"]  = df["low"].apply(_clean_price)
-    df["close"]= df["close"].apply(_clean_price)
-
-    # 거래량은 정수로
-    def _clean_int(x):
-        if x is None:
-            return None
-        s = str(x).strip().replace(",", "")
-        s2 = "".join([ch for ch in s if ch.isdigit()])
-        if s2 == "":
-            return None
-        try:
-            return int(s2)
-        except Exception:
-            return None
+    # 값 정리 (부호/쉼표 섞인 문자열도 벡터 디코딩, 빈 값은 NaN)
+    for c in ("open", "high", "low", "close"):
+        df[c] = decode_float(df[c].to_numpy())
 
-    df["volume"] = df["volume"].apply(_clean_int)
+    # 거래량은 정수로 (부호 제거, 빈 값은 결측)
+    df["volume"] = pd.Series(decode_float(df["volume"].to_numpy(), absolute=True), index=df.index).astype("Int64")
 
     # 날짜 문자열 정리: YYYYMMDD → YYYY-MM-DD (또는 그대로 저장 원하면 아래 라인 변경)
     def _fmt_date(s):
+        if isinstance(s, datetime):  # get_daily_chart는 dt를 DatetimeIndex로 반환
+            return s.strftime("%Y-%m-%d")
         s = str(s).strip()
         if len(s) == 8 and s.isdigit():
             return f"{s[0:4]}-{s[4:6]}-{s[6:8]}"
         return s
 
-    df["date"] = df["date"].apply(_fmt_date)
+    if pd.api.types.is_datetime64_any_dtype(df["date"]):
+        df["date"] = df["date"].dt.strftime("%Y-%m-%d")
+    else:
+        df["date"] = df["date"].apply(_fmt_date)
 
     # 정렬 & 중복 제거
     df = df[need_cols].dropna(subset=["date"]).drop_duplicates(subset=["date"]).sort_values("date")
@@ -121,63 +106,241 @@ def _table_exists(con: sqlite3.Connection, table_name: str) -> bool:
     row = cur.fetchone()
     return row is not None
 
-def _get_max_date(con: sqlite3.Connection, table_name: str) -> Optional[str]:
+def _append_new_candles(con: sqlite3.Connection, code: str, df_daily: pd.DataFrame):
+    """
+    열린 커넥션(candle_store)에 MAX(date) 이후 일봉만 append (commit은 호출자 책임)
+    반환: (저장 건수, 기존 마지막 날짜, 저장된 마지막 날짜)
+    """
+    # 현재 종목의 마지막 날짜 확인
+    last_date = candle_store.last_date(con, code)
+
+    # 표준화
+    df_norm = _normalize_daily_df(df_daily)
+
+    if last_date is None or last_date == 'None':
+        df_new = df_norm
+    else:
+        # last_date 이후만 저장
+        df_new = df_norm[df_norm["date"] > last_date]
+
+    if df_new.empty:
+        return 0, last_date, None
+
+    saved = candle_store.write_candles(con, code, df_new)
+    return saved, last_date, df_new["date"].max()
+
+def upsert_daily_candles(code: str, df_daily: pd.DataFrame):
     """
-    테이블에서 가장 최근 날짜(YYYY-MM-DD 문자열)를 반환. 없으면 None
+    - 테이블이 없으면 생성 후 전체 저장
+    - 테이블이 있으면 MAX(date) 이후 데이터만 append
     """
+    con = candle_store.connect(DB_PATH)
     try:
-        cur = con.execute(f"SELECT MAX(date) FROM '{table_name}';")
-        row = cur.fetchone()
-        return row[0] if row and row[0] else None
-    except Exception:
-        return None
+        saved, last_date, new_last = _append_new_candles(con, code, df_daily)
+        con.commit()
+    finally:
+        con.close()
 
-def _create_table_if_not_exists(con: sqlite3.Connection, table_name: str):
+    if saved == 0:
+        print(f"[{code}] 신규 데이터 없음 (last_date={last_date})")
+        return
+    print(f"[{code}] 신규 {saved}건 저장 완료 (마지막: {new_last})")
+
+# -----------------------------
+# 작업 manifest (재시작/샤딩)
+# -----------------------------
+def _create_manifest_if_not_exists(con: sqlite3.Connection):
     """
-    종목코드명(예: '005930')으로 테이블 생성. 표준 TOHLCV 스키마.
+    종목별 다운로드 진행 상태
+    - run_dt: 기준일(BASE_DT). 기준일이 바뀌면 모든 종목이 다시 대상이 됨
+    - status: done / empty / error
+    - last_date: 저장된 마지막 일봉 날짜
     """
-    sql = f"""
-    CREATE TABLE IF NOT EXISTS '{table_name}' (
-        date   TEXT PRIMARY KEY,
-        open   REAL,
-        high   REAL,
-        low    REAL,
-        close  REAL,
-        volume INTEGER
+    con.execute(f"""
+    CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} (
+        code        TEXT PRIMARY KEY,
+        run_dt      TEXT,
+        status      TEXT,
+        last_date   TEXT,
+        error_count INTEGER DEFAULT 0,
+        last_error  TEXT,
+        updated_at  TEXT
     );
-    """
-    con.execute(sql)
+    """)
     con.commit()
 
-def upsert_daily_candles(code: str, df_daily: pd.DataFrame):
+def _mark_manifest(con: sqlite3.Connection, code: str, run_dt: str, status: str,
+                   last_date: Optional[str] = None, error: Optional[str] = None):
+    """manifest 갱신 (commit은 캔들 저장과 같은 트랜잭션에서 호출자가 수행)"""
+    con.execute(f"""
+    INSERT INTO {MANIFEST_TABLE} (code, run_dt, status, last_date, error_count, last_error, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(code) DO UPDATE SET
+        status      = excluded.status,
+        last_date   = COALESCE(excluded.last_date, {MANIFEST_TABLE}.last_date),
+        error_count = CASE
+                        WHEN excluded.status != 'error' THEN 0
+                        WHEN {MANIFEST_TABLE}.run_dt = excluded.run_dt THEN {MANIFEST_TABLE}.error_count + 1
+                        ELSE 1
+                      END,
+        last_error  = excluded.last_error,
+        run_dt      = excluded.run_dt,
+        updated_at  = excluded.updated_at;
+    """, (code, run_dt, status, last_date, 1 if status == "error" else 0, error,
+          datetime.now().isoformat(timespec="seconds")))
+
+def _pending_codes(con: sqlite3.Connection, codes: List[str], run_dt: str, max_errors: int) -> Tuple[List[str], int, int]:
     """
-    - 테이블이 없으면 생성 후 전체 저장
-    - 테이블이 있으면 MAX(date) 이후 데이터만 append
+    이번 기준일에 아직 끝나지 않은 종목만 반환.
+    반환: (남은 종목, 완료로 건너뛴 수, 실패 누적으로 건너뛴 수)
     """
-    _ensure_db_dir()
-    with sqlite3.connect(DB_PATH) as con:
-        table = code  # 테이블명을 종목코드로
-        _create_table_if_not_exists(con, table)
+    rows = con.execute(
+        f"SELECT code, status, error_count FROM {MANIFEST_TABLE} WHERE run_dt = ?;", (run_dt,)
+    ).fetchall()
+    state = {code: (status, error_count) for code, status, error_count in rows}
+    pending, done, failed = [], 0, 0
+    for code in codes:
+        status, error_count = state.get(code, (None, 0))
+        if status in ("done", "empty"):
+            done += 1
+        elif status == "error" and error_count >= max_errors:
+            failed += 1
+        else:
+            pending.append(code)
+    return pending, done, failed
 
-        # 현재 테이블의 마지막 날짜 확인
-        last_date = _get_max_date(con, table)
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """'i/n' 형식 (0 <= i < n)"""
+    try:
+        i, n = (int(x) for x in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"shard 형식은 i/n 이어야 합니다: {spec!r}")
+    if n <= 0 or not 0 <= i < n:
+        raise ValueError(f"shard 범위 오류 (0 <= i < n): {spec!r}")
+    return i, n
 
-        # 표준화
-        df_norm = _normalize_daily_df(df_daily)
+def shard_codes(codes: List[str], index: int, count: int) -> List[str]:
+    """종목코드 해시로 나눠 여러 프로세스가 겹치지 않게 분담 (실행마다 같은 분배)"""
+    return [c for c in codes if zlib.crc32(c.encode("utf-8")) % count == index]
 
-        if last_date is None or last_date == 'None':
-            df_new = df_norm.copy()
-        else:
-            # last_date 이후만 저장
-            df_new = df_norm[df_norm["date"] > last_date].copy()
+# -----------------------------
+# 병렬 다운로드 (조회 N개 스레드 → 단일 writer)
+# -----------------------------
+_DONE = object()
+
+def download_universe(
+    codes: List[str],
+    svc: StockChartService,
+    base_dt: str = BASE_DT,
+    workers: int = DOWNLOAD_WORKERS,
+    commit_every: int = DOWNLOAD_COMMIT_EVERY,
+    db_path: str = DB_PATH,
+    shard: Optional[Tuple[int, int]] = None,
+    resume: bool = True,
+    max_errors: int = DOWNLOAD_MAX_ERRORS,
+) -> Dict[str, float]:
+    """
+    종목 리스트 일봉 일괄 다운로드.
+    - workers개의 스레드가 동시에 조회 (호출 간격은 BaseAPIClient의 rate limiter가 관리)
+    - 조회 결과는 bounded queue를 거쳐 단일 writer가 하나의 커넥션으로 저장
+    - commit_every 종목마다 한 번씩 commit (캔들과 manifest가 같은 트랜잭션)
+    - resume=True면 manifest 기준으로 이번 기준일에 끝나지 않은 종목만 조회
+    - shard=(i, n)이면 전체 중 i번째 몫만 처리
+    반환: 처리 통계(codes, skipped, saved_codes, rows, empty, errors, elapsed, codes_per_sec, rows_per_sec)
+    """
+    con = candle_store.connect(db_path)  # WAL, 샤드 프로세스끼리는 쓰기 잠금 대기
+    _create_manifest_if_not_exists(con)
+
+    if shard is not None:
+        codes = shard_codes(codes, *shard)
+    skipped = 0
+    if resume:
+        codes, done, failed = _pending_codes(con, codes, base_dt, max_errors)
+        skipped = done + failed
+        if skipped:
+            print(f"[DOWNLOAD] 재시작: 완료 {done}종목, 실패 누적 {failed}종목 건너뜀 → 남은 {len(codes)}종목")
+
+    results: "queue.Queue" = queue.Queue(maxsize=max(workers * 4, 1))
+    stop = threading.Event()  # writer가 중단되면 조회 스레드도 멈춤
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
 
-        if df_new.empty:
-            print(f"[{code}] 신규 데이터 없음 (last_date={last_date})")
+    def fetch(code: str):
+        if stop.is_set():
             return
+        try:
+            df = svc.get_daily_chart(code.split('.')[0], base_dt)
+            put((code, df, None))
+        except Exception as e:
+            put((code, None, e))
 
-        # append
-        df_new.to_sql(table, con, if_exists="append", index=False)
-        print(f"[{code}] 신규 {len(df_new)}건 저장 완료 (마지막: {df_new['date'].max()})")
+    def produce():
+        with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="candle-fetch") as pool:
+            for code in codes:
+                pool.submit(fetch, code)
+        put(_DONE)
+
+    stats = {"codes": len(codes), "skipped": skipped, "saved_codes": 0, "rows": 0, "empty": 0, "errors": 0}
+    start = time.monotonic()
+    producer = threading.Thread(target=produce, name="candle-producer", daemon=True)
+    producer.start()
+
+    pending = 0
+    try:
+        with tqdm(total=len(codes), unit="code") as bar:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    break
+                code, df_daily, err = item
+                bar.update(1)
+                pending += 1
+                if err is not None:
+                    stats["errors"] += 1
+                    print(f"[{code}] 에러: {err}")
+                    _mark_manifest(con, code, base_dt, "error", error=str(err))
+                elif df_daily is None or df_daily.empty:
+                    stats["empty"] += 1
+                    _mark_manifest(con, code, base_dt, "empty")
+                else:
+                    try:
+                        saved, last_date, new_last = _append_new_candles(con, code, df_daily)
+                    except Exception as e:
+                        stats["errors"] += 1
+                        print(f"[{code}] 저장 에러: {e}")
+                        _mark_manifest(con, code, base_dt, "error", error=str(e))
+                    else:
+                        if saved:
+                            stats["saved_codes"] += 1
+                            stats["rows"] += saved
+                        _mark_manifest(con, code, base_dt, "done", last_date=new_last or last_date)
+                if pending >= commit_every:
+                    con.commit()
+                    pending = 0
+                elapsed = time.monotonic() - start
+                bar.set_postfix(rows=stats["rows"], rps=f"{stats['rows'] / elapsed:.0f}" if elapsed > 0 else "-")
+        con.commit()
+    finally:
+        stop.set()
+        con.close()
+        producer.join()
+
+    elapsed = time.monotonic() - start
+    stats["elapsed"] = elapsed
+    stats["codes_per_sec"] = len(codes) / elapsed if elapsed > 0 else 0.0
+    stats["rows_per_sec"] = stats["rows"] / elapsed if elapsed > 0 else 0.0
+    print(
+        f"[DOWNLOAD] {len(codes)}종목 {elapsed:.1f}s "
+        f"({stats['codes_per_sec']:.1f} 종목/s, {stats['rows']}행, {stats['rows_per_sec']:.0f} 행/s) "
+        f"저장 {stats['saved_codes']} / 빈응답 {stats['empty']} / 에러 {stats['errors']}"
+    )
+    return stats
 
 def download_krx_stock_list(file_name: str):
         """
@@ -214,7 +377,15 @@ def download_krx_stock_list(file_name: str):
 # -----------------------------
 # 메인 로직
 # -----------------------------
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="일봉 일괄 다운로드")
+    parser.add_argument("--shard", type=parse_shard, default=None, help="i/n: 전체 종목 중 i번째 몫만 처리 (0 <= i < n)")
+    parser.add_argument("--workers", type=int, default=DOWNLOAD_WORKERS, help="동시 조회 스레드 수")
+    parser.add_argument("--base-dt", default=BASE_DT, help="조회 기준일 YYYYMMDD (manifest 구분 키)")
+    parser.add_argument("--fresh", action="store_true", help="manifest를 무시하고 전체 종목을 다시 조회")
+    parser.add_argument("--archive", action="store_true", help="다운로드 후 기준일 연도 파티션을 컬럼형 아카이브(pyarrow)로 기록")
+    args = parser.parse_args(argv)
+
     # 토큰
     with open(os.path.join(project_root, "access_token.txt"), "r", encoding="utf-8") as f:
         token = f.read().strip()
@@ -239,18 +410,15 @@ def main():
     codes = (stock_df["종목코드"] + '.' + stock_df["type"]).tolist()
     svc = StockChartService(token)
 
-    # 루프: 각 종목 일봉 다운로드 → DB 저장
-    for code in tqdm(codes):
-        sleep(0.33)
-        try:
-            df_daily = svc.get_daily_chart(code.split('.')[0], BASE_DT)  # DataFrame 반환 가정
-            if df_daily is None or df_daily.empty:
-                print(f"[{code}] 일봉 데이터 없음")
-                continue
-            # df_daily = df_daily[:-1]
-            upsert_daily_candles(code, df_daily)
-        except Exception as e:
-            print(f"[{code}] 에러: {e}")
+    # 병렬 조회 → 단일 writer 저장, 중단되면 같은 명령으로 남은 종목만 이어서 받음
+    download_universe(codes, svc, base_dt=args.base_dt, workers=args.workers,
+                      shard=args.shard, resume=not args.fresh)
+
+    if args.archive:
+        # 샤드로 나눠 돌렸다면 마지막 샤드가 끝난 뒤 한 번만 실행하는 것을 권장
+        from db.candle_archive import export_candles_from_store
+        written = export_candles_from_store(DB_PATH, start=args.base_dt)
+        print(f"[ARCHIVE] {len(written)}개 파티션 / {sum(written.values())}행 기록")
 
 
 if __name__ == "__main__":
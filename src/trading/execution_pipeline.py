@@ -0,0 +1,141 @@
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# ---------------------------------------------------------------------
+# 체결 처리 파이프라인 (수신 루프 ↔ DB 기록 분리)
+# ---------------------------------------------------------------------
+# WebSocket 수신 루프는 REAL 값을 큐에 넣기만 하고,
+# 전용 writer 스레드 하나가 들어온 순서대로 DB에 반영합니다.
+# 체결이 몰리면 writer는 큐에 쌓인 만큼(최대 EXEC_BATCH_SIZE) 한 번에 꺼내 처리합니다.
+
+EXEC_BATCH_SIZE = int(os.getenv("EXEC_BATCH_SIZE", "100"))
+EXEC_QUEUE_MAX = int(os.getenv("EXEC_QUEUE_MAX", "0"))  # 0: 무제한
+
+_STOP = object()
+
+
+class ExecutionPipeline:
+    """
+    pipeline = ExecutionPipeline(handle_order_execution_real).start()
+    pipeline.submit(values)     # 수신 루프: 넣기만 함 (블로킹 없음)
+    pipeline.metrics()          # 큐 깊이 / 지연 / 처리 건수
+    pipeline.stop()             # 남은 이벤트까지 처리 후 종료
+    - batch_handler를 주면 꺼낸 묶음을 한 번에 넘깁니다 (없으면 handler를 건별 호출)
+    """
+    def __init__(self, handler: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 batch_handler: Optional[Callable[[List[Dict[str, Any]]], Any]] = None,
+                 batch_size: int = EXEC_BATCH_SIZE, maxsize: int = EXEC_QUEUE_MAX):
+        if handler is None and batch_handler is None:
+            raise ValueError("handler 또는 batch_handler가 필요합니다.")
+        self.handler = handler
+        self.batch_handler = batch_handler
+        self.batch_size = max(1, batch_size)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {
+            "submitted": 0, "processed": 0, "errors": 0, "batches": 0,
+            "max_batch": 0, "max_depth": 0,
+            "last_lag": 0.0, "max_lag": 0.0, "total_lag": 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "ExecutionPipeline":
+        if not self.running:
+            self._thread = threading.Thread(target=self._run, name="exec-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, values: Dict[str, Any]) -> None:
+        self._queue.put((time.monotonic(), values))
+        with self._lock:
+            self.stats["submitted"] += 1
+            depth = self._queue.qsize()
+            if depth > self.stats["max_depth"]:
+                self.stats["max_depth"] = depth
+
+    def stop(self, timeout: Optional[float] = 30.0) -> None:
+        """남은 이벤트를 모두 반영한 뒤 writer 종료"""
+        if self._thread is None:
+            return
+        self._queue.put((time.monotonic(), _STOP))
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logging.warning(f"[EXEC] writer 종료 대기 시간 초과 (남은 이벤트 {self._queue.qsize()}건)")
+        self._thread = None
+
+    def join(self) -> None:
+        """지금까지 넣은 이벤트가 모두 처리될 때까지 대기"""
+        self._queue.join()
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            out = dict(self.stats)
+        out["depth"] = self._queue.qsize()
+        out["avg_lag"] = out["total_lag"] / out["processed"] if out["processed"] else 0.0
+        return out
+
+    # -----------------------------
+    # writer 스레드
+    # -----------------------------
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(values is _STOP for _, values in batch)
+            items = [(t, values) for t, values in batch if values is not _STOP]
+            if items:
+                self._apply(items)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _apply(self, items) -> None:
+        errors = 0
+        if self.batch_handler is not None:
+            try:
+                self.batch_handler([values for _, values in items])
+            except Exception as e:
+                if len(items) == 1:
+                    errors = 1
+                    logging.error(f"[EXEC] 처리 실패: {e}, values={items[0][1]}")
+                else:
+                    # 묶음이 통째로 롤백되므로 한 건씩 다시 (exec_id 멱등이라 재시도 안전)
+                    logging.error(f"[EXEC] batch 처리 실패 ({len(items)}건) → 건별 재시도: {e}")
+                    for _, values in items:
+                        try:
+                            self.batch_handler([values])
+                        except Exception as e:
+                            errors += 1
+                            logging.error(f"[EXEC] 처리 실패: {e}, values={values}")
+        else:
+            for _, values in items:
+                try:
+                    self.handler(values)
+                except Exception as e:
+                    errors += 1
+                    logging.error(f"[EXEC] 처리 실패: {e}, values={values}")
+
+        done = time.monotonic()
+        lags = [done - t for t, _ in items]
+        with self._lock:
+            self.stats["processed"] += len(items)
+            self.stats["errors"] += errors
+            self.stats["batches"] += 1
+            self.stats["max_batch"] = max(self.stats["max_batch"], len(items))
+            self.stats["last_lag"] = lags[-1]
+            self.stats["max_lag"] = max(self.stats["max_lag"], max(lags))
+            self.stats["total_lag"] += sum(lags)
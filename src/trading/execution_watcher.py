@@ -1,25 +1,23 @@
 import os
-import json
 import asyncio
-import websockets
+import logging
 from decimal import Decimal
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import re
 
 from db import (
     init_db,
-    update_order_status,
-    get_order_by_no,
-    record_execution,         # SELL이면 내부 FIFO 매칭으로 trades 생성
+    ingest_executions,        # 주문/체결/FIFO(trades)를 배치 단위 한 트랜잭션으로
 )
 from db.hold_sqlite import (
-    _get_conn,
     init_hold_table,
-    get_hold,
+    apply_fills,
 )
 
 from config import config
+from api.ws_session import CLOSED, WSSession, close_ws_sessions, get_ws_session
+from trading.execution_pipeline import ExecutionPipeline
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 with open(os.path.join(project_root, "access_token.txt"), "r", encoding="utf-8") as f:
@@ -86,15 +84,13 @@ def _safe_get(d: Dict[str, Any], key: str, default: str = "") -> str:
 # -----------------------------
 # REAL: 주문체결(type '00') 처리
 # -----------------------------
-def handle_order_execution_real(values: Dict[str, Any]) -> None:
-    order_no = _safe_get(values, "9203") or _safe_get(values, "9205")
+_STATUS_MAP = {"접수": "ACCEPTED", "취소": "CANCELLED", "정정": "AMENDED"}
 
-    # 1) orders 테이블 등록정보(있으면 우선)
-    db_order = get_order_by_no(order_no) if order_no else None
-    db_account_id = getattr(db_order, "account_id", None)
-    db_ticker     = getattr(db_order, "ticker", None)
+def parse_order_execution_real(values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """REAL(00) values → ingest_executions 이벤트 (처리 대상 상태가 아니면 None)"""
+    order_no = _safe_get(values, "9203") or _safe_get(values, "9205")
 
-    # 2) 실시간 패킷 값
+    # 실시간 패킷 값
     raw_ticker      = _safe_get(values, "9001")
     market          = _safe_get(values, "2135") or "KRX"
     order_qty_s     = _safe_get(values, "900")   # 주문수량
@@ -119,7 +115,7 @@ def handle_order_execution_real(values: Dict[str, Any]) -> None:
         f"commission={comm_s}, tax={tax_s}"
     )
 
-    # 3) 정규화/파싱
+    # 정규화/파싱
     side        = _parse_side(side_txt)  # BUY / SELL
     price_exec  = _to_decimal(px_exec_s)
     price_ref   = _to_decimal(px_ref_s)
@@ -135,223 +131,149 @@ def handle_order_execution_real(values: Dict[str, Any]) -> None:
     commission  = _to_decimal(comm_s)
     sell_tax    = _to_decimal(tax_s)
     exec_time   = _parse_exec_time(last_tm)
-
-    ticker      = db_ticker or _normalize_ticker(raw_ticker)
-    account_id  = db_account_id or ACCOUNT_ID
     st          = (status or "").strip()
 
-    # 4) 상태별 주문 상태 갱신
-    if st == "접수":
-        if order_no:
-            update_order_status(order_no=order_no, status="ACCEPTED")
-        return
-    if st == "취소":
-        if order_no:
-            update_order_status(order_no=order_no, status="CANCELLED")
-        return
-    if st == "정정":
-        if order_no:
-            update_order_status(order_no=order_no, status="AMENDED")
-        return
-
-    # 5) 체결 처리
-    if "체결" in st:
-        # exec_id (체결번호가 있으면 그걸 쓰고, 없으면 구성)
-        exec_no = _safe_get(values, "909")
-        if exec_no:
-            exec_id = f"{side}-EXEC-{exec_no}"
-        else:
-            exec_id = f"{side}-EXEC-{order_no}-{exec_time.strftime('%H%M%S')}"
-
-        use_commission = commission if commission > 0 else (
-            DEFAULT_BUY_COMMISSION if side == "BUY" else DEFAULT_SELL_COMMISSION
-        )
-        use_tax = sell_tax if side == "SELL" else Decimal("0.00")
-
-        # (A) executions 항상 기록
-        rec_id = record_execution(
-            exec_id=str(exec_id),
-            order_no=str(order_no) if order_no else "UNKNOWN",
-            account_id=account_id,
-            ticker=ticker,
-            market=str(market),
-            side=side,
-            qty=float(exec_qty),
-            price=float(price),
-            commission=float(use_commission),
-            tax=float(use_tax),
-            exec_time=exec_time
+    event = {
+        "order_no": order_no or None,
+        "account_id": None,                       # 기존 주문 정보 우선, 없으면 ACCOUNT_ID
+        "ticker": _normalize_ticker(raw_ticker),
+        "market": str(market),
+        "side": side,
+        "order_qty": order_qty,
+        "price": price,
+        "exec_time": exec_time,
+    }
+
+    # 상태별 주문 상태 갱신만
+    if st in _STATUS_MAP:
+        if not order_no:
+            return None
+        event["status"] = _STATUS_MAP[st]
+        return event
+
+    # 체결
+    if "체결" not in st:
+        return None
+    # exec_id (체결번호가 있으면 그걸 쓰고, 없으면 구성)
+    exec_no = _safe_get(values, "909")
+    if exec_no:
+        exec_id = f"{side}-EXEC-{exec_no}"
+    else:
+        exec_id = f"{side}-EXEC-{order_no}-{exec_time.strftime('%H%M%S')}"
+
+    use_commission = commission if commission > 0 else (
+        DEFAULT_BUY_COMMISSION if side == "BUY" else DEFAULT_SELL_COMMISSION
+    )
+    use_tax = sell_tax if side == "SELL" else Decimal("0.00")
+
+    event.update({
+        "exec_id": str(exec_id),
+        "status": "FILLED" if remain_qty == 0 else "PARTIALLY_FILLED",
+        "qty": exec_qty,
+        "commission": use_commission,
+        "tax": use_tax,
+    })
+    return event
+
+def handle_order_executions(values_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    REAL(00) 묶음 처리: orders/executions/trades는 ingest_executions 한 트랜잭션,
+    hold_list는 apply_fills 한 트랜잭션으로 반영.
+    두 DB의 트랜잭션이 따로라 apply_fills만 실패한 뒤 재시도되면 ingest는 중복으로 건너뛰므로,
+    hold 쪽은 새 체결만이 아니라 묶음의 모든 체결을 넘기고 apply_fills가 exec_id로 걸러냅니다.
+    """
+    events = [ev for ev in map(parse_order_execution_real, values_list) if ev is not None]
+    if not events:
+        return {"inserted": [], "duplicates": 0}
+    result = ingest_executions(
+        events,
+        default_account_id=ACCOUNT_ID,
+        update_holds=False,            # hold_list는 hold_sqlite(DB_PATH)에서 관리
+    )
+    fills = [
+        {**ev, "account_id": ev.get("account_id") or ACCOUNT_ID}
+        for ev in events if ev.get("exec_id")
+    ]
+    if fills:
+        result["holds_applied"] = apply_fills(
+            fills,
+            now_ts=datetime.now(timezone.utc).replace(tzinfo=None),
+            max_splits=MAX_SPLITS,
+            target_pct=Decimal(str(TARGET_PCT)),
+            stop_pct=Decimal(str(STOP_PCT)),
         )
+    inserted = set(result["inserted"])
+    for ev in fills:
+        if ev["exec_id"] in inserted:
+            inserted.discard(ev["exec_id"])
+            print(
+                f"[EXEC] side={ev['side']}, order_no={ev['order_no']}, "
+                f"ticker={ev['ticker']}, exec_qty={ev['qty']}, price={ev['price']}, "
+                f"status={ev['status']}, hold.updated"
+            )
+    return result
 
-        # (B) orders 상태 갱신
-        if order_no:
-            if remain_qty == 0:
-                update_order_status(order_no=order_no, status="FILLED")
-            else:
-                update_order_status(order_no=order_no, status="PARTIALLY_FILLED")
-
-        # (C) hold_list 갱신 (핵심)
-        now_ts = datetime.now(timezone.utc).replace(tzinfo=None)
-        row = get_hold(account_id, ticker)
-
-        if side == "BUY":
-            # 신규/추가 매수 → 평단/수량/수수료/세금 누적 + n_trade 증가(최대 4)
-            if row is None:
-                new_qty = exec_qty
-                new_avg = price
-                n_trade = 1
-                target  = (new_avg * (Decimal("1")+TARGET_PCT)).quantize(Decimal("0.01"))
-                stop    = (new_avg * (Decimal("1")+STOP_PCT)).quantize(Decimal("0.01"))
-                _sql = """
-                    INSERT INTO hold_list
-                    (account_id, ticker, market,
-                     qty, remain_qty, buy_avg_price, n_trade,
-                     buy_time, last_buy_time, target_price, stop_price,
-                     fee_accum, tax_accum, last_order_id, updated_at)
-                    VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-                """
-                _args = (
-                    account_id, ticker, market,
-                    str(new_qty), str(new_qty), str(new_avg), n_trade,
-                    now_ts, now_ts, str(target), str(stop),
-                    str(use_commission), str(use_tax), order_no, now_ts
-                )
-            else:
-                old_qty = Decimal(str(row["qty"]))
-                old_avg = Decimal(str(row["buy_avg_price"]))
-                old_fee = Decimal(str(row["fee_accum"]))
-                old_tax = Decimal(str(row["tax_accum"]))
-                old_n   = int(row["n_trade"]) if row["n_trade"] is not None else 0
-
-                new_qty = old_qty + exec_qty
-                new_avg = ((old_avg * old_qty) + (price * exec_qty)) / (new_qty if new_qty != 0 else Decimal("1"))
-                new_avg = new_avg.quantize(Decimal("0.000001"))
-                n_trade = min(old_n + 1, MAX_SPLITS)
-                fee_acc = old_fee + use_commission
-                tax_acc = old_tax + use_tax
-                target  = (new_avg * (Decimal("1")+TARGET_PCT)).quantize(Decimal("0.01"))
-                stop    = (new_avg * (Decimal("1")+STOP_PCT)).quantize(Decimal("0.01"))
-
-                _sql = """
-                    UPDATE hold_list
-                    SET qty=?, remain_qty=?, buy_avg_price=?, n_trade=?,
-                        last_buy_time=?, target_price=?, stop_price=?,
-                        fee_accum=?, tax_accum=?, last_order_id=?, updated_at=?
-                    WHERE account_id=? AND ticker=?
-                """
-                _args = (
-                    str(new_qty), str(new_qty), str(new_avg), n_trade,
-                    now_ts, str(target), str(stop),
-                    str(fee_acc), str(tax_acc), order_no, now_ts,
-                    account_id, ticker
-                )
-
-        else:  # SELL
-            # 보유 수량 차감, 수수료/세금 누적
-            if row is not None:
-                old_qty = Decimal(str(row["qty"]))
-                old_rem = Decimal(str(row["remain_qty"]))
-                old_fee = Decimal(str(row["fee_accum"]))
-                old_tax = Decimal(str(row["tax_accum"]))
-
-                new_qty = max(old_qty - exec_qty, Decimal("0"))
-                new_rem = max(old_rem - exec_qty, Decimal("0"))
-                fee_acc = old_fee + use_commission
-                tax_acc = old_tax + use_tax
-
-                _sql = """
-                    UPDATE hold_list
-                    SET qty=?, remain_qty=?, fee_accum=?, tax_accum=?, updated_at=?
-                    WHERE account_id=? AND ticker=?
-                """
-                _args = (
-                    str(new_qty), str(new_rem), str(fee_acc), str(tax_acc), now_ts,
-                    account_id, ticker
-                )
-            else:
-                _sql, _args = None, None
-
-        # (D) hold_list에 반영
-        if _sql:
-            with _get_conn() as _c:
-                _c.execute(_sql, _args)
-                _c.commit()
-
-        print(
-            f"[EXEC] rec_id={rec_id}, side={side}, order_no={order_no}, "
-            f"ticker={ticker}, exec_qty={exec_qty}, price={price}, "
-            f"remain(order)={remain_qty}, hold.updated"
-        )
-        return
+def handle_order_execution_real(values: Dict[str, Any]) -> None:
+    """REAL(00) 단건 처리 (handle_order_executions의 1건 버전)"""
+    handle_order_executions([values])
 
 # -----------------------------
 # WebSocket 러너
 # -----------------------------
 class ExecutionWatcher:
-    def __init__(self, socket_url: str, access_token: str):
+    def __init__(self, socket_url: str, access_token: str, session: Optional[WSSession] = None):
+        """
+        session을 넘기면 그 연결을, 없으면 현재 루프의 공용 세션(get_ws_session)을 씁니다.
+        어느 쪽이든 조건검색/시세 등 다른 소비자와 로그인된 소켓 하나를 공유
+        """
         self.socket_url = socket_url
         self.access_token = access_token
-        self.websocket = None
+        self.session = session
+        self._inbox: Optional[asyncio.Queue] = None
         self.connected = False
         self.keep_running = True
+        # DB 반영은 writer 스레드에서 순서대로 (수신 루프는 큐에 넣기만 함)
+        self.pipeline = ExecutionPipeline(batch_handler=handle_order_executions)
 
     async def connect(self):
-        self.websocket = await websockets.connect(self.socket_url)
-        self.connected = True
         print("[WS] connecting...")
-
-        # 로그인
-        login = {'trnm': 'LOGIN', 'token': self.access_token}
-        await self.send(login)
-        print("[WS] login sent")
+        if self.session is None:
+            self.session = await get_ws_session(self.access_token, self.socket_url)
+        if self._inbox is None:
+            # REAL만 구독 (REG 응답은 register_streams의 request가 받음)
+            self._inbox = self.session.subscribe("REAL")
+        await self.session.start()  # 로그인 응답까지 대기 (끊겼으면 재접속), 실패 시 RuntimeError
+        self.connected = True
+        print("[WS] login ok")
 
     async def send(self, payload: dict):
         if not self.connected:
             await self.connect()
-        await self.websocket.send(json.dumps(payload))
+        await self.session.send(payload)
 
     async def receive_forever(self):
         while self.keep_running:
             try:
-                msg = await self.websocket.recv()
-                data = json.loads(msg)
+                data = await self._inbox.get()
 
                 trnm = data.get('trnm')
-                if trnm == 'LOGIN':
-                    if data.get('return_code') == 0:
-                        print("[WS] login ok")
-                    else:
-                        print(f"[WS] login failed: {data.get('return_msg')}")
-                        await self.close()
-                        break
-
-                elif trnm == 'PING':
-                    await self.send(data)  # echo
-
-                elif trnm == 'REAL':
+                if trnm == CLOSED:
+                    print("[WS] closed by server")
+                    self.connected = False
+                    break
+
+                if trnm == 'REAL':
                     items = data.get('data') or []
                     for it in items:
                         rtype = it.get('type')
                         rname = it.get('name')
                         values = it.get('values', {})
                         if rtype == '00' and rname == '주문체결':
-                            try:
-                                handle_order_execution_real(values)
-                            except Exception as e:
-                                print(f"[ERR] handle_order_execution_real: {e}, values={values}")
-
-                # 디버깅 로그 (원하면 주석)
-                if trnm != 'PING':
-                    print("[WS] recv:", data)
-
-            except websockets.ConnectionClosed:
-                print("[WS] closed by server")
-                self.connected = False
-                try:
-                    await self.websocket.close()
-                except Exception:
-                    pass
-                break
+                            self.pipeline.submit(values)
+
+                # PING은 세션에서 처리되어 여기로 오지 않음
+                logging.debug(f"[WS] recv: {data}")
+
             except Exception as e:
                 print(f"[WS] error: {e}")
                 break
@@ -369,8 +291,12 @@ class ExecutionWatcher:
                 'type': ['00'],  # 주문체결
             }]
         }
-        await self.send(payload)
-        print("[WS] REG sent for type=00")
+        if not self.connected:
+            await self.connect()
+        resp = await self.session.request(payload)
+        if resp.get("return_code") not in (None, 0):
+            raise RuntimeError(f"REG 실패: {resp.get('return_msg')}")
+        print("[WS] REG ok for type=00")
 
     async def run(self, reconnect: bool = True, backoff_start: float = 1.0, backoff_max: float = 30.0):
         """
@@ -381,6 +307,7 @@ class ExecutionWatcher:
 
         init_db()
         init_hold_table()
+        self.pipeline.start()
 
         backoff = backoff_start
         while self.keep_running:
@@ -391,12 +318,7 @@ class ExecutionWatcher:
             except Exception as e:
                 print(f"[WS] run error: {e}")
             finally:
-                if self.websocket:
-                    try:
-                        await self.websocket.close()
-                    except Exception:
-                        pass
-                self.connected = False
+                await self._release()
 
             if not reconnect:
                 break
@@ -406,20 +328,34 @@ class ExecutionWatcher:
             await asyncio.sleep(backoff)
             backoff = min(backoff * 2, backoff_max)
 
+        await asyncio.to_thread(self.pipeline.stop)
+
+    async def _release(self):
+        """구독 해제. 세션은 다른 소비자와 공유하므로 닫지 않음 (재접속 시 새 구독 큐를 만듭니다)"""
+        if self.session is not None and self._inbox is not None:
+            self.session.unsubscribe("REAL", self._inbox)
+        self._inbox = None
+        self.connected = False
+
+    def metrics(self) -> Dict[str, float]:
+        """체결 파이프라인 상태: depth(대기 건수), avg_lag/max_lag(수신→DB 반영 초), processed, errors"""
+        return self.pipeline.metrics()
+
     async def close(self):
         self.keep_running = False
-        if self.websocket:
-            try:
-                await self.websocket.close()
-            except Exception:
-                pass
-        self.connected = False
+        await self._release()
+        # 남은 체결까지 DB에 반영 (writer join은 블로킹이므로 스레드에서 대기)
+        await asyncio.to_thread(self.pipeline.stop)
+        print(f"[EXEC] pipeline metrics: {self.metrics()}")
         print("[WS] closed")
 
 # 진입점
 async def main():
     watcher = ExecutionWatcher(config.app.ws_url, token)
-    await watcher.run()
+    try:
+        await watcher.run()
+    finally:
+        await close_ws_sessions()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,190 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from db import candle_store
+from db.candle_store import INDICATOR_CACHE_TABLE
+from trading.indicators import FEATURES, INDICATOR_VERSION, compute_indicators, resolve_features
+
+# ---------------------------------------------------------------------
+# 지표 캐시 (종목 × 마지막 봉 날짜 × 지표 세트 버전 → 마지막 행 지표값)
+# ---------------------------------------------------------------------
+# 캔들 이력이 바뀌지 않았으면 재시작 후에도 compute_indicators 대신 캐시 한 번 읽기로 끝냅니다.
+# - 저장 위치: candles.db의 indicator_cache 테이블 (candle_store.ensure_schema가 생성)
+# - 무효화: candle_store.write_candles(upsert_daily_candles / download_universe 경로)가
+#   캔들을 쓰는 같은 트랜잭션에서 그 종목 행을 삭제
+# - 장중처럼 마지막 봉이 같은 날짜로 갱신되는 경우는 저장해 둔 봉 수 + 마지막 OHLCV가 달라 miss
+# - 크기 제한: INDICATOR_CACHE_MAX_ENTRIES 행을 넘으면 오래 안 쓴 행부터 삭제 (LRU)
+#   적중 시각(used_at)은 메모리에 모았다가 put()/flush()/close() 때 한 번에 기록 (읽기마다 쓰지 않음)
+# - 오늘 날짜에 따라 값이 바뀌는 단계(Feature.dated, 예: days_since_max_high)는 저장하지 않고
+#   적중이어도 매번 다시 계산 → 캔들이 그대로인 다음 날에도 값이 맞음
+
+INDICATOR_CACHE_MAX_ENTRIES = int(os.getenv("INDICATOR_CACHE_MAX_ENTRIES", "20000"))
+
+_BAR_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def cache_version(features: Optional[Iterable[str]] = None) -> str:
+    """지표 세트 버전: INDICATOR_VERSION + 계산할 단계 목록의 crc32"""
+    steps = ",".join(resolve_features(features))
+    return f"{INDICATOR_VERSION}-{zlib.crc32(steps.encode('utf-8')):08x}"
+
+
+def _ticker(code: str) -> str:
+    return code.split(".")[0]
+
+
+def _last_date(df: pd.DataFrame) -> str:
+    return str(df.index[-1])[:10]
+
+
+def _bar(df: pd.DataFrame) -> str:
+    """봉 수 + 마지막 봉 OHLCV (같은 날짜의 봉이 갱신됐는지 확인용)"""
+    last = df.iloc[-1]
+    return json.dumps([len(df)] + [float(last[c]) for c in _BAR_FIELDS if c in df.columns])
+
+
+class IndicatorCache:
+    """
+    cache = IndicatorCache()                                   # 기본: CANDLE_STORE_PATH
+    row = cache.frame("005930.KS", df, features=[...])         # 1행 DataFrame (적중이면 계산 생략)
+    - df: 날짜 인덱스 + open/high/low/close/volume 열 (compute_indicators 입력과 같음)
+    - 저장하는 값은 마지막 행의 지표 열만 (filter1/filter2/filter3는 마지막 행만 읽음)
+    """
+    def __init__(self, path: Optional[str] = None, max_entries: int = INDICATOR_CACHE_MAX_ENTRIES):
+        self.path = path or candle_store.CANDLE_STORE_PATH
+        self.max_entries = max_entries
+        self.con: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._used: Dict[tuple, float] = {}  # 적중 키 → 마지막 사용 시각 (아직 기록 안 함)
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+    def connect(self) -> sqlite3.Connection:
+        if self.con is None:
+            self.con = candle_store.connect(self.path)
+        return self.con
+
+    def close(self):
+        if self.con is not None:
+            self.flush()
+            self.con.close()
+            self.con = None
+
+    def flush(self) -> None:
+        """모아 둔 적중 시각을 한 트랜잭션으로 기록"""
+        with self._lock:
+            if self._used:
+                con = self.connect()
+                self._write_used(con)
+                con.commit()
+
+    def _write_used(self, con: sqlite3.Connection) -> None:
+        used, self._used = self._used, {}
+        con.executemany(
+            f"UPDATE {INDICATOR_CACHE_TABLE} SET used_at = ? WHERE ticker = ? AND last_date = ? AND version = ?;",
+            [(ts, *key) for key, ts in used.items()],
+        )
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -----------------------------
+    # 조회 / 저장
+    # -----------------------------
+    def get(self, code: str, df: pd.DataFrame, version: str) -> Optional[Dict[str, float]]:
+        """(종목, df 마지막 날짜, version) 항목이 있고 마지막 봉도 같으면 저장된 지표값"""
+        if df.empty:
+            return None
+        key = (_ticker(code), _last_date(df), version)
+        with self._lock:
+            con = self.connect()
+            row = con.execute(
+                f"SELECT bar, vals FROM {INDICATOR_CACHE_TABLE} WHERE ticker = ? AND last_date = ? AND version = ?;",
+                key,
+            ).fetchone()
+            if row is None or row[0] != _bar(df):
+                self.stats["misses"] += 1
+                return None
+            self._used[key] = time.time()
+        self.stats["hits"] += 1
+        return json.loads(row[1])
+
+    def put(self, code: str, df: pd.DataFrame, version: str, values: Dict[str, float]) -> None:
+        """지표값 저장 (같은 종목의 이전 날짜/버전 항목은 교체), 상한을 넘으면 LRU 삭제"""
+        if df.empty:
+            return
+        ticker = _ticker(code)
+        vals = json.dumps({k: float("nan") if v is None or pd.isna(v) else float(v) for k, v in values.items()})
+        with self._lock:
+            con = self.connect()
+            con.execute(f"DELETE FROM {INDICATOR_CACHE_TABLE} WHERE ticker = ? AND version = ?;", (ticker, version))
+            con.execute(
+                f"INSERT OR REPLACE INTO {INDICATOR_CACHE_TABLE} (ticker, last_date, version, bar, vals, used_at) "
+                f"VALUES (?, ?, ?, ?, ?, ?);",
+                (ticker, _last_date(df), version, _bar(df), vals, time.time()),
+            )
+            self._write_used(con)  # LRU 판단 전에 최근 적중 반영
+            self._evict(con)
+            con.commit()
+
+    def _evict(self, con: sqlite3.Connection) -> None:
+        over = con.execute(f"SELECT COUNT(*) FROM {INDICATOR_CACHE_TABLE};").fetchone()[0] - self.max_entries
+        if over > 0:
+            con.execute(
+                f"DELETE FROM {INDICATOR_CACHE_TABLE} WHERE rowid IN "
+                f"(SELECT rowid FROM {INDICATOR_CACHE_TABLE} ORDER BY used_at LIMIT ?);",
+                (over,),
+            )
+            self.stats["evicted"] += over
+
+    def invalidate(self, code: Optional[str] = None) -> int:
+        """종목(또는 전체) 캐시 삭제. 반환: 삭제 행 수"""
+        with self._lock:
+            con = self.connect()
+            if code is None:
+                cur = con.execute(f"DELETE FROM {INDICATOR_CACHE_TABLE};")
+            else:
+                cur = con.execute(f"DELETE FROM {INDICATOR_CACHE_TABLE} WHERE ticker = ?;", (_ticker(code),))
+            con.commit()
+        return cur.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.connect().execute(f"SELECT COUNT(*) FROM {INDICATOR_CACHE_TABLE};").fetchone()[0]
+
+    # -----------------------------
+    # compute_indicators 대체
+    # -----------------------------
+    def frame(self, code: str, df: pd.DataFrame, features: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """df 마지막 행 + 지표 열 (1행 DataFrame). miss면 compute_indicators(df, features) 후 저장"""
+        features = list(features) if features is not None else None
+        steps = resolve_features(features)
+        dated = [s for s in steps if FEATURES[s].dated]
+        version = cache_version(features)
+        values = self.get(code, df, version)
+        if values is None:
+            last_row = compute_indicators(df, features=features).iloc[-1]
+            stored = [c for c in _columns(steps) if c not in _columns(dated)]
+            values = last_row[stored].to_dict()
+            self.put(code, df, version, values)
+            values.update(last_row[_columns(dated)].to_dict())
+        elif dated:
+            values.update(compute_indicators(df.copy(), features=dated).iloc[-1][_columns(dated)].to_dict())
+        values = {c: values[c] for c in _columns(steps)}
+        last = df.iloc[[-1]]
+        keep = [c for c in last.columns if c not in values]
+        return pd.concat([last[keep], pd.DataFrame([values], index=last.index)], axis=1)
+
+
+def _columns(steps: Iterable[str]) -> List[str]:
+    return [c for step in steps for c in FEATURES[step].columns]
@@ -0,0 +1,485 @@
+import math
+import os
+import pickle
+from collections import deque
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------------------
+# 증분 지표 엔진 (마지막 봉만 갱신)
+# ---------------------------------------------------------------------
+# compute_indicators는 종목마다 전체 이력으로 모든 지표를 다시 계산하지만
+# strategy.filter1/filter2는 마지막 행만 봅니다.
+# 여기서는 종목별로 EMA 누적값 / 롤링 윈도우 / Wilder(RMA) 평활 상태를 들고 있다가
+# 새 봉 하나마다 상수 시간에 갱신하고, 상태는 파일에 저장해 다음 실행에서 이어 씁니다.
+#
+# 계산식은 compute_indicators(pandas_ta 0.3.14b 기본값, TA-Lib 미사용)와 같게 맞춤:
+#   ema = 처음 length개 평균으로 시작하는 EMA(adjust=False),  rma = ewm(alpha=1/length, adjust=True)
+# 입력 시계열의 NaN은 앞부분(워밍업)에만 있다고 가정합니다.
+
+INDICATOR_STATE_PATH = os.getenv("INDICATOR_STATE_PATH", "./sqlite3/indicator_state.pkl")
+STATE_VERSION = 1
+
+INDICATOR_COLUMNS = (
+    "SMI", "avg_volume", "vrate", "Stoch_RSI",
+    "BB_lower_pct", "BB_mid", "BB_upper_pct", "BB_length",
+    "SQZ_VAL", "SQZ_ON", "OBV",
+    "mapct_5", "mapct_20", "mapct_60", "mapct_200",
+    "RSI", "MACD", "MACDh", "MACDs", "CCI",
+    "COR", "LOR", "HOR", "LCR", "HCR", "HLR",
+    "ADX", "ATR",
+    "recover_days", "correct_days", "minmaxgap", "close_std", "profit_600",
+    "days_since_max_high", "zlema", "baseline",
+)
+
+_NAN = float("nan")
+
+
+def _div(a: float, b: float) -> float:
+    """pandas와 같은 나눗셈 (0/0 → NaN, x/0 → ±inf)"""
+    if b == 0:
+        if a == 0 or a != a:
+            return _NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class _Window:
+    """
+    최근 n개 값의 롤링 윈도우 (NaN은 건너뜀)
+    합계/가중합(1..n)을 누적해 mean/wma/linreg는 O(1), n번 넣을 때마다 다시 합산해 오차 누적을 막음
+    """
+    __slots__ = ("n", "buf", "sum", "wsum", "_pushes")
+
+    def __init__(self, n: int):
+        self.n = n
+        self.buf = deque(maxlen=n)
+        self.sum = 0.0
+        self.wsum = 0.0
+        self._pushes = 0
+
+    def push(self, x: float) -> None:
+        if x != x:
+            return
+        buf = self.buf
+        if len(buf) == self.n:
+            self.wsum += self.n * x - self.sum
+            self.sum += x - buf[0]
+        else:
+            self.wsum += (len(buf) + 1) * x
+            self.sum += x
+        buf.append(x)
+        self._pushes += 1
+        if self._pushes >= self.n:
+            self._pushes = 0
+            self.sum = math.fsum(buf)
+            self.wsum = math.fsum(i * v for i, v in enumerate(buf, 1))
+
+    @property
+    def full(self) -> bool:
+        return len(self.buf) == self.n
+
+    def mean(self) -> float:
+        return self.sum / self.n if self.full else _NAN
+
+    def wma(self) -> float:
+        return self.wsum / (self.n * (self.n + 1) / 2) if self.full else _NAN
+
+    def linreg(self) -> float:
+        """pandas_ta linreg 기본값 (x=1..n 회귀선의 m*(n-1)+b)"""
+        if not self.full:
+            return _NAN
+        n = self.n
+        x_sum = 0.5 * n * (n + 1)
+        x2_sum = x_sum * (2 * n + 1) / 3
+        m = (n * self.wsum - x_sum * self.sum) / (n * x2_sum - x_sum * x_sum)
+        b = (self.sum - m * x_sum) / n
+        return m * (n - 1) + b
+
+    def std(self, ddof: int = 1) -> float:
+        if not self.full:
+            return _NAN
+        mean = math.fsum(self.buf) / self.n
+        return math.sqrt(math.fsum((v - mean) ** 2 for v in self.buf) / (self.n - ddof))
+
+    def mad(self) -> float:
+        """평균 절대 편차 (CCI)"""
+        if not self.full:
+            return _NAN
+        mean = math.fsum(self.buf) / self.n
+        return math.fsum(abs(v - mean) for v in self.buf) / self.n
+
+
+class _Extreme:
+    """최근 n개 값의 최댓값(sign=1)/최솟값(sign=-1). 단조 deque, 같은 값이면 먼저 나온 것을 유지"""
+    __slots__ = ("n", "sign", "q", "pos")
+
+    def __init__(self, n: int, sign: int):
+        self.n = n
+        self.sign = sign
+        self.q = deque()
+        self.pos = 0
+
+    def push(self, x: float, tag=None) -> None:
+        if x != x:
+            return
+        self.pos += 1
+        q, key = self.q, self.sign * x
+        while q and self.sign * q[-1][1] < key:
+            q.pop()
+        q.append((self.pos, x, tag))
+        while q[0][0] <= self.pos - self.n:
+            q.popleft()
+
+    @property
+    def full(self) -> bool:
+        return self.pos >= self.n
+
+    def value(self) -> float:
+        return self.q[0][1] if self.full else _NAN
+
+    def tag(self):
+        return self.q[0][2] if self.q else None
+
+
+class _Ema:
+    """
+    pandas_ta ema: 위치 length-1에 처음 length개(NaN 제외) 평균을 두고 ewm(span, adjust=False)
+    sliced=True면 첫 유효값부터 센다 (macd.loc[first_valid_index():]에 대한 ema)
+    """
+    __slots__ = ("n", "alpha", "sliced", "pos", "acc", "cnt", "value")
+
+    def __init__(self, n: int, sliced: bool = False):
+        self.n = n
+        self.alpha = 2.0 / (n + 1)
+        self.sliced = sliced
+        self.pos = 0
+        self.acc = 0.0
+        self.cnt = 0
+        self.value = _NAN
+
+    def push(self, x: float) -> float:
+        valid = x == x
+        if self.sliced and self.pos == 0 and not valid:
+            return _NAN
+        self.pos += 1
+        if self.pos <= self.n:
+            if valid:
+                self.acc += x
+                self.cnt += 1
+            if self.pos == self.n:
+                self.value = self.acc / self.cnt if self.cnt else _NAN
+            return self.value
+        if valid:
+            if self.value != self.value:
+                self.value = x
+            else:
+                self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+
+class _Ewm:
+    """ewm(span, adjust=False): 첫 유효값에서 시작"""
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1)
+        self.value = _NAN
+
+    def push(self, x: float) -> float:
+        if x == x:
+            self.value = x if self.value != self.value else self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+
+class _Rma:
+    """pandas_ta rma = ewm(alpha=1/length, min_periods=length, adjust=True)"""
+    __slots__ = ("n", "decay", "num", "den", "cnt")
+
+    def __init__(self, n: int):
+        self.n = n
+        self.decay = 1.0 - 1.0 / n
+        self.num = 0.0
+        self.den = 0.0
+        self.cnt = 0
+
+    def push(self, x: float) -> float:
+        if x == x:
+            self.num = x + self.decay * self.num
+            self.den = 1.0 + self.decay * self.den
+            self.cnt += 1
+        else:
+            self.num *= self.decay
+            self.den *= self.decay
+        return self.num / self.den if self.cnt >= self.n else _NAN
+
+
+class IndicatorState:
+    """
+    종목 하나의 지표 상태. update()로 봉을 하나씩 넣고 values()로 마지막 행을 읽습니다.
+    """
+    def __init__(self):
+        self.n = 0
+        self.first_ts = None
+        self.last_ts = None
+        self.first_close = _NAN
+        self.prev = None                     # 직전 봉 (open, high, low, close, volume)
+        self.out: Dict[str, float] = {}
+
+        # SMI = 100 * tsi(fast=3, slow=14, scalar=1)
+        self.smi_slow, self.smi_fast = _Ema(14), _Ema(3)
+        self.smi_abs_slow, self.smi_abs_fast = _Ema(14), _Ema(3)
+        self.vol90 = _Window(90)
+        # RSI(14) / StochRSI(14, 14, 3)
+        self.rsi_up, self.rsi_dn = _Rma(14), _Rma(14)
+        self.srsi_lo, self.srsi_hi = _Extreme(14, -1), _Extreme(14, 1)
+        self.srsi_k = _Window(3)
+        # BBands(20, 2) / Squeeze(lazybear)
+        self.close_w = {n: _Window(n) for n in (5, 20, 60, 200)}
+        self.tr20 = _Window(20)
+        self.hh20, self.ll20 = _Extreme(20, 1), _Extreme(20, -1)
+        self.sqz = _Window(20)
+        self.obv = 0.0
+        # MACD(12, 26, 9)
+        self.ema12, self.ema26, self.macd_sig = _Ema(12), _Ema(26), _Ema(9, sliced=True)
+        # CCI(20)
+        self.tp20 = _Window(20)
+        # ATR / ADX (14)
+        self.atr, self.dmp, self.dmn, self.adx = _Rma(14), _Rma(14), _Rma(14), _Rma(14)
+        # 전체 이력 통계
+        self.min_low, self.min_low_ts = math.inf, None
+        self.max_high, self.max_high_ts = -math.inf, None
+        self.close_mean, self.close_m2 = 0.0, 0.0
+        self.high600 = _Extreme(600, 1)
+        # ZLEMA(70) / HMA(60)
+        self.zl_lag = deque(maxlen=35)
+        self.zlema = _Ewm(70)
+        self.wma30, self.wma60, self.wma7 = _Window(30), _Window(60), _Window(7)
+
+    def update(self, ts, open_: float, high: float, low: float, close: float, volume: float) -> None:
+        o, h, l, c, v = float(open_), float(high), float(low), float(close), float(volume)
+        out = self.out
+        first = self.prev is None
+        pc = _NAN if first else self.prev[3]
+        ph = _NAN if first else self.prev[1]
+        pl = _NAN if first else self.prev[2]
+        diff = c - pc
+
+        # SMI
+        fast = self.smi_fast.push(self.smi_slow.push(diff))
+        abs_fast = self.smi_abs_fast.push(self.smi_abs_slow.push(abs(diff)))
+        out["SMI"] = 100 * _div(fast, abs_fast)
+
+        # 거래량
+        self.vol90.push(v)
+        out["avg_volume"] = self.vol90.mean()
+        out["vrate"] = _div(v, out["avg_volume"])
+
+        # RSI / StochRSI
+        up = self.rsi_up.push(max(diff, 0.0) if diff == diff else _NAN)
+        dn = self.rsi_dn.push(min(diff, 0.0) if diff == diff else _NAN)
+        rsi = 100 * _div(up, up + abs(dn))
+        out["RSI"] = rsi
+        self.srsi_lo.push(rsi)
+        self.srsi_hi.push(rsi)
+        lo, hi = self.srsi_lo.value(), self.srsi_hi.value()
+        self.srsi_k.push(0.0 if hi == lo else 100 * (rsi - lo) / (hi - lo))
+        out["Stoch_RSI"] = self.srsi_k.mean()
+
+        # 이동평균 / BBands
+        for n, w in self.close_w.items():
+            w.push(c)
+            out[f"mapct_{n}"] = (w.mean() - c) / c
+        w20 = self.close_w[20]
+        mid, sd = w20.mean(), w20.std(ddof=0)
+        lower, upper = mid - 2 * sd, mid + 2 * sd
+        out["BB_lower_pct"] = (lower - c) / c
+        out["BB_mid"] = mid
+        out["BB_upper_pct"] = (upper - c) / c
+        out["BB_length"] = _div(upper - lower, lower)
+
+        # True Range / Squeeze (lazybear, KC는 SMA + TR)
+        tr = _NAN if first else max(h - l, abs(h - pc), abs(pc - l))
+        self.tr20.push(tr)
+        band = self.tr20.mean()
+        low_kc, up_kc = mid - 1.5 * band, mid + 1.5 * band
+        self.hh20.push(h)
+        self.ll20.push(l)
+        self.sqz.push(c - (0.25 * (self.hh20.value() + self.ll20.value()) + 0.5 * mid))
+        out["SQZ_VAL"] = self.sqz.linreg()
+        out["SQZ_ON"] = int(lower > low_kc and upper < up_kc)
+
+        # OBV
+        self.obv += v if first else (v if diff > 0 else -v if diff < 0 else 0.0)
+        out["OBV"] = self.obv
+
+        # MACD
+        macd = self.ema12.push(c) - self.ema26.push(c)
+        signal = self.macd_sig.push(macd)
+        out["MACD"], out["MACDh"], out["MACDs"] = macd, macd - signal, signal
+
+        # CCI
+        tp = (h + l + c) / 3
+        self.tp20.push(tp)
+        out["CCI"] = _div(tp - self.tp20.mean(), 0.015 * self.tp20.mad())
+
+        # 봉 비율
+        out["COR"] = (h - o) / o
+        out["LOR"] = (l - o) / o
+        out["HOR"] = (h - o) / o
+        out["LCR"] = (l - c) / c
+        out["HCR"] = (h - c) / c
+        out["HLR"] = (h - l) / l
+
+        # ATR / ADX
+        atr = self.atr.push(tr)
+        up_move, dn_move = h - ph, pl - l
+        if first:
+            pos = neg = _NAN
+        else:
+            pos = up_move if (up_move > dn_move and up_move > 0) else 0.0
+            neg = dn_move if (dn_move > up_move and dn_move > 0) else 0.0
+        k = _div(100.0, atr)
+        dmp, dmn = k * self.dmp.push(pos), k * self.dmn.push(neg)
+        out["ADX"] = self.adx.push(100 * _div(abs(dmp - dmn), dmp + dmn))
+        out["ATR"] = atr
+
+        # 전체 이력 (최저가/최고가 날짜, 종가 표준편차, 첫 종가 대비 수익률)
+        if first:
+            self.first_ts, self.first_close = ts, c
+        if l < self.min_low:
+            self.min_low, self.min_low_ts = l, ts
+        if h > self.max_high:
+            self.max_high, self.max_high_ts = h, ts
+        self.n += 1
+        delta = c - self.close_mean
+        self.close_mean += delta / self.n
+        self.close_m2 += delta * (c - self.close_mean)
+        self.high600.push(h, ts)
+
+        # ZLEMA / HMA baseline
+        self.zl_lag.append(c)
+        lagged = self.zl_lag[0] if len(self.zl_lag) == self.zl_lag.maxlen else _NAN
+        out["zlema"] = self.zlema.push(c + (c - lagged))
+        self.wma30.push(c)
+        self.wma60.push(c)
+        self.wma7.push(2 * self.wma30.wma() - self.wma60.wma())
+        out["baseline"] = self.wma7.wma()
+
+        self.prev = (o, h, l, c, v)
+        self.last_ts = ts
+
+    def values(self, today: Optional[datetime] = None) -> Dict[str, float]:
+        """마지막 행 지표값 (days_since_max_high는 today 기준, 기본 오늘)"""
+        if self.prev is None:
+            return {name: _NAN for name in INDICATOR_COLUMNS}
+        out = dict(self.out)
+        last = pd.Timestamp(self.last_ts)
+        out["recover_days"] = (last - pd.Timestamp(self.min_low_ts)).days
+        out["correct_days"] = (last - pd.Timestamp(self.max_high_ts)).days
+        out["minmaxgap"] = (self.max_high - self.min_low) / self.min_low
+        out["close_std"] = math.sqrt(self.close_m2 / (self.n - 1)) if self.n > 1 else _NAN
+        out["profit_600"] = (self.prev[3] - self.first_close) / self.first_close
+        today = pd.Timestamp(datetime.today().strftime("%Y-%m-%d") if today is None else today)
+        out["days_since_max_high"] = (today - pd.Timestamp(self.high600.tag())).days
+        return {name: out[name] for name in INDICATOR_COLUMNS}
+
+
+class IndicatorEngine:
+    """
+    engine = IndicatorEngine.open()             # 저장된 상태 불러오기 (없으면 빈 엔진)
+    row = engine.frame("005930.KS", df)         # 새 봉만 반영한 1행 DataFrame (filter1/filter2 입력)
+    engine.save()
+    - df: 날짜 인덱스 + open/high/low/close/volume 열 (compute_indicators 입력과 같음)
+    - 저장된 마지막 봉이 df에 없거나 값이 바뀌었으면 그 종목은 df 전체로 다시 만듭니다
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or INDICATOR_STATE_PATH
+        self.states: Dict[str, IndicatorState] = {}
+        self.stats = {"bars": 0, "rebuilds": 0}
+
+    @classmethod
+    def open(cls, path: Optional[str] = None) -> "IndicatorEngine":
+        engine = cls(path)
+        engine.load()
+        return engine
+
+    def load(self) -> int:
+        """저장된 상태 불러오기. 반환: 종목 수 (파일이 없거나 버전이 다르면 0)"""
+        if not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, "rb") as f:
+                saved = pickle.load(f)
+        except Exception as e:
+            print(f"[INDICATOR] 상태 파일을 읽지 못해 새로 계산합니다: {e}")
+            return 0
+        if saved.get("version") != STATE_VERSION:
+            return 0
+        self.states = saved["states"]
+        return len(self.states)
+
+    def save(self) -> None:
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"version": STATE_VERSION, "states": self.states}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+
+    def update(self, code: str, ts, open_: float, high: float, low: float, close: float,
+               volume: float) -> IndicatorState:
+        """봉 하나 반영 (O(1)). 이미 반영한 시각 이하의 봉은 무시"""
+        state = self.states.get(code)
+        if state is None:
+            state = self.states[code] = IndicatorState()
+        if state.last_ts is None or ts > state.last_ts:
+            state.update(ts, open_, high, low, close, volume)
+            self.stats["bars"] += 1
+        return state
+
+    def advance(self, code: str, df: pd.DataFrame) -> int:
+        """df에서 아직 반영하지 않은 봉만 넣음. 반환: 반영한 봉 수"""
+        state = self.states.get(code)
+        if state is not None and not self._continues(state, df):
+            del self.states[code]
+            self.stats["rebuilds"] += 1
+            state = None
+        new = df if state is None else df[df.index > state.last_ts]
+        cols = [new[c].to_numpy(dtype=np.float64) for c in ("open", "high", "low", "close", "volume")]
+        for ts, o, h, l, c, v in zip(new.index, *cols):
+            self.update(code, ts, o, h, l, c, v)
+        return len(new)
+
+    @staticmethod
+    def _continues(state: IndicatorState, df: pd.DataFrame) -> bool:
+        if state.last_ts not in df.index:
+            return False
+        last = df.loc[state.last_ts]
+        if isinstance(last, pd.DataFrame):
+            return False
+        return tuple(float(last[c]) for c in ("open", "high", "low", "close", "volume")) == state.prev
+
+    def values(self, code: str, today: Optional[datetime] = None) -> Dict[str, float]:
+        state = self.states.get(code)
+        return state.values(today) if state is not None else {name: _NAN for name in INDICATOR_COLUMNS}
+
+    def frame(self, code: str, df: pd.DataFrame, today: Optional[datetime] = None) -> pd.DataFrame:
+        """df의 마지막 행에 지표 열을 붙인 1행 DataFrame (.iloc[-1]만 읽는 필터용)"""
+        self.advance(code, df)
+        values = self.values(code, today)
+        last = df.iloc[[-1]]
+        keep = [c for c in last.columns if c not in values]
+        return pd.concat([last[keep], pd.DataFrame([values], index=last.index)], axis=1)
+
+    def frames(self, data: Dict[str, pd.DataFrame], today: Optional[datetime] = None) -> Dict[str, pd.DataFrame]:
+        return {code: self.frame(code, df, today) for code, df in data.items()}
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.states
+
+    def codes(self) -> Iterable[str]:
+        return list(self.states)
@@ -0,0 +1,345 @@
+from datetime import datetime
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from trading.indicator_engine import INDICATOR_COLUMNS
+from trading.indicators import _wma
+
+# ---------------------------------------------------------------------
+# 전 종목 지표 패널 (dates × tickers 2차원 배열로 한 번에 계산)
+# ---------------------------------------------------------------------
+# compute_indicators를 종목마다 부르는 대신 open/high/low/close/volume을
+# (날짜, 종목) 2차원 배열로 받아 모든 지표를 열 방향 벡터 연산 몇 번으로 계산합니다.
+# 계산식은 compute_indicators / IndicatorEngine과 같음 (pandas_ta 0.3.14b 기본값).
+#
+# 종목마다 상장일/거래정지일이 달라 같은 날짜 축에 놓으면 중간에 빈 칸이 생기므로,
+# 계산 전에 종목별로 봉이 있는 행만 아래쪽으로 모으고(앞쪽은 NaN 패딩) 계산 후 원래 날짜 위치로 되돌립니다.
+# 따라서 각 칸의 값은 그 종목의 봉만으로 compute_indicators를 돌린 결과와 같습니다.
+
+PANEL_FIELDS = ("open", "high", "low", "close", "volume")
+
+_DAY = np.timedelta64(1, "D")
+
+
+def _window_dot(x: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """길이 len(weights) 창마다 가중합 (오래된 값부터). 앞 n-1행과 창 안에 NaN이 있는 곳은 NaN"""
+    n = len(weights)
+    out = np.full(x.shape, np.nan)
+    if len(x) >= n:
+        out[n - 1:] = sliding_window_view(x, n, axis=0) @ weights
+    return out
+
+
+def _rolling_mean(x: np.ndarray, n: int) -> np.ndarray:
+    """rolling(n).mean() (min_periods=n)"""
+    return _window_dot(x, np.ones(n)) / n
+
+
+def _rolling_dev(x: np.ndarray, n: int, mean: np.ndarray, power: int) -> np.ndarray:
+    """창 평균에서의 편차 |x-mean|**power 의 창 평균 (power=2: 분산 ddof=0, power=1: 평균절대편차)"""
+    out = np.full(x.shape, np.nan)
+    if len(x) < n:
+        return out
+    m = mean[n - 1:]
+    acc, d = np.zeros_like(m), np.empty_like(m)
+    for j in range(n):
+        np.subtract(x[j:len(x) - n + 1 + j], m, out=d)
+        if power == 2:
+            np.multiply(d, d, out=d)
+        else:
+            np.abs(d, out=d)
+        acc += d
+    out[n - 1:] = acc / n
+    return out
+
+
+def _rolling_extreme(x: np.ndarray, n: int, fn) -> np.ndarray:
+    """rolling(n).min()/max() (fn=np.minimum/np.maximum). 2의 거듭제곱 창을 겹쳐 log2(n)번에 계산"""
+    out = np.full(x.shape, np.nan)
+    if len(x) < n:
+        return out
+    m, width = x, 1
+    while width * 2 <= n:
+        m = fn(m[:-width], m[width:]) if width < len(m) else m[:0]
+        width *= 2
+    # m[i]는 x[i:i+width]의 극값 → 창 [i, i+n) = [i, i+width) ∪ [i+n-width, i+n)
+    k = len(x) - n + 1
+    out[n - 1:] = fn(m[:k], m[n - width:n - width + k])
+    return out
+
+
+def _shift(x: np.ndarray, k: int = 1) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    out[k:] = x[:-k]
+    return out
+
+
+def _ewm(x: np.ndarray, alpha: float, adjust: bool, min_periods: int = 0) -> np.ndarray:
+    """
+    DataFrame.ewm(alpha=alpha, adjust=adjust, min_periods=min_periods).mean()과 같은 값을
+    행 방향 재귀 한 번으로 계산 (열은 벡터 연산). NaN 처리도 pandas(ignore_na=False)와 같음
+    """
+    out = np.empty_like(x)
+    if len(x) == 0:
+        return out
+    minp = max(min_periods, 1)
+    factor, new_wt = 1.0 - alpha, (1.0 if adjust else alpha)
+    weighted = x[0].copy()
+    nobs = (~np.isnan(weighted)).astype(np.int64)
+    old_wt = np.ones(x.shape[1:])
+    out[0] = np.where(nobs >= minp, weighted, np.nan)
+    for i in range(1, len(x)):
+        cur = x[i]
+        obs = ~np.isnan(cur)
+        nobs += obs
+        has = ~np.isnan(weighted)
+        old_wt = np.where(has, old_wt * factor, old_wt)
+        upd = has & obs
+        mixed = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+        weighted = np.where(has, np.where(upd & (weighted != cur), mixed, weighted), cur)
+        old_wt = np.where(upd, old_wt + new_wt if adjust else 1.0, old_wt)
+        out[i] = np.where(nobs >= minp, weighted, np.nan)
+    return out
+
+
+def _rma(x: np.ndarray, n: int) -> np.ndarray:
+    """pandas_ta rma: ewm(alpha=1/n, min_periods=n) — 열마다 첫 유효값부터 시작"""
+    return _ewm(x, 1 / n, adjust=True, min_periods=n)
+
+
+def _ema(x: np.ndarray, n: int, start: np.ndarray) -> np.ndarray:
+    """
+    pandas_ta ema(sma=True, adjust=False)를 열마다 적용.
+    start[j]는 열 j 시계열의 시작 행: x[start:start+n]의 평균(NaN 제외)을 start+n-1 행에 넣고
+    그 앞은 NaN으로 비운 뒤 ewm(span=n, adjust=False)
+    """
+    rows = np.arange(len(x))[:, None]
+    seed_row = start + n - 1
+    in_seed = (rows >= start) & (rows <= seed_row) & ~np.isnan(x)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        seed = np.where(in_seed, x, 0.0).sum(axis=0) / in_seed.sum(axis=0)
+    y = np.where(rows < seed_row, np.nan, x)
+    cols = np.flatnonzero(seed_row < len(x))
+    y[seed_row[cols], cols] = seed[cols]
+    return _ewm(y, 2 / (n + 1), adjust=False)
+
+
+def _linreg(x: np.ndarray, n: int) -> np.ndarray:
+    """pandas_ta linreg(length=n): x=1..n 회귀선의 m*(n-1)+b"""
+    x_sum = 0.5 * n * (n + 1)
+    x2_sum = x_sum * (2 * n + 1) / 3
+    divisor = n * x2_sum - x_sum * x_sum
+    y_sum, xy_sum = _window_dot(x, np.ones(n)), _window_dot(x, np.arange(1.0, n + 1))
+    m = (n * xy_sum - x_sum * y_sum) / divisor
+    b = (y_sum * x2_sum - x_sum * xy_sum) / divisor
+    return m * (n - 1) + b
+
+
+def _compute(o, h, l, c, v, dates, start: np.ndarray, today) -> Dict[str, np.ndarray]:
+    """봉을 아래쪽으로 모은 패널(앞쪽 NaN 패딩)로 지표 계산"""
+    n_rows, n_cols = c.shape
+    out: Dict[str, np.ndarray] = {}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pc, diff = _shift(c), c - _shift(c)
+
+        # SMI = 100 * tsi(fast=3, slow=14)
+        fast = _ema(_ema(diff, 14, start), 3, start)
+        abs_fast = _ema(_ema(np.abs(diff), 14, start), 3, start)
+        out["SMI"] = 100 * fast / abs_fast
+
+        out["avg_volume"] = _rolling_mean(v, 90)
+        out["vrate"] = v / out["avg_volume"]
+
+        # RSI / StochRSI
+        up, dn = _rma(np.where(diff > 0, diff, diff * 0), 14), _rma(np.where(diff < 0, diff, diff * 0), 14)
+        rsi = 100 * up / (up + np.abs(dn))
+        lo, hi = _rolling_extreme(rsi, 14, np.minimum), _rolling_extreme(rsi, 14, np.maximum)
+        stoch = np.where(hi == lo, 0.0, 100 * (rsi - lo) / (hi - lo))
+        out["Stoch_RSI"] = _rolling_mean(stoch, 3)
+        out["RSI"] = rsi
+
+        # 이동평균 / BBands
+        for n in (5, 20, 60, 200):
+            out[f"mapct_{n}"] = (_rolling_mean(c, n) - c) / c
+        mid = _rolling_mean(c, 20)
+        sd = np.sqrt(_rolling_dev(c, 20, mid, 2))
+        lower, upper = mid - 2 * sd, mid + 2 * sd
+        out["BB_lower_pct"] = (lower - c) / c
+        out["BB_mid"] = mid
+        out["BB_upper_pct"] = (upper - c) / c
+        out["BB_length"] = (upper - lower) / lower
+
+        # True Range / Squeeze (lazybear)
+        tr = np.maximum(np.maximum(np.abs(h - l), np.abs(h - pc)), np.abs(pc - l))
+        band = _rolling_mean(tr, 20)
+        hh, ll = _rolling_extreme(h, 20, np.maximum), _rolling_extreme(l, 20, np.minimum)
+        out["SQZ_VAL"] = _linreg(c - (0.25 * (hh + ll) + 0.5 * mid), 20)
+        out["SQZ_ON"] = ((lower > mid - 1.5 * band) & (upper < mid + 1.5 * band)).astype(np.float64)
+
+        # OBV (첫 봉은 +volume)
+        sign = np.where(np.isnan(diff), 1.0, np.sign(diff))
+        signed = sign * v
+        out["OBV"] = np.where(np.isnan(signed), np.nan, np.nancumsum(signed, axis=0))
+
+        # MACD (signal은 MACD 첫 유효 행부터 시작하는 EMA)
+        macd = _ema(c, 12, start) - _ema(c, 26, start)
+        macd_start = np.where(np.isnan(macd).all(axis=0), n_rows, np.argmax(~np.isnan(macd), axis=0))
+        signal = _ema(macd, 9, macd_start)
+        out["MACD"], out["MACDh"], out["MACDs"] = macd, macd - signal, signal
+
+        # CCI
+        tp = (h + l + c) / 3
+        tp_mean = _rolling_mean(tp, 20)
+        out["CCI"] = (tp - tp_mean) / (0.015 * _rolling_dev(tp, 20, tp_mean, 1))
+
+        # 봉 비율
+        out["COR"] = (h - o) / o
+        out["LOR"] = (l - o) / o
+        out["HOR"] = (h - o) / o
+        out["LCR"] = (l - c) / c
+        out["HCR"] = (h - c) / c
+        out["HLR"] = (h - l) / l
+
+        # ATR / ADX
+        atr = _rma(tr, 14)
+        up_move, dn_move = h - _shift(h), _shift(l) - l
+        pos = np.where((up_move > dn_move) & (up_move > 0), up_move, up_move * 0)
+        neg = np.where((dn_move > up_move) & (dn_move > 0), dn_move, dn_move * 0)
+        dmp, dmn = 100 / atr * _rma(pos, 14), 100 / atr * _rma(neg, 14)
+        out["ADX"] = _rma(100 * np.abs(dmp - dmn) / (dmp + dmn), 14)
+        out["ATR"] = atr
+
+        # 전체 이력 값 (종목당 1개, 행 방향으로 같은 값)
+        cols = np.arange(n_cols)
+        has = start < n_rows
+        first = np.minimum(start, n_rows - 1)
+        last_date = dates[-1]
+        low_at = np.argmin(np.where(np.isnan(l), np.inf, l), axis=0)
+        high_at = np.argmax(np.where(np.isnan(h), -np.inf, h), axis=0)
+        hist = {
+            "recover_days": (last_date - dates[low_at, cols]) // _DAY,
+            "correct_days": (last_date - dates[high_at, cols]) // _DAY,
+        }
+        max_high, min_low = np.nanmax(np.where(has, h, 0.0), axis=0), np.nanmin(np.where(has, l, 0.0), axis=0)
+        hist["minmaxgap"] = (max_high - min_low) / min_low
+        count = n_rows - start
+        mean = np.nansum(c, axis=0) / count
+        hist["close_std"] = np.sqrt(np.nansum((c - mean) ** 2, axis=0) / (count - 1))
+        hist["profit_600"] = (c[-1] - c[first, cols]) / c[first, cols]
+        recent = max(n_rows - 600, 0)
+        high600_at = recent + np.argmax(np.where(np.isnan(h[recent:]), -np.inf, h[recent:]), axis=0)
+        hist["days_since_max_high"] = (today - dates[high600_at, cols]) // _DAY
+        for name, vec in hist.items():
+            vec = np.where(has & (count > (1 if name == "close_std" else 0)), vec.astype(np.float64), np.nan)
+            out[name] = np.broadcast_to(vec, (n_rows, n_cols))
+
+        # ZLEMA(70) / HMA(60) baseline
+        zl = c + (c - _shift(c, 34))
+        out["zlema"] = _ewm(zl, 2 / 71, adjust=False)
+        out["baseline"] = _wma(2 * _wma(c, 30) - _wma(c, 60), 7)
+    return out
+
+
+class IndicatorPanel:
+    """
+    panel = IndicatorPanel(dates, codes, open_, high, low, close, volume)   # 각 배열 shape (len(dates), len(codes))
+    panel["RSI"]          # dates × codes 2차원 배열 (그 날 봉이 없는 칸은 NaN)
+    panel.latest()        # 종목별 마지막 봉의 OHLCV + 지표 (index=code, filter1/filter2 입력 행)
+    - 빈 칸(상장 전/거래정지)은 NaN. 봉이 있는 칸은 해당 종목 봉만으로 compute_indicators를 돌린 값과 같음
+    - today: days_since_max_high 기준일 (기본 오늘)
+    """
+    __slots__ = ("dates", "codes", "valid", "_order", "_values", "_bars", "_last_dates")
+
+    def __init__(self, dates, codes: Sequence[str], open_, high, low, close, volume,
+                 today: Optional[datetime] = None):
+        self.dates = pd.DatetimeIndex(np.asarray(dates), name="date")
+        self.codes = list(codes)
+        fields = [np.asarray(a, dtype=np.float64) for a in (open_, high, low, close, volume)]
+        shape = (len(self.dates), len(self.codes))
+        for name, a in zip(PANEL_FIELDS, fields):
+            if a.shape != shape:
+                raise ValueError(f"{name} shape {a.shape} != (dates, codes) {shape}")
+
+        # 종목별로 봉이 있는 행을 아래쪽으로 모음 (안정 정렬이라 날짜 순서 유지)
+        self.valid = ~np.isnan(fields[3])
+        self._order = np.argsort(self.valid, axis=0, kind="stable")
+        o, h, l, c, v = (np.take_along_axis(a, self._order, axis=0) for a in fields)
+        packed_dates = self.dates.to_numpy()[self._order]
+        pad = ~np.take_along_axis(self.valid, self._order, axis=0)
+        start = pad.sum(axis=0)
+
+        today = pd.Timestamp(datetime.today().strftime("%Y-%m-%d") if today is None else today)
+        if c.size:
+            values = _compute(o, h, l, c, v, packed_dates, start, today.to_datetime64())
+        else:
+            values = {name: np.empty(shape) for name in INDICATOR_COLUMNS}
+        for name in INDICATOR_COLUMNS:
+            values[name] = np.where(pad, np.nan, values[name])
+        self._values = values
+        self._bars = dict(zip(PANEL_FIELDS, (o, h, l, c, v)))
+        self._last_dates = np.full(len(self.codes), np.datetime64("NaT"), dtype=packed_dates.dtype)
+        if len(self.dates):
+            self._last_dates[start < len(self.dates)] = packed_dates[-1][start < len(self.dates)]
+
+    @classmethod
+    def from_frames(cls, data: Dict[str, pd.DataFrame], today: Optional[datetime] = None) -> "IndicatorPanel":
+        """
+        {'005930.KS': df, ...} → 패널. df는 'date' 열(20240814 정수/문자/datetime) 또는 날짜 인덱스 +
+        open/high/low/close/volume 열 (analyze_stocks 입력과 같음)
+        """
+        frames = {code: _with_date_index(df)[list(PANEL_FIELDS)] for code, df in data.items() if len(df)}
+        if not frames:
+            empty = np.empty((0, 0))
+            return cls([], [], empty, empty, empty, empty, empty, today=today)
+        long = pd.concat(frames, names=["code", "date"])
+        code_idx, codes = pd.factorize(long.index.get_level_values(0))
+        date_idx, dates = pd.factorize(long.index.get_level_values(1), sort=True)
+        values = np.full((len(PANEL_FIELDS), len(dates), len(codes)), np.nan)
+        values[:, date_idx, code_idx] = long.to_numpy(dtype=np.float64, na_value=np.nan).T
+        return cls(dates, codes, *values, today=today)
+
+    @classmethod
+    def from_store(cls, store, codes=None, start: Optional[str] = None, end: Optional[str] = None,
+                   today: Optional[datetime] = None) -> "IndicatorPanel":
+        """db.candle_store.CandleStore에서 바로 (전 종목이면 codes=None)"""
+        dates, code_list, values = store.load_array(codes, start, end, fields=PANEL_FIELDS)
+        return cls(pd.to_datetime(dates), code_list, *values, today=today)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """지표(또는 OHLCV) 하나를 dates × codes 배열로 (원래 날짜 위치)"""
+        packed = self._values[name] if name in self._values else self._bars[name]
+        out = np.empty(packed.shape)
+        np.put_along_axis(out, self._order, packed, axis=0)
+        return out
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._values or name in self._bars
+
+    def frame(self, name: str) -> pd.DataFrame:
+        return pd.DataFrame(self[name], index=self.dates, columns=self.codes)
+
+    def latest(self) -> pd.DataFrame:
+        """종목별 마지막 봉 행 (index=code, 열: date + OHLCV + INDICATOR_COLUMNS). 봉이 없는 종목은 제외"""
+        data = {"date": self._last_dates}
+        data.update((name, self._last(a)) for name, a in self._bars.items())
+        data.update((name, self._last(self._values[name])) for name in INDICATOR_COLUMNS)
+        df = pd.DataFrame(data, index=pd.Index(self.codes, name="code"))
+        return df[df["date"].notna()]
+
+    def _last(self, a: np.ndarray) -> np.ndarray:
+        return a[-1] if len(a) else np.full(len(self.codes), np.nan)
+
+
+def _with_date_index(df: pd.DataFrame) -> pd.DataFrame:
+    """'date' 열이 있으면 datetime 인덱스로 (analyze_stocks의 날짜 변환과 같은 규칙)"""
+    if "date" not in df.columns:
+        return df
+    date = df["date"]
+    if pd.api.types.is_numeric_dtype(date):
+        date = pd.to_datetime(date.astype(int), format="%Y%m%d")
+    else:
+        date = pd.to_datetime(date)
+    return df.set_index(date.rename("date"))
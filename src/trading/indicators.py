@@ -1,97 +1,252 @@
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import pandas_ta as ta
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime
-# -------------------- Helper Functions -------------------- #
-
-def compute_indicators(df: pd.DataFrame):
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 선택 의존성: 지표 계산(pandas_ta)과 차트(plotly)를 쓰는 함수에서만 필요
+try:
+    import pandas_ta as ta  # df.ta accessor 등록
+except ImportError:
+    ta = None
+try:
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+except ImportError:
+    go = make_subplots = None
+# -------------------- Feature Registry -------------------- #
+# compute_indicators의 지표를 이름 있는 계산 단계로 등록합니다.
+# 단계마다 만드는 열(columns)과 먼저 있어야 하는 열(requires)을 선언하고,
+# compute_indicators(df, features=[...])는 요청한 열과 그 의존 단계만 계산합니다.
+
+class Feature:
+    """
+    계산 단계 하나: fn(df)가 df에 columns 열을 추가 (requires 열을 읽음)
+    dated: 캔들 외에 기준일(오늘)에도 값이 달라지는 단계 → 지표 캐시에 저장하지 않음
+    """
+    __slots__ = ("name", "columns", "requires", "fn", "dated")
+
+    def __init__(self, name: str, columns: Tuple[str, ...], requires: Tuple[str, ...], fn: Callable,
+                 dated: bool = False):
+        self.name = name
+        self.columns = columns
+        self.requires = requires
+        self.fn = fn
+        self.dated = dated
+
+
+INDICATOR_VERSION = 1                   # 계산식이 바뀌면 올림 (trading.indicator_cache 키에 포함)
+FEATURES: Dict[str, Feature] = {}       # 단계 이름 → Feature (등록 순서 = 계산 순서)
+FEATURE_COLUMNS: Dict[str, str] = {}    # 출력 열 → 단계 이름
+
+
+def register_feature(name: str, columns: Optional[Sequence[str]] = None, requires: Sequence[str] = (),
+                     dated: bool = False):
+    """
+    데코레이터: fn(df)를 name 단계로 등록 (columns 기본값은 (name,)).
+    requires는 이미 등록된 열이어야 함 → 등록 순서대로 계산하면 의존 순서가 맞음
+    dated=True: 오늘 날짜를 읽는 단계 (Feature.dated 참고)
+    """
+    def decorator(fn):
+        cols = tuple(columns or (name,))
+        for col in cols:
+            if FEATURE_COLUMNS.get(col, name) != name:
+                raise ValueError(f"{col} 열은 이미 {FEATURE_COLUMNS[col]} 단계에 등록됨")
+        for req in requires:
+            if req not in FEATURE_COLUMNS:
+                raise ValueError(f"{name}: 등록되지 않은 의존 열 {req}")
+        FEATURES[name] = Feature(name, cols, tuple(requires), fn, dated)
+        FEATURE_COLUMNS.update(dict.fromkeys(cols, name))
+        return fn
+    return decorator
+
+
+def resolve_features(names: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    요청한 열(또는 단계 이름)에 필요한 단계 목록 (의존 단계 포함, 계산 순서).
+    names=None이면 전체. 등록되지 않은 이름(close, 펀더멘털 열 등)은 무시
+    """
+    if names is None:
+        return list(FEATURES)
+    stack = [FEATURE_COLUMNS.get(n, n) for n in names if n in FEATURE_COLUMNS or n in FEATURES]
+    needed = set()
+    while stack:
+        step = stack.pop()
+        if step not in needed:
+            needed.add(step)
+            stack.extend(FEATURE_COLUMNS[r] for r in FEATURES[step].requires)
+    return [step for step in FEATURES if step in needed]
+
+
+# strategy / analysis의 filter1 + filter2가 읽는 열 (DIV/DPS는 펀더멘털 머지 열이라 지표 계산에서는 무시됨)
+FILTER_FEATURES = {
+    'KQ': ('COR', 'vrate', 'LOR', 'HOR', 'ADX', 'HCR', 'HLR', 'LCR', 'mapct_20', 'mapct_200'),
+    'KS': ('COR', 'vrate', 'HOR', 'HCR', 'mapct_20', 'mapct_60', 'RSI', 'CCI', 'SMI', 'OBV',
+           'DIV', 'DPS', 'correct_days', 'recover_days', 'days_since_max_high'),
+}
+
+
+def required_features(config: dict, market: str = 'KS') -> List[str]:
+    """filtering + filter3(config['features'])에 필요한 열 → compute_indicators(features=...)"""
+    names = list(FILTER_FEATURES['KQ' if market == 'KQ' else 'KS'])
+    return names + [n for n in config.get('features', []) if n not in names]
+
+
+def compute_indicators(df: pd.DataFrame, features: Optional[Iterable[str]] = None):
     """
     df에는 최소한 'open', 'high', 'low', 'close', 'volume' 컬럼이 있다고 가정.
     원하는 인디케이터를 df에 컬럼으로 추가한 뒤 df를 return
+    features: 필요한 열 이름 목록 (예: 필터가 읽는 열). None이면 전체 계산
+    (마지막 행만 필요하면 trading.indicator_engine.IndicatorEngine 사용)
     """
+    for name in resolve_features(features):
+        FEATURES[name].fn(df)
+    return df
+
+
+def _ta():
+    if ta is None:
+        raise ImportError("이 지표에는 pandas_ta가 필요합니다.")
+    return ta
+
 
-    # SMI (Stochastic Momentum Index) 예시
-    # pandas_ta의 smi 함수(이름이 stoch는 여러가지 옵션이 있음)를 사용할 수 있습니다.
-    # pandas_ta.stoch() => slow_k, slow_d 가 리턴됨. smi는 별도 구현이나 stoch() 변형 사용 가능.
-    # 여기서는 'stoch'를 사용한 근사 예시
-    # stoch_df = ta.stoch(df['high'], df['low'], df['close'], k=10, d=3, smooth_k=3)
-    stoch_df = ta.smi(df['close'], fast=3, slow=14, signal=3) * 100
-    # stoch_df.columns => ['STOCHk_14_3_3', 'STOCHd_14_3_3']
-    # 예시로 그냥 k값을 SMI로 가정 (실제 공식과 다를 수 있습니다)
-    df['SMI'] = stoch_df.iloc[:, 0]
+@register_feature("SMI")
+def _smi(df):
+    # pandas_ta.smi(fast=3, slow=14, signal=3)의 첫 열(SMI) × 100
+    df['SMI'] = (_ta().smi(df['close'], fast=3, slow=14, signal=3) * 100).iloc[:, 0]
 
+
+@register_feature("avg_volume")
+def _avg_volume(df):
     df['avg_volume'] = df['volume'].rolling(window=90).mean()
+
+
+@register_feature("vrate", requires=("avg_volume",))
+def _vrate(df):
     df['vrate'] = df['volume'] / df['avg_volume']
 
-    # Stoch RSI
-    # pandas_ta에 stochrsi() 함수가 있습니다
-    stochrsi_df = ta.stochrsi(df['close'], length=14, rsi_length=14, k=3, d=3)
-    # stochrsi_df.columns => 
-    # ['STOCHRSIk_14_14_3_3', 'STOCHRSId_14_14_3_3']
-    # 편의상 k 값을 그대로 사용
-    df['Stoch_RSI'] = stochrsi_df.iloc[:, 0]
 
+@register_feature("Stoch_RSI")
+def _stoch_rsi(df):
+    # stochrsi 결과 ['STOCHRSIk_14_14_3_3', 'STOCHRSId_14_14_3_3'] 중 k 값
+    df['Stoch_RSI'] = _ta().stochrsi(df['close'], length=14, rsi_length=14, k=3, d=3).iloc[:, 0]
+
+
+@register_feature("bbands", columns=("BB_lower_pct", "BB_mid", "BB_upper_pct", "BB_length"))
+def _bbands(df):
+    _ta()
     boll = df.ta.bbands(length=20, std=2)
-    df['BB_lower_pct'] = (boll[f'BBL_20_2.0'] - df['close']) / df['close']
-    df['BB_mid'] = boll[f'BBM_20_2.0']
-    df['BB_upper_pct'] = (boll[f'BBU_20_2.0'] - df['close']) / df['close']
-    df['BB_length'] = (boll[f'BBU_20_2.0'] - boll[f'BBL_20_2.0']) / boll[f'BBL_20_2.0']
-
-    # BB(볼린저 밴드), SQZMOM(스퀴즈 모멘텀) 등은
-    # df.ta.bbands(), df.ta.squeeze() 등을 사용하시면 됩니다.
-    # 예: boll = df.ta.bbands(length=20, std=2)
-    #     sqz = df.ta.squeeze(lazybear=True)
-    # df['SQZ_ON']  = sqz_df['SQZ_ON']
-    # df['SQZ_OFF'] = sqz_df['SQZ_OFF']
-    # df['SQZ_NO']  = sqz_df['SQZ_NO']
+    df['BB_lower_pct'] = (boll['BBL_20_2.0'] - df['close']) / df['close']
+    df['BB_mid'] = boll['BBM_20_2.0']
+    df['BB_upper_pct'] = (boll['BBU_20_2.0'] - df['close']) / df['close']
+    df['BB_length'] = (boll['BBU_20_2.0'] - boll['BBL_20_2.0']) / boll['BBL_20_2.0']
+
 
+@register_feature("squeeze", columns=("SQZ_VAL", "SQZ_ON"))
+def _squeeze(df):
+    _ta()
     sqz_df = df.ta.squeeze(lazybear=True, detailed=True)
     df['SQZ_VAL'] = sqz_df['SQZ_20_2.0_20_1.5_LB']
     df['SQZ_ON'] = sqz_df['SQZ_ON']
-    # df['OBV'] = MinMaxScaler().fit_transform(ta.obv(df['close'], df['volume']).values.reshape(-1, 1))
-    df['OBV'] = ta.obv(df['close'], df['volume'])
 
-    for i in [5, 20, 60, 200]:
-        df[f'mapct_{i}'] = (df['close'].rolling(i).mean() - df['close']) / df['close']
 
-    # (A) RSI(상대강도지수) - length=14가 기본
-    df['RSI'] = ta.rsi(df['close'], length=14)
+@register_feature("OBV")
+def _obv(df):
+    df['OBV'] = _ta().obv(df['close'], df['volume'])
 
-    # (B) MACD - 기본 파라미터 fast=12, slow=26, signal=9
+
+def _mapct(df, length: int):
+    df[f'mapct_{length}'] = (df['close'].rolling(length).mean() - df['close']) / df['close']
+
+
+for _length in (5, 20, 60, 200):
+    register_feature(f"mapct_{_length}")(partial(_mapct, length=_length))
+
+
+@register_feature("RSI")
+def _rsi(df):
+    df['RSI'] = _ta().rsi(df['close'], length=14)
+
+
+@register_feature("macd", columns=("MACD", "MACDh", "MACDs"))
+def _macd(df):
+    _ta()
     macd_df = df.ta.macd(fast=12, slow=26, signal=9)
-    # macd_df.columns => ['MACD_12_26_9', 'MACDh_12_26_9', 'MACDs_12_26_9']
-    df['MACD']  = macd_df['MACD_12_26_9']
+    df['MACD'] = macd_df['MACD_12_26_9']
     df['MACDh'] = macd_df['MACDh_12_26_9']  # 히스토그램
     df['MACDs'] = macd_df['MACDs_12_26_9']  # 시그널
 
-    # (C) CCI(Commodity Channel Index) - 기본 length=20
+
+@register_feature("CCI")
+def _cci(df):
+    _ta()
     df['CCI'] = df.ta.cci(length=20)
 
-    df['COR'] = (df['high'] - df['open']) / df['open']
-    df['LOR'] = (df['low'] - df['open']) / df['open']
-    df['HOR'] = (df['high'] - df['open']) / df['open']
-    df['LCR'] = (df['low'] - df['close']) / df['close']
-    df['HCR'] = (df['high'] - df['close']) / df['close']
-    df['HLR'] = (df['high'] - df['low']) / df['low']
 
-    # 혹시 다른 지표 예시로 ADX, ATR, CMF, etc.도 가능
+def _bar_ratio(df, name: str, a: str, b: str):
+    df[name] = (df[a] - df[b]) / df[b]
+
+
+for _name, (_a, _b) in {"COR": ("high", "open"), "LOR": ("low", "open"), "HOR": ("high", "open"),
+                        "LCR": ("low", "close"), "HCR": ("high", "close"), "HLR": ("high", "low")}.items():
+    register_feature(_name)(partial(_bar_ratio, name=_name, a=_a, b=_b))
+
+
+@register_feature("ADX")
+def _adx(df):
+    _ta()
     df['ADX'] = df.ta.adx(length=14)['ADX_14']
+
+
+@register_feature("ATR")
+def _atr(df):
+    _ta()
     df['ATR'] = df.ta.atr(length=14)
 
+
+@register_feature("recover_days")
+def _recover_days(df):
     df['recover_days'] = (df.index[-1] - df['low'].idxmin()).days
+
+
+@register_feature("correct_days")
+def _correct_days(df):
     df['correct_days'] = (df.index[-1] - df['high'].idxmax()).days
+
+
+@register_feature("minmaxgap")
+def _minmaxgap(df):
     df['minmaxgap'] = (df['high'].max() - df['low'].min()) / df['low'].min()
+
+
+@register_feature("close_std")
+def _close_std(df):
     df['close_std'] = df['close'].std()
+
+
+@register_feature("profit_600")
+def _profit_600(df):
     df['profit_600'] = (df['close'].iloc[-1] - df['close'].iloc[0]) / df['close'].iloc[0]
-    
+
+
+@register_feature("days_since_max_high", dated=True)
+def _days_since_max_high(df):
     today = datetime.today().strftime('%Y-%m-%d')
     df['days_since_max_high'] = days_since_max_high(df, today, window_days=600)
 
-    df = zlema(df, length=70)
+
+@register_feature("zlema")
+def _zlema(df):
+    zlema(df, length=70)
+
+
+@register_feature("baseline")
+def _baseline(df):
     df['baseline'] = moving_average(df['close'], 60, ma_type="HMA")
-    return df
+
+
+# -------------------- Helper Functions -------------------- #
 
 def days_since_max_high(prices: pd.DataFrame, current_date: str, window_days: int = 600) -> int:
     """
@@ -210,6 +365,19 @@ def calculate_atr(df, length=14):
     atr = tr.rolling(window=length).mean()
     return atr
 
+def _wma(values: np.ndarray, length: int) -> np.ndarray:
+    """
+    가중이동평균(가중치 1..length, 최근 값이 가장 큼)을 numpy 행렬곱으로 계산.
+    rolling(length).apply 와 같은 규칙: 앞 length-1개와 창 안에 NaN이 있는 위치는 NaN
+    2차원 배열이면 열(axis=0)마다 계산
+    """
+    out = np.full(values.shape, np.nan)
+    if length < 1 or len(values) < length:
+        return out
+    weights = np.arange(1, length + 1, dtype=np.float64)
+    out[length - 1:] = sliding_window_view(values, length, axis=0) @ weights / weights.sum()
+    return out
+
 def moving_average(series, length, ma_type="SMA"):
     """
     Calculate moving average.
@@ -222,20 +390,20 @@ def moving_average(series, length, ma_type="SMA"):
     Returns:
     - pd.Series: Moving average series.
     """
+    # SMA/EMA는 pandas 컴파일 커널(rolling.mean / ewm)이 이미 O(n)이라 그대로 사용
     if ma_type == "SMA":
         return series.rolling(window=length).mean()
     elif ma_type == "EMA":
         return series.ewm(span=length, adjust=False).mean()
     elif ma_type == "WMA":
-        weights = np.arange(1, length + 1)
-        return series.rolling(window=length).apply(lambda x: np.dot(x, weights) / weights.sum(), raw=True)
+        values = _wma(series.to_numpy(dtype=np.float64), length)
+        return pd.Series(values, index=series.index, name=series.name)
     elif ma_type == "HMA":
         half_length = int(length / 2)
         sqrt_length = int(np.sqrt(length))
-        wma1 = moving_average(series, half_length, "WMA")
-        wma2 = moving_average(series, length, "WMA")
-        diff = 2 * wma1 - wma2
-        return moving_average(diff, sqrt_length, "WMA")
+        values = series.to_numpy(dtype=np.float64)
+        diff = 2 * _wma(values, half_length) - _wma(values, length)
+        return pd.Series(_wma(diff, sqrt_length), index=series.index, name=series.name)
     else:
         raise ValueError(f"Unknown moving average type: {ma_type}")
 
@@ -0,0 +1,202 @@
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from trading.quote_cache import _num
+
+# ---------------------------------------------------------------------
+# 실시간 분봉 집계 (REAL 0B 체결 틱 → N분 OHLCV)
+# ---------------------------------------------------------------------
+# 종목 × 주기마다 고정 크기 링버퍼에 완성된 봉을 쌓습니다.
+# 각 봉을 i, i+capacity 두 곳에 같이 기록(이중 기록)해 두면
+# 최근 K개 봉이 항상 연속 구간이 되어 복사 없이 view로 돌려줄 수 있습니다.
+#
+# REAL 0B values: 20=체결시간(HHMMSS), 10=현재가, 15=거래량(체결량, +매수/-매도)
+
+BAR_FIELDS = ("ts", "open", "high", "low", "close", "volume")  # ts: 봉 시작 시각 (epoch 초)
+TS, OPEN, HIGH, LOW, CLOSE, VOLUME = range(len(BAR_FIELDS))
+
+BarCallback = Callable[[str, int, np.ndarray], None]
+
+
+class _Ring:
+    __slots__ = ("buf", "capacity", "count", "bucket", "bar")
+
+    def __init__(self, capacity: int):
+        self.buf = np.zeros((2 * capacity, len(BAR_FIELDS)), dtype=np.float64)
+        self.capacity = capacity
+        self.count = 0          # 지금까지 완성된 봉 수
+        self.bucket = -1        # 만들고 있는 봉의 시작 (자정 기준 분)
+        self.bar: Optional[List[float]] = None  # 만들고 있는 봉 [ts, o, h, l, c, v]
+
+    def push(self, bar: List[float]) -> np.ndarray:
+        i = self.count % self.capacity
+        self.buf[i] = bar
+        self.buf[i + self.capacity] = bar
+        self.count += 1
+        return self.buf[i + self.capacity]
+
+    def amend(self, price: float, volume: float) -> None:
+        """이미 마감된 마지막 봉에 늦게 온 틱 반영 (두 사본 모두)"""
+        i = (self.count - 1) % self.capacity
+        for row in (self.buf[i], self.buf[i + self.capacity]):
+            row[HIGH] = max(row[HIGH], price)
+            row[LOW] = min(row[LOW], price)
+            row[CLOSE] = price
+            row[VOLUME] += volume
+
+    def last(self, k: int) -> np.ndarray:
+        k = min(k, self.count, self.capacity)
+        end = (self.count - 1) % self.capacity + self.capacity + 1 if self.count else self.capacity
+        view = self.buf[end - k:end]
+        view.flags.writeable = False  # 읽기 전용 view (다음 봉 기록 시 내용이 바뀜)
+        return view
+
+
+class MinuteBarAggregator:
+    """
+    bars = MinuteBarAggregator(intervals=(1, 3, 5), capacity=240)
+    bars.on_close.append(lambda code, minutes, bar: ...)
+    bars.on_real(msg)                 # QuoteFeed sink로 연결
+    bars.last("005930", 5, 20)        # 최근 완성 5분봉 20개 (k × 6) view
+    - 봉은 틱의 체결시간(HHMMSS) 기준으로 나뉘며, 시장 시계가 분을 넘기면
+      틱이 없던 종목의 봉도 함께 마감됩니다.
+    """
+    def __init__(self, intervals: Iterable[int] = (1, 3, 5), capacity: int = 390,
+                 on_close: Optional[List[BarCallback]] = None):
+        self.intervals: Tuple[int, ...] = tuple(sorted(set(int(n) for n in intervals)))
+        if not self.intervals or self.intervals[0] < 1:
+            raise ValueError(f"분봉 주기는 1 이상이어야 합니다: {intervals}")
+        self.capacity = capacity
+        self.on_close: List[BarCallback] = list(on_close or [])
+        self._rings: Dict[str, Dict[int, _Ring]] = {}
+        self._clock = -1          # 지금까지 본 가장 늦은 체결 분 (자정 기준)
+        self._midnight = 0.0
+        self._next_midnight = 0.0
+        self.stats = {"ticks": 0, "late": 0, "bars": 0}
+
+    # -----------------------------
+    # 입력
+    # -----------------------------
+    def on_real(self, msg: Dict) -> int:
+        """REAL 프레임의 0B 체결 틱 반영. 반환: 반영한 틱 수"""
+        n = 0
+        for item in msg.get("data") or []:
+            if item.get("type") != "0B":
+                continue
+            values = item.get("values") or {}
+            code = str(item.get("item") or "").strip()
+            hhmmss = str(values.get("20") or "").strip()
+            price = _num(values.get("10"))
+            if not code or len(hhmmss) < 4 or not price > 0:
+                continue
+            volume = _num(values.get("15"))
+            self.add_tick(code, hhmmss, price, 0.0 if volume != volume else volume)
+            n += 1
+        return n
+
+    def add_tick(self, code: str, hhmmss: str, price: float, volume: float = 0.0) -> None:
+        minute = int(hhmmss[0:2]) * 60 + int(hhmmss[2:4])
+        self.stats["ticks"] += 1
+        rings = self._rings.get(code)
+        if rings is None:
+            rings = self._rings[code] = {n: _Ring(self.capacity) for n in self.intervals}
+
+        midnight = self._day_start()
+        for n, ring in rings.items():
+            bucket = minute // n * n
+            bar = ring.bar
+            if bar is not None and bucket > ring.bucket:
+                self._close(code, n, ring)
+                bar = None
+            if bar is None:
+                if bucket <= ring.bucket and ring.count:
+                    # 시장 시계로 이미 마감된 봉의 틱 (다른 종목 틱이 먼저 도착한 경우)
+                    self.stats["late"] += 1
+                    ring.amend(price, volume)
+                    continue
+                ring.bucket = bucket
+                ring.bar = [midnight + bucket * 60, price, price, price, price, volume]
+                continue
+            if bucket < ring.bucket:
+                self.stats["late"] += 1  # 늦게 온 틱은 진행 중인 봉에 합산
+            if price > bar[HIGH]:
+                bar[HIGH] = price
+            if price < bar[LOW]:
+                bar[LOW] = price
+            bar[CLOSE] = price
+            bar[VOLUME] += volume
+
+        if minute > self._clock:
+            self._clock = minute
+            self.close_due(minute)
+
+    def close_due(self, minute: int) -> int:
+        """자정 기준 minute 이전에 끝난 봉을 모두 마감. 반환: 마감한 봉 수"""
+        closed = 0
+        for code, rings in self._rings.items():
+            for n, ring in rings.items():
+                if ring.bar is not None and ring.bucket + n <= minute:
+                    self._close(code, n, ring)
+                    closed += 1
+        return closed
+
+    def flush(self) -> int:
+        """장 마감 등: 만들고 있는 봉을 모두 마감"""
+        return self.close_due(24 * 60 * 2)
+
+    # -----------------------------
+    # 조회
+    # -----------------------------
+    def last(self, code: str, minutes: int, k: int) -> np.ndarray:
+        """최근 완성 봉 k개 (오래된 것 → 최신, 열은 BAR_FIELDS). 복사 없는 읽기 전용 view"""
+        rings = self._rings.get(code)
+        if rings is None:
+            return np.zeros((0, len(BAR_FIELDS)), dtype=np.float64)
+        return rings[minutes].last(k)
+
+    def current(self, code: str, minutes: int) -> Optional[np.ndarray]:
+        """만들고 있는(미완성) 봉"""
+        rings = self._rings.get(code)
+        if rings is None or rings[minutes].bar is None:
+            return None
+        return np.array(rings[minutes].bar, dtype=np.float64)
+
+    def count(self, code: str, minutes: int) -> int:
+        rings = self._rings.get(code)
+        return 0 if rings is None else rings[minutes].count
+
+    @property
+    def codes(self) -> List[str]:
+        return list(self._rings)
+
+    # -----------------------------
+    # 내부
+    # -----------------------------
+    def _close(self, code: str, minutes: int, ring: _Ring) -> None:
+        row = ring.push(ring.bar)
+        ring.bar = None
+        self.stats["bars"] += 1
+        for callback in self.on_close:
+            try:
+                callback(code, minutes, row)
+            except Exception as e:
+                logging.error(f"[BAR] on_close error: {e}")
+
+    def _day_start(self) -> float:
+        now = time.time()
+        if now >= self._next_midnight:
+            if self._next_midnight:
+                # 날짜가 바뀌면 전날 봉을 마감하고 시장 시계를 초기화
+                self.flush()
+                self._clock = -1
+                for rings in self._rings.values():
+                    for ring in rings.values():
+                        ring.bucket = -1
+            today = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+            self._midnight = today.timestamp()
+            self._next_midnight = (today + timedelta(days=1)).timestamp()
+        return self._midnight
@@ -0,0 +1,282 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from api.ws_session import CLOSED, WSSession, WSSessionThread, shared_ws_thread
+
+# ---------------------------------------------------------------------
+# 실시간 시세 캐시 (REAL 0B 주식체결 / 0C 주식우선호가)
+# ---------------------------------------------------------------------
+# 종목별 최신 현재가/최우선 매도·매수호가/수신시각을 배열 한 줄에 보관합니다.
+# 조회는 dict로 행 번호를 찾은 뒤 배열을 읽는 O(1) 연산이고,
+# 값이 없거나 오래되었으면 호출 측에서 REST(ka10001)로 대체합니다.
+#
+# REAL values: 10=현재가, 27=(최우선)매도호가, 28=(최우선)매수호가, 13=누적거래량, 20=체결시간
+
+QUOTE_REAL_TYPES = ["0B", "0C"]
+QUOTE_GRP_NO = os.getenv("QUOTE_GRP_NO", "2")          # 체결감시(1)와 다른 그룹 번호
+QUOTE_REG_CHUNK = int(os.getenv("QUOTE_REG_CHUNK", "100"))  # REG 1회당 종목 수
+QUOTE_MAX_AGE = float(os.getenv("QUOTE_MAX_AGE", "10"))    # 초, 이보다 오래된 시세는 사용하지 않음
+QUOTE_QUEUE_MAX = int(os.getenv("QUOTE_QUEUE_MAX", "10000"))  # REAL 수신 큐 상한 (넘으면 오래된 프레임부터 버림)
+
+
+def _num(value) -> float:
+    """'+71500', '-71400' → 71500.0 (부호는 전일 대비 표시)"""
+    if value is None:
+        return np.nan
+    s = str(value).strip().lstrip("+-").replace(",", "")
+    try:
+        return float(s) if s else np.nan
+    except ValueError:
+        return np.nan
+
+
+class QuoteCache:
+    """
+    cache.update("005930", price=71500, bid=71400, ask=71500)
+    cache.price("005930", max_age=5)  → 71500 (없거나 오래되면 None)
+    - REAL 수신(이벤트 루프 스레드)과 조회(메인 스레드)가 동시에 일어나므로 lock으로 보호
+    """
+    def __init__(self, capacity: int = 256):
+        self._rows: Dict[str, int] = {}
+        self._codes: List[str] = []
+        self._lock = threading.Lock()
+        self._alloc(capacity)
+
+    def _alloc(self, capacity: int) -> None:
+        old = getattr(self, "_price", None)
+        fields = {"_price": np.nan, "_bid": np.nan, "_ask": np.nan, "_volume": np.nan, "_ts": 0.0}
+        for name, fill in fields.items():
+            arr = np.full(capacity, fill, dtype=np.float64)
+            if old is not None:
+                prev = getattr(self, name)
+                arr[:len(prev)] = prev
+            setattr(self, name, arr)
+
+    def _row(self, code: str) -> int:
+        row = self._rows.get(code)
+        if row is None:
+            row = len(self._codes)
+            if row >= len(self._price):
+                self._alloc(len(self._price) * 2)
+            self._rows[code] = row
+            self._codes.append(code)
+        return row
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._rows
+
+    @property
+    def codes(self) -> List[str]:
+        return list(self._codes)
+
+    def update(self, code: str, price: float = np.nan, bid: float = np.nan, ask: float = np.nan,
+               volume: float = np.nan, ts: Optional[float] = None) -> None:
+        """NaN인 필드는 이전 값을 유지 (0C는 호가만, 0B는 체결가 위주로 옴)"""
+        with self._lock:
+            row = self._row(code)
+            for arr, value in ((self._price, price), (self._bid, bid), (self._ask, ask), (self._volume, volume)):
+                if value == value:  # NaN 제외
+                    arr[row] = value
+            self._ts[row] = time.time() if ts is None else ts
+
+    def on_real(self, msg: Dict) -> int:
+        """REAL 프레임 반영. 반환: 반영한 항목 수"""
+        n = 0
+        now = time.time()
+        for item in msg.get("data") or []:
+            if item.get("type") not in QUOTE_REAL_TYPES:
+                continue
+            code = str(item.get("item") or "").strip()
+            values = item.get("values") or {}
+            if not code:
+                continue
+            self.update(code,
+                        price=_num(values.get("10")),
+                        ask=_num(values.get("27")),
+                        bid=_num(values.get("28")),
+                        volume=_num(values.get("13")),
+                        ts=now)
+            n += 1
+        return n
+
+    def get(self, code: str, max_age: Optional[float] = None) -> Optional[Dict[str, float]]:
+        with self._lock:
+            row = self._rows.get(code)
+            if row is None:
+                return None
+            ts = self._ts[row]
+            if max_age is not None and time.time() - ts > max_age:
+                return None
+            return {"price": float(self._price[row]), "bid": float(self._bid[row]), "ask": float(self._ask[row]),
+                    "volume": float(self._volume[row]), "ts": float(ts)}
+
+    def price(self, code: str, max_age: Optional[float] = QUOTE_MAX_AGE) -> Optional[int]:
+        quote = self.get(code, max_age)
+        if quote is None or not quote["price"] > 0:
+            return None
+        return int(quote["price"])
+
+    def prices(self, codes: Iterable[str], max_age: Optional[float] = QUOTE_MAX_AGE) -> Dict[str, int]:
+        """여러 종목을 한 번에. 캐시에 없거나 오래된 종목은 결과에서 빠짐"""
+        codes = list(codes)
+        with self._lock:
+            rows = np.array([self._rows.get(c, -1) for c in codes], dtype=np.int64)
+            known = rows >= 0
+            price = np.where(known, self._price[np.where(known, rows, 0)], np.nan)
+            fresh = known & (price > 0)
+            if max_age is not None:
+                fresh &= (time.time() - self._ts[np.where(known, rows, 0)]) <= max_age
+        return {c: int(p) for c, p, ok in zip(codes, price, fresh) if ok}
+
+
+class QuoteFeed:
+    """
+    WSSession의 REAL 0B/0C를 QuoteCache로 흘려보내는 구독자 (이벤트 루프 안에서 사용)
+    sinks: 같은 REAL 프레임을 받을 추가 소비자 (예: MinuteBarAggregator.on_real)
+    """
+    def __init__(self, session: WSSession, cache: QuoteCache, sinks: Iterable[Callable[[Dict], Any]] = ()):
+        self.session = session
+        self.cache = cache
+        self.sinks = list(sinks)
+        self.watching: List[str] = []
+        self._lost: List[str] = []  # 연결이 끊겨 재접속 시 다시 등록할 종목
+        self._real: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> "QuoteFeed":
+        """접속 + REAL 수신 태스크 시작. 끊긴 뒤 다시 부르면 재접속하고 이전 종목을 다시 등록"""
+        if not self.session.connected:
+            await self._cancel_pump()
+            self._detach()
+        await self.session.start()
+        if self._task is None:
+            self._real = self.session.subscribe("REAL", maxsize=QUOTE_QUEUE_MAX)
+            self._task = asyncio.create_task(self._pump())
+        lost, self._lost = self._lost, []
+        if lost:
+            await self.watch(lost)
+        return self
+
+    async def watch(self, codes: Iterable[str]) -> List[str]:
+        """새 종목만 REG(refresh=1: 기존 등록 유지) 요청. 반환: 새로 등록한 종목"""
+        new = [c for c in dict.fromkeys(codes) if c and c not in self.watching]
+        for i in range(0, len(new), QUOTE_REG_CHUNK):
+            chunk = new[i:i + QUOTE_REG_CHUNK]
+            resp = await self.session.request({
+                "trnm": "REG", "grp_no": QUOTE_GRP_NO, "refresh": "1",
+                "data": [{"item": chunk, "type": QUOTE_REAL_TYPES}],
+            })
+            if resp.get("return_code") not in (None, 0):
+                raise RuntimeError(f"REG 실패: {resp.get('return_msg')}")
+            self.watching.extend(chunk)
+        return new
+
+    async def stop(self) -> None:
+        if self.watching and self.session.connected:
+            try:
+                await self.session.request({
+                    "trnm": "REMOVE", "grp_no": QUOTE_GRP_NO,
+                    "data": [{"item": self.watching, "type": QUOTE_REAL_TYPES}],
+                }, timeout=5.0)
+            except Exception as e:
+                logging.warning(f"[QUOTE] REMOVE 실패: {e}")
+        await self._cancel_pump()
+        self._detach()
+        self.watching, self._lost = [], []
+
+    async def _cancel_pump(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def _detach(self) -> None:
+        """REAL 구독 해제 (다른 소비자가 재접속해도 큐가 쌓이지 않도록) + 등록 종목은 재등록 대상으로"""
+        if self._real is not None:
+            self.session.unsubscribe("REAL", self._real)
+            self._real = None
+        self._lost = list(dict.fromkeys(self._lost + self.watching))
+        self.watching = []
+
+    async def _pump(self) -> None:
+        while True:
+            msg = await self._real.get()
+            if msg.get("trnm") == CLOSED:
+                logging.warning("[QUOTE] 연결 종료 → 재접속(start/watch) 전까지 REST로 대체")
+                self._task = None
+                self._detach()
+                return
+            self.cache.on_real(msg)
+            for sink in self.sinks:
+                try:
+                    sink(msg)
+                except Exception as e:
+                    logging.error(f"[QUOTE] sink error: {e}")
+
+
+class BackgroundQuoteFeed:
+    """
+    동기 코드(main)용: 공용 세션 스레드(shared_ws_thread)의 이벤트 루프에서 QuoteFeed를 돌립니다.
+    같은 스레드를 쓰는 조건검색 등과 로그인된 소켓 하나를 공유합니다.
+    feed = BackgroundQuoteFeed(token, QUOTES).start()
+    feed.watch(codes)
+    ...
+    feed.stop()      # 구독만 해제, 소켓은 stop_ws_threads()에서 닫힘
+    """
+    def __init__(self, token: str, cache: QuoteCache, url: Optional[str] = None,
+                 sinks: Iterable[Callable[[Dict], Any]] = ()):
+        self.token = token
+        self.cache = cache
+        self.url = url
+        self.sinks = list(sinks)
+        self._host: Optional[WSSessionThread] = None
+        self._feed: Optional[QuoteFeed] = None
+
+    def start(self) -> "BackgroundQuoteFeed":
+        if self._host is not None:
+            return self
+        self._host = shared_ws_thread(self.token, self.url)
+
+        async def _start(session: WSSession):
+            self._feed = QuoteFeed(session, self.cache, self.sinks)
+            return await self._feed.start()
+
+        try:
+            self._host.run(_start)
+        except Exception:
+            self.stop()
+            raise
+        return self
+
+    def watch(self, codes: Iterable[str]) -> List[str]:
+        if self._feed is None:
+            return []
+        feed = self._feed
+
+        async def _watch():
+            await feed.start()  # 끊겼으면 다시 접속
+            return await feed.watch(codes)
+
+        return self._host.call(_watch())
+
+    def stop(self) -> None:
+        host, feed = self._host, self._feed
+        self._host, self._feed = None, None
+        if host is None or feed is None:
+            return
+        try:
+            host.call(feed.stop(), timeout=10.0)
+        except Exception as e:
+            logging.warning(f"[QUOTE] 종료 중 오류: {e}")
@@ -65,25 +65,37 @@ def set_moving_average(df):
     return df
 
 
-if __name__ == '__main__':
-    # SQLite 데이터베이스 연결
-    database_path = "sqlite3/candle_data.db"
-    conn = sqlite3.connect(database_path)
+def load_screen_universe(store, start='2019-07-01', min_rows=1000):
+    """
+    candles 통합 테이블에서 전 종목을 한 번의 쿼리로 읽어 종목별 신호 컬럼을 붙여 반환합니다.
+    (기존 종목별 테이블 컬럼명 Date/Open/High/Low/Close/Volume 유지)
+    start 당일은 제외합니다 (기존 쿼리 Date > start와 동일, store.load의 start는 포함 조건).
+    """
+    df_all = store.load(start=start).rename(columns={
+        'code': 'ticker', 'date': 'Date', 'open': 'Open', 'high': 'High',
+        'low': 'Low', 'close': 'Close', 'volume': 'Volume',
+    })
+    df_all = df_all[df_all['Date'] > start]
+    sizes = df_all.groupby('ticker')['Date'].transform('size')
+    df_all = df_all[sizes >= min_rows]
 
-    table_list = get_all_tables(conn)
     dfs = []
-    dates = []
-    for ticker in table_list:
-        df = pd.read_sql(f"SELECT * FROM '{ticker}' WHERE Date>'2019-07-01'", conn)
-        if df.shape[0] < 1000:
-            continue
-
-        df = df.assign(ticker=ticker).assign(market=ticker.split('.')[1])
+    for ticker, df in df_all.groupby('ticker', sort=False):
+        df = df.reset_index(drop=True).assign(market=ticker.split('.')[1])
         df = set_signal(df)
         df = set_moving_average(df)
         dfs.append(df)
-        # dates.append(df.index)
-    
+    return dfs
+
+
+if __name__ == '__main__':
+    from db.candle_store import CandleStore
+
+    # candles 통합 테이블 (종목별 테이블 DB는 python -m db.candle_store migrate 로 이전)
+    store = CandleStore()
+    dfs = load_screen_universe(store)
+    store.close()
+
     df = pd.concat(dfs)
     conn_scr = sqlite3.connect('sqlite3/screener.db')
 
@@ -97,5 +109,4 @@ if __name__ == '__main__':
         vrate_screener.to_sql(f'vrate.{market}', conn_scr, if_exists='replace')
         mapct_screener.to_sql(f'mapct.{market}', conn_scr, if_exists='replace')
 
-    conn.close()
     conn_scr.close()
@@ -5,7 +5,10 @@ from typing import Dict, Tuple, List, Optional
 import pandas as pd
 
 # 프로젝트 내부 유틸/서비스 경로로 교체
-from trading.indicators import compute_indicators           # 기존 services.indicators -> trading.indicators 로 배치 권장
+from trading.indicators import compute_indicators, required_features  # 기존 services.indicators -> trading.indicators 로 배치 권장
+from trading.indicator_cache import IndicatorCache
+from trading.indicator_engine import IndicatorEngine
+from trading.indicator_panel import IndicatorPanel
 from utils.calculate_utils import calculate_tick_price
 from utils.config_utils import open_yaml                    # 유지
 from api.order import OrderAPI
@@ -118,9 +121,15 @@ def analyze_stocks(
     use_fundamental: bool = False,
     fundamental_df: Optional[pd.DataFrame] = None,
     last_ohlcv_lookup: Optional[Dict[str, Dict[str, float]]] = None,
+    engine: Optional[IndicatorEngine] = None,
+    panel: bool = False,
+    cache: Optional[IndicatorCache] = None,
 ) -> Dict[str, Tuple[str, float]]:
     """
     data: {'005930.KS': df, '000660.KS': df, ...} 형태 (df는 최소 ['date','close',...])
+    engine: 주면 전체 재계산 대신 증분 엔진으로 마지막 행만 계산 (저장은 호출 측)
+    panel: True면 전 종목을 IndicatorPanel로 한 번에 계산하고 종목별 마지막 행으로 필터링
+    cache: 주면 캔들 이력이 그대로인 종목은 저장된 지표 행을 재사용 (compute_indicators 경로)
     return: {'005930': ('BUY', buy_price_basis), ...}
     """
     logging.info("Analyzing stocks...")
@@ -133,6 +142,7 @@ def analyze_stocks(
     # - 프로젝트 내 통합 DB가 아직 없다면, 외부 sqlite 의존을 제거하고
     #   호출 측에서 fundamental_df/last_ohlcv_lookup을 주입하는 방식으로 유지
     signals: Dict[str, Tuple[str, float]] = {}
+    latest = IndicatorPanel.from_frames(data).latest() if panel else None
 
     for code_with_market, df in data.items():
         # code_with_market: "005930.KS" or "005930.KQ"
@@ -141,6 +151,12 @@ def analyze_stocks(
         except ValueError:
             code, market = code_with_market, 'KS'
 
+        # 패널 모드: 미리 계산한 마지막 행(1행 DataFrame)에 아래 보조 정보만 붙임
+        if latest is not None:
+            if code_with_market not in latest.index:
+                continue
+            df = latest.loc[[code_with_market]].copy()
+
         # (옵션) 펀더멘털 머지
         if use_fundamental and (fundamental_df is not None) and (code in fundamental_df.index):
             ser = fundamental_df.loc[code]
@@ -166,9 +182,15 @@ def analyze_stocks(
         # 인디케이터 계산
         df = df.copy()
         if 'date' in df.columns:
-            df = compute_indicators(df.set_index('date'))
+            df = df.set_index('date')
+        if latest is not None:
+            pass                                        # 패널에서 이미 계산됨
+        elif engine is not None:
+            df = engine.frame(code_with_market, df)     # 새 봉만 반영, filter는 마지막 행만 사용
+        elif cache is not None:
+            df = cache.frame(code_with_market, df, features=required_features(config, market))
         else:
-            df = compute_indicators(df)
+            df = compute_indicators(df, features=required_features(config, market))
 
         print("====== ", code, " ======")
         if filtering(df, config, market):
@@ -271,16 +293,30 @@ def run_once_for_signals_and_orders(
     token: str,
     place_orders: bool = True,
     market_code: str = "KRX",
-    order_type: str = "market"
+    order_type: str = "market",
+    incremental: bool = False,
+    panel: bool = False,
+    cached: bool = False
 ) -> Dict[str, Tuple[str, float]]:
     """
     1) config 로딩 → 2) 분석 → 3) 주문목록 생성 → 4) 주문 전송(옵션)
+    incremental=True면 저장된 지표 상태(INDICATOR_STATE_PATH)에 새 봉만 반영하고 다시 저장
+    panel=True면 전 종목 지표를 IndicatorPanel로 한 번에 계산 (incremental보다 우선)
+    cached=True면 지표 캐시(candles.db indicator_cache)를 거쳐 compute_indicators 호출
     return: signals (분석 결과)
     """
     cfg = open_yaml(config_path) if config_path else {}
     trade_config = cfg.get("trade", {"n_split": 1, "max_hold_stocks": 10, "max_buy_per_stock": 4, "buy_price_multiplier": 1.01})
 
-    signals = analyze_stocks(data, cfg.get("features_cfg", {}))
+    engine = IndicatorEngine.open() if incremental and not panel else None
+    cache = IndicatorCache() if cached else None
+    try:
+        signals = analyze_stocks(data, cfg.get("features_cfg", {}), engine=engine, panel=panel, cache=cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    if engine is not None:
+        engine.save()
     orders = fill_orders(balance, signals, trade_config)
 
     if not orders:
@@ -0,0 +1,130 @@
+import numpy as np
+
+# ---------------------------------------------------------------------
+# 키움 REST 응답 숫자 문자열 디코더
+# ---------------------------------------------------------------------
+# 키움 응답의 숫자는 '+00071500', '-1200', '000123' 처럼 부호/0 채움이 붙은 문자열입니다.
+# 행마다 파이썬 함수를 호출하지 않고, 문자열 배열을 바이트 행렬(uint8)로 보고
+# 자리수(열) 단위로 한 번에 계산합니다.
+
+_ZERO = ord('0')
+_MINUS = ord('-')
+_DOT = ord('.')
+
+
+def pluck(rows, key, default=''):
+    """JSON 행(dict) 리스트에서 한 필드만 리스트로"""
+    return [row.get(key, default) for row in rows]
+
+
+def _byte_matrix(values) -> np.ndarray:
+    """문자열 리스트 → (행, 최대길이) uint8 행렬 (짧은 값은 0으로 채워짐)"""
+    arr = np.asarray(values, dtype='S')
+    if arr.ndim != 1:
+        arr = arr.ravel()
+    width = max(arr.dtype.itemsize, 1)
+    if arr.dtype.itemsize == 0:
+        arr = arr.astype('S1')
+    return arr.view(np.uint8).reshape(len(arr), width)
+
+
+def _digits(mat: np.ndarray):
+    """숫자가 아닌 문자(부호, 쉼표, 공백)는 건너뛰고 정수부를 계산. (값, 숫자 존재 여부)"""
+    digit = mat.astype(np.int64) - _ZERO
+    is_digit = (digit >= 0) & (digit <= 9)
+    out = np.zeros(mat.shape[0], dtype=np.int64)
+    for j in range(mat.shape[1]):
+        col = is_digit[:, j]
+        out = np.where(col, out * 10 + digit[:, j], out)
+    return out, is_digit.any(axis=1)
+
+
+def _is_numeric_array(values) -> bool:
+    """이미 숫자형인 ndarray / Series는 문자열 변환 없이 그대로 사용"""
+    dtype = getattr(values, 'dtype', None)
+    return dtype is not None and getattr(dtype, 'kind', '') in 'iuf'
+
+
+def _is_negative(mat: np.ndarray) -> np.ndarray:
+    return (mat == _MINUS).any(axis=1)
+
+
+def decode_int(values, absolute: bool = False, fill: int = 0) -> np.ndarray:
+    """
+    부호/0 채움 숫자 문자열 → int64 배열
+    - absolute=True: 부호 제거 (가격 필드의 +/-는 전일 대비 방향 표시)
+    - 빈 문자열은 fill
+    """
+    if _is_numeric_array(values):
+        out = np.asarray(values).astype(np.int64)
+        return np.abs(out) if absolute else out
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.int64)
+    mat = _byte_matrix(values)
+    out, has_digit = _digits(mat)
+    if not absolute:
+        out = np.where(_is_negative(mat), -out, out)
+    if fill:
+        out = np.where(has_digit, out, fill)
+    return out
+
+
+def decode_float(values, absolute: bool = False) -> np.ndarray:
+    """
+    숫자 문자열 → float64 배열 (빈 값은 NaN)
+    소수점이 없는 값은 decode_int와 같은 경로로, 소수점이 있으면 자리수 보정까지 벡터로 처리합니다.
+    """
+    if _is_numeric_array(values):
+        out = np.asarray(values).astype(np.float64)
+        return np.abs(out) if absolute else out
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.float64)
+    mat = _byte_matrix(values)
+    is_dot = mat == _DOT
+    if not is_dot.any():
+        out, has_digit = _digits(mat)
+        result = out.astype(np.float64)
+    else:
+        # 소수점 이후 자리수만큼 나눔
+        after_dot = np.cumsum(is_dot, axis=1) > 0
+        digit = mat.astype(np.int64) - _ZERO
+        frac_digits = (after_dot & (digit >= 0) & (digit <= 9)).sum(axis=1)
+        out, has_digit = _digits(mat)
+        result = out / np.power(10.0, frac_digits)
+    if not absolute:
+        result = np.where(_is_negative(mat), -result, result)
+    return np.where(has_digit, result, np.nan)
+
+
+def decode_date_int(ymd: np.ndarray) -> np.ndarray:
+    """YYYYMMDD 정수 배열 → datetime64[D]"""
+    year, month, day = ymd // 10000, ymd // 100 % 100, ymd % 100
+    months = (year - 1970) * 12 + (month - 1)
+    return months.astype('datetime64[M]').astype('datetime64[D]') + (day - 1).astype('timedelta64[D]')
+
+
+def _decode_stamp(values):
+    """날짜/시각 숫자열 → (부호 없는 int64 배열, 숫자가 있었는지). 빈 값/숫자 없는 값은 False"""
+    if _is_numeric_array(values):
+        arr = np.asarray(values)
+        valid = ~np.isnan(arr) if arr.dtype.kind == 'f' else np.ones(len(arr), dtype=bool)
+        return np.abs(np.where(valid, arr, 0)).astype(np.int64), valid
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+    return _digits(_byte_matrix(values))
+
+
+def decode_date(values) -> np.ndarray:
+    """'YYYYMMDD' → datetime64[D] (빈 값/숫자 없는 값은 NaT)"""
+    ymd, valid = _decode_stamp(values)
+    return np.where(valid, decode_date_int(ymd), np.datetime64('NaT', 'D'))
+
+
+def decode_datetime(values) -> np.ndarray:
+    """'YYYYMMDDHHMMSS' → datetime64[s] (빈 값/숫자 없는 값은 NaT)"""
+    stamp, valid = _decode_stamp(values)
+    date = decode_date_int(stamp // 1000000)
+    hms = stamp % 1000000
+    seconds = (hms // 10000) * 3600 + (hms // 100 % 100) * 60 + hms % 100
+    return np.where(valid, date.astype('datetime64[s]') + seconds.astype('timedelta64[s]'),
+                    np.datetime64('NaT', 's'))
@@ -0,0 +1,77 @@
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Tuple, Union
+
+# ---------------------------------------------------------------------
+# JSON 코덱 (REST 본문 / WebSocket 프레임 공용)
+# ---------------------------------------------------------------------
+# 설치되어 있으면 orjson을 쓰고, 없으면 표준 json으로 동작합니다.
+# JSON_BACKEND 환경변수(orjson / stdlib)로 강제할 수 있습니다.
+#
+# 모듈 함수는 set_backend()에서 교체되므로 `from utils import json_codec` 후
+# json_codec.loads(...) 처럼 모듈을 통해 호출하세요.
+#
+# - loads(str | bytes) -> 객체
+# - dumps(obj) -> str          (WebSocket 텍스트 프레임용)
+# - dumps_bytes(obj) -> bytes  (HTTP 요청 본문용, UTF-8)
+
+JSONDecodeError = json.JSONDecodeError  # orjson.JSONDecodeError도 이 클래스를 상속
+
+Codec = Tuple[Callable[[Union[str, bytes]], Any], Callable[[Any], str], Callable[[Any], bytes]]
+
+
+def _stdlib_codec() -> Codec:
+    def dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    def dumps_bytes(obj: Any) -> bytes:
+        return dumps(obj).encode("utf-8")
+
+    return json.loads, dumps, dumps_bytes
+
+
+def _orjson_codec() -> Codec:
+    import orjson
+
+    def dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    return orjson.loads, dumps, orjson.dumps
+
+
+_BACKENDS: Dict[str, Callable[[], Codec]] = {
+    "orjson": _orjson_codec,
+    "stdlib": _stdlib_codec,
+}
+
+BACKEND = "stdlib"
+loads, dumps, dumps_bytes = _stdlib_codec()
+
+
+def set_backend(name: str = "auto") -> str:
+    """
+    코덱 백엔드 선택. 'auto'는 orjson → stdlib 순으로 사용 가능한 것을 고릅니다.
+    반환: 실제 선택된 백엔드 이름
+    """
+    global BACKEND, loads, dumps, dumps_bytes
+    candidates = list(_BACKENDS) if name == "auto" else [name]
+    for candidate in candidates:
+        factory = _BACKENDS.get(candidate)
+        if factory is None:
+            raise ValueError(f"지원하지 않는 JSON 백엔드: {candidate}")
+        try:
+            loads, dumps, dumps_bytes = factory()
+        except ImportError:
+            if name != "auto":
+                logging.warning(f"[JSON] {candidate} 미설치 → stdlib 사용")
+                loads, dumps, dumps_bytes = _stdlib_codec()
+                BACKEND = "stdlib"
+                return BACKEND
+            continue
+        BACKEND = candidate
+        return BACKEND
+    return BACKEND
+
+
+set_backend(os.getenv("JSON_BACKEND", "auto"))